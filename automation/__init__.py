@@ -1,44 +1,55 @@
 """
 Módulo de automação para planejamento de produção.
+
+Os nomes abaixo são carregados sob demanda: importar o pacote não importa
+as bibliotecas de interface (InquirerPy, tabulate), de modo que pontos de
+entrada sem interação, como `python -m automation`, iniciam rapidamente.
 """
 
-# Expondo as funções principais de production_planner
-from automation.core.production_planner import preencher_producao
-
-# Expondo as funções de actions
-from automation.actions.action_selector import escolher_acao
-from automation.actions.add_row import adicionar_nova_linha
-from automation.actions.remove_order import excluir_pedido
-from automation.actions.create_plan import criar_novo_plano
-from automation.actions.priority_handler import definir_prioridade, definir_ordem_manual
-from automation.actions.reports_export import gerar_relatorio_arquivo
-
-# Expondo funções de ui
-from automation.ui.file_selector import escolher_arquivo_excel, escolher_arquivo_exportar
-from automation.ui.cut_selector import selecionar_tipos_de_corte
-from automation.ui.table_renderer import processar_tabela
-
-# Expondo validadores
-from automation.validators.report_validator import validar_prazo
-from automation.validators.start_date_validator import validar_data_input
-
-# Expondo constantes
-from automation.core.constants import SETOR_ORDEM
-
-__all__ = [
-    'preencher_producao',
-    'escolher_acao',
-    'adicionar_nova_linha',
-    'excluir_pedido',
-    'criar_novo_plano',
-    'definir_prioridade',
-    'definir_ordem_manual',
-    'gerar_relatorio_arquivo',
-    'escolher_arquivo_excel',
-    'escolher_arquivo_exportar',
-    'selecionar_tipos_de_corte',
-    'processar_tabela',
-    'validar_prazo',
-    'validar_data_input',
-    'SETOR_ORDEM'
-]
\ No newline at end of file
+import importlib
+
+# Nome exposto -> módulo onde ele é definido
+_EXPORTACOES = {
+    # Funções principais de production_planner
+    'preencher_producao': 'automation.core.production_planner',
+
+    # Funções de actions
+    'escolher_acao': 'automation.actions.action_selector',
+    'adicionar_nova_linha': 'automation.actions.add_row',
+    'excluir_pedido': 'automation.actions.remove_order',
+    'criar_novo_plano': 'automation.actions.create_plan',
+    'definir_prioridade': 'automation.actions.priority_handler',
+    'definir_ordem_manual': 'automation.actions.priority_handler',
+    'gerar_relatorio_arquivo': 'automation.actions.reports_export',
+    'PerfilPlanta': 'automation.actions.plant_planner',
+    'carregar_perfis_plantas': 'automation.actions.plant_planner',
+
+    # Funções de ui
+    'escolher_arquivo_excel': 'automation.ui.file_selector',
+    'escolher_arquivo_exportar': 'automation.ui.file_selector',
+    'selecionar_tipos_de_corte': 'automation.ui.cut_selector',
+    'processar_tabela': 'automation.ui.table_renderer',
+
+    # Validadores
+    'validar_prazo': 'automation.validators.report_validator',
+    'resumo_gargalos': 'automation.validators.report_validator',
+    'validar_data_input': 'automation.validators.start_date_validator',
+
+    # Constantes
+    'SETOR_ORDEM': 'automation.core.constants',
+}
+
+__all__ = list(_EXPORTACOES)
+
+
+def __getattr__(nome):
+    modulo = _EXPORTACOES.get(nome)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(importlib.import_module(modulo), nome)
+    globals()[nome] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -2,6 +2,7 @@ from openpyxl import load_workbook
 from datetime import datetime
 from InquirerPy import inquirer
 from automation.fill_production import preencher_producao
+from automation.core.plan_layout import obter_cursor_plano
 
 
 def validar_data_input(data_str):
@@ -15,10 +16,8 @@ def adicionar_nova_linha(arquivo_path):
     wb = load_workbook(arquivo_path)
     ws = wb.active
 
-    # Encontra a primeira linha vazia após o cabeçalho (a partir da linha 12)
-    linha = 12
-    while ws.cell(row=linha, column=1).value:
-        linha += 1
+    # Primeiro bloco de pedido livre (a linha 12 ainda é a dos limites da Embalagem)
+    cursor = obter_cursor_plano(ws)
 
     print("\n📥 Preencha as informações para adicionar uma nova linha à planilha:")
 
@@ -49,6 +48,7 @@ def adicionar_nova_linha(arquivo_path):
     ).execute()
 
     # Preenche os dados na planilha
+    linha = cursor.ocupar()
     ws.cell(row=linha, column=1, value=pedido)
     ws.cell(row=linha, column=2, value=entrega)
     ws.cell(row=linha, column=3, value=cliente)
@@ -1,105 +1,228 @@
+import logging
 from openpyxl import load_workbook
 import pandas as pd
-import os
-from tabulate import tabulate
-from InquirerPy import inquirer
 
-from automation.core.production_planner import preencher_producao  
-from automation.core.excel_utils import atualizar_limites_maximos, atualizar_celulas_limite, obter_carga_producao
-from automation.core.constants import DEFAULT_CONFIG_PATH
-
-
-def criar_novo_plano(df_priorizado: pd.DataFrame):
-    total = len(df_priorizado)
-    arquivo_path = "model/planejamento.xlsx"
-
-    wb = load_workbook(arquivo_path)
-    ws = wb.active
+from automation.core.production_planner import obter_perfis_setores, montar_config_setores, registrar_trace_pedido
+from automation.core.scheduling_engine import PedidoPlanejamento, planejar_pedido, normalizar_data_inicio, setor_gargalo
+from automation.core.calendar_utils import carregar_calendario_uteis, formatar_data
+from automation.core.config import carregar_configuracao
+from automation.core.excel_utils import (
+    atualizar_limites_maximos, atualizar_celulas_limite, obter_carga_producao, obter_indice_datas, escrever_reservas
+)
+from automation.core.capacity_ledger import MatrizCapacidade
+from automation.core.plan_writer import EscritorPlanoStreaming, carregar_modelo_plano
+from automation.core.plan_layout import obter_cursor_plano
+from automation.core.plan_snapshot import COLUNAS_PEDIDO, montar_snapshot
+from automation.core.plan_store import registrar_plano
+from automation.core.constants import DEFAULT_CONFIG_PATH, DEFAULT_CALENDARIO_PATH, DEFAULT_EXP_PATH, DEFAULT_MODELO_PATH
+from automation.core.file_utils import salvar_nova_versao
+from automation.core.instrumentation import contar, cronometrado, medir
+
+logger = logging.getLogger(__name__)
+
+
+@cronometrado()
+def criar_novo_plano(df_priorizado: pd.DataFrame, plantas: list = None, workers: int = None):
+    """
+    Cria um novo plano de produção a partir do modelo e salva uma nova versão em exp/.
+
+    Args:
+        df_priorizado (pd.DataFrame): Pedidos na ordem de prioridade.
+        plantas (list): Perfis de linhas de produção (actions.plant_planner.PerfilPlanta).
+            Se informado, cada planta é planejada com os seus arquivos, em paralelo,
+            e gera o seu próprio plano.
+        workers (int): Processos usados com `plantas` (padrão: um por planta).
+
+    Returns:
+        tuple: (df_priorizado com PRIMEIRO DIA/ULTIMO DIA/DELAY, carga de produção), ou,
+            com `plantas`, (pedidos consolidados com a coluna PLANTA, resumo por planta)
+    """
+    if plantas is not None:
+        from automation.actions.plant_planner import planejar_plantas
+
+        return planejar_plantas(df_priorizado, plantas, workers=workers)
+
+    df_produzido, carga_prod, _ = gerar_plano(df_priorizado)
+    return df_produzido, carga_prod
+
+
+@cronometrado()
+def gerar_plano(
+        df_priorizado: pd.DataFrame,
+        modelo_path: str = DEFAULT_MODELO_PATH,
+        calendario_path: str = DEFAULT_CALENDARIO_PATH,
+        pasta_destino: str = DEFAULT_EXP_PATH,
+        config_path: str = DEFAULT_CONFIG_PATH,
+        streaming: bool = False
+    ):
+    """
+    Planeja todos os pedidos sobre o modelo e salva o resultado em pasta_destino.
+
+    Args:
+        df_priorizado (pd.DataFrame): Pedidos na ordem de prioridade.
+        modelo_path (str): Caminho da planilha modelo.
+        calendario_path (str): Caminho para o arquivo de calendário.
+        pasta_destino (str): Pasta onde a nova versão do plano é salva.
+        config_path (str): Caminho para o arquivo de configuração CSV.
+        streaming (bool): Se True, grava o plano em um workbook write-only, bloco a
+            bloco, com os estilos do modelo (ver core.plan_writer). A memória não
+            cresce com o número de pedidos e o plano contém apenas os blocos usados.
+
+    Returns:
+        tuple: (df_priorizado, carga de produção, caminho do plano salvo ou None)
+    """
+    arquivo_path = modelo_path
 
     ultimo_dia_list = []
     primeiro_dia_list = []
     delay_list = []
+    gargalo_list = []
 
     # Gera a lista de limites máximos
-    max_list = atualizar_limites_maximos(config_path=DEFAULT_CONFIG_PATH)
+    max_list = atualizar_limites_maximos(config_path=config_path)
 
-    carga_prod = obter_carga_producao(config_path=DEFAULT_CONFIG_PATH)
+    carga_prod = obter_carga_producao(config_path=config_path)
 
     # Atualizando os valores da lista com base na porcentagem da carga
     max_list_carga = [valor * (carga_prod / 100) for valor in max_list]
-    
-    # Atualiza as células [E3:E12] na planilha
-    atualizar_celulas_limite(ws, max_list_carga)
 
+    # Entradas do motor de planejamento, obtidas uma única vez por plano
+    configuracao = carregar_configuracao(config_path)
+    calendario = carregar_calendario_uteis(calendario_path)
+
+    with medir("gerar_plano.carregar_modelo"):
+        if streaming:
+            modelo = carregar_modelo_plano(arquivo_path)
+            escritor = EscritorPlanoStreaming(modelo, max_list_carga)
+            wb = escritor.workbook
+            indice_datas = modelo.indice_datas
+            config_setores = montar_config_setores(max_list_carga, configuracao)
+            matriz = MatrizCapacidade.a_partir_do_indice(
+                indice_datas, [int(valor) for valor in max_list_carga], calendario
+            )
+        else:
+            wb = load_workbook(arquivo_path)
+            ws = wb.active
 
+            # Atualiza as células [E3:E12] na planilha
+            atualizar_celulas_limite(ws, max_list_carga)
 
-    for index, row in df_priorizado.iterrows():
-        linha = 13
-        while ws.cell(row=linha, column=1).value:
-            linha += 1
+            indice_datas = obter_indice_datas(ws)
+            config_setores = obter_perfis_setores(ws, configuracao)
+
+            # Matriz setores x dias úteis com a capacidade restante, semeada com [E3:E12]
+            matriz = MatrizCapacidade.a_partir_da_planilha(ws, calendario)
+
+            # Blocos de pedido ocupados no modelo, lidos uma única vez
+            cursor = obter_cursor_plano(ws)
+
+    # Reservas de cada pedido, gravadas na planilha em uma única passada ao final
+    reservas_plano = []
+
+    # Pedidos da cópia colunar e do banco de planos: (linha, dados do pedido, reservas)
+    pedidos_snapshot = []
+    registrar_pedidos = configuracao.snapshot_plano or configuracao.banco_plano
 
+    for index, row in df_priorizado.iterrows():
         # Pegar valores da tabela
         pedido = row.get("PEDIDO")
-        entrega = row.get("ENTREGA")
+        # As datas ficam datetime64 na tabela; na planilha e no registro do plano, DD/MM/AAAA
+        entrega = formatar_data(row.get("ENTREGA"))
         cliente = row.get("CLIENTE")
         produto = row.get("PRODUTO")
         quantidade= row.get("QUANTIDADE")
         corte = row.get("CORTE")
         setor=row.get("SETOR")
         inicio_data=row.get("INICIO")
-        
-        # Preenche os dados na planilha
-        ws.cell(row=linha, column=1, value=pedido)
-        ws.cell(row=linha, column=2, value=entrega)
-        ws.cell(row=linha, column=3, value=cliente)
-        ws.cell(row=linha, column=4, value=produto)
-        ws.cell(row=linha, column=5, value=quantidade)
+        dados = [pedido, entrega, cliente, produto, quantidade]
+
+        if not streaming:
+            linha = cursor.ocupar()
 
+            # Preenche os dados na planilha
+            for coluna, valor in enumerate(dados, start=1):
+                ws.cell(row=linha, column=coluna, value=valor)
+            contar("celulas_gravadas", len(dados))
+        linha_pedido = escritor.proxima_linha if streaming else linha
 
+        resultado = None
         if not corte:
-            print(f"[Linha {index}] TIPO DE CORTE não especificado. Pulando.")
+            logger.warning("[Linha %s] TIPO DE CORTE não especificado. Pulando.", index)
             ultimo_dia_list.append(None)
             primeiro_dia_list.append(None)
             delay_list.append(None)
-            continue
-
-        try:
-            salvar = (index == total - 1)  # só salva no último
-            print(f"[Linha {index}] Iniciando preenchimento para tipo de corte: {corte}")
-
-            primeiro_dia, ultimo_dia, delay = preencher_producao(
-                ws=ws, 
-                df_priorizado=df_priorizado, 
-                quantidade=quantidade, 
-                setor=setor, 
-                linha=linha, 
-                calendario_path="data/_CALENDARIO.csv", 
-                planilha_path=arquivo_path, 
-                workbook=wb,
-                data_inicio=inicio_data,
-                corte=corte, 
-                salvar=salvar
-            )
+        else:
+            try:
+                logger.info("[Linha %s] Iniciando preenchimento para tipo de corte: %s", index, corte)
+
+                data_inicio = normalizar_data_inicio(inicio_data)
+                with medir("gerar_plano.motor"):
+                    resultado = planejar_pedido(
+                        PedidoPlanejamento(
+                            quantidade=quantidade,
+                            setor_inicial=setor,
+                            corte=corte,
+                            data_inicio=data_inicio,
+                            pedido=pedido,
+                        ),
+                        config_setores,
+                        calendario,
+                        matriz,
+                        priorizar_estampa=configuracao.prioridade_estampa,
+                        datas_planilha=indice_datas,
+                    )
+                registrar_trace_pedido(pedido, linha_pedido, setor, corte, quantidade, data_inicio, resultado)
+                primeiro_dia_list.append(resultado.primeiro_dia)
+                ultimo_dia_list.append(resultado.ultimo_dia)
+                delay_list.append(resultado.delay)
+                logger.info("[Linha %s] Preenchimento concluído.", index)
+            except Exception as e:
+                logger.error("[Linha %s] Erro ao preencher produção: %s", index, e)
+                resultado = None
+                ultimo_dia_list.append(None)
+                primeiro_dia_list.append(None)
+                delay_list.append(None)
+
+        reservas = resultado.reservas if resultado else []
+        gargalo_list.append(setor_gargalo(resultado.espera, config_setores) if resultado else None)
+        if streaming:
+            # O bloco do pedido é gravado imediatamente e descartado da memória
+            escritor.escrever_pedido(dados, reservas, indice_datas)
+        elif reservas:
+            reservas_plano.append((linha, reservas))
+
+        if registrar_pedidos:
+            valores_pedido = [pedido, entrega, cliente, produto, quantidade, corte, formatar_data(inicio_data), setor]
+            pedidos_snapshot.append((linha_pedido, dict(zip(COLUNAS_PEDIDO, valores_pedido)), reservas))
+
+    # Aplica todas as reservas na planilha
+    with medir("gerar_plano.gravar_reservas"):
+        for linha, reservas in reservas_plano:
+            escrever_reservas(ws, linha, reservas, indice_datas)
+
+    df_priorizado["PRIMEIRO DIA"] = pd.to_datetime(primeiro_dia_list)
+    df_priorizado["ULTIMO DIA"] = pd.to_datetime(ultimo_dia_list)
+    df_priorizado["DELAY"] = delay_list
+    df_priorizado["GARGALO"] = gargalo_list
 
-            # Padroniza a data para o formato DD/MM/AAAA
-            if ultimo_dia:
-                ultimo_dia = ultimo_dia.strftime('%d/%m/%Y')
-            if primeiro_dia:
-                primeiro_dia = primeiro_dia.strftime('%d/%m/%Y')
-
-            primeiro_dia_list.append(primeiro_dia)
-            ultimo_dia_list.append(ultimo_dia)
-            delay_list.append(delay)
-            print(f"[Linha {index}] Preenchimento concluído.\n")
-        except Exception as e:
-            print(f"[Linha {index}] Erro ao preencher produção: {e}")
-            ultimo_dia_list.append(None)
-            primeiro_dia_list.append(None)
-            delay_list.append(None)
+    # Utilização do plano: reservas somadas na matriz sobre os limites (não truncados) de [E3:E12]
+    if logger.isEnabledFor(logging.INFO):
+        utilizacao = " | ".join(
+            f"{setor}: {valor}%" for setor, valor in matriz.utilizacao(max_list_carga).items()
+        )
+        logger.info("Utilização por setor: %s", utilizacao)
 
-    df_priorizado["PRIMEIRO DIA"] = primeiro_dia_list   
-    df_priorizado["ULTIMO DIA"] = ultimo_dia_list
-    df_priorizado["DELAY"] = delay_list
+    datas = [data for _, data in sorted(indice_datas.colunas().items())]
+    snapshot = None
+    if configuracao.snapshot_plano:
+        snapshot = montar_snapshot(pedidos_snapshot, datas, max_list_carga)
+
+    # Salva uma única nova versão ao final, mesmo que o último pedido tenha sido pulado
+    caminho_plano = salvar_nova_versao(arquivo_path, wb, pasta_destino=pasta_destino,
+                                       config_path=config_path, snapshot=snapshot)
 
+    # Registra a versão no banco de planos da pasta (a planilha fica como exportação)
+    if caminho_plano and configuracao.banco_plano:
+        registrar_plano(caminho_plano, pedidos_snapshot, datas, max_list_carga, carga_prod)
 
-    return df_priorizado, carga_prod
\ No newline at end of file
+    return df_priorizado, carga_prod, caminho_plano
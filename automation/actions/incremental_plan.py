@@ -0,0 +1,369 @@
+"""
+Replanejamento incremental de um plano salvo em exp/.
+
+O plano é carregado com os pedidos, as reservas e os limites diários do banco de
+planos ou da cópia colunar (a planilha não guarda o tipo de corte, o setor
+inicial nem a data de início dos pedidos). Inserir ou remover um pedido altera a
+capacidade restante em algumas células (setor, dia). Os pedidos seguintes só
+são replanejados se a sua janela de planejamento contém alguma célula alterada:
+o motor consulta a capacidade apenas nos setores do roteiro do pedido, do dia
+de início até o dia em que a produção é concluída. Fora disso, o pedido veria
+a mesma capacidade e manteria as mesmas reservas.
+
+Uso:
+    plano = PlanoIncremental.carregar("exp/planejamento_c100_N__....xlsx")
+    plano.inserir_pedido({"PEDIDO": "P-99", ..., "SETOR_INICIAL": "PCP"}, posicao=0)
+    plano.remover_pedido(plano.posicao("P-10"))
+    caminho = plano.salvar()
+"""
+
+import logging
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from automation.core.calendar_utils import carregar_calendario_uteis
+from automation.core.capacity_ledger import MatrizCapacidade
+from automation.core.config import ConfiguracaoPlano, carregar_configuracao
+from automation.core.constants import SETOR_ORDEM, DEFAULT_CALENDARIO_PATH, DEFAULT_CONFIG_PATH, DEFAULT_EXP_PATH, DEFAULT_MODELO_PATH
+from automation.core.excel_utils import IndiceDatasPlanilha
+from automation.core.file_utils import salvar_nova_versao
+from automation.core.plan_snapshot import COLUNAS_PEDIDO, montar_snapshot
+from automation.core.plan_store import carregar_tabela_plano, registrar_plano
+from automation.core.plan_writer import EscritorPlanoStreaming, carregar_modelo_plano
+from automation.core.production_planner import montar_config_setores
+from automation.core.scheduling_engine import (
+    PedidoPlanejamento, planejar_pedido, setores_do_pedido, normalizar_data_inicio
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PedidoPlanejado:
+    """Pedido do plano com as suas reservas (setor, dia, quantidade)."""
+
+    dados: dict
+    reservas: list = field(default_factory=list)
+
+    @property
+    def pedido(self):
+        return self.dados.get("PEDIDO")
+
+    def planejamento(self) -> PedidoPlanejamento:
+        """Dados do pedido para o motor de planejamento."""
+        return PedidoPlanejamento(
+            quantidade=self.dados["QUANTIDADE"],
+            setor_inicial=self.dados["SETOR_INICIAL"],
+            corte=self.dados["CORTE"],
+            data_inicio=normalizar_data_inicio(self.dados.get("INICIO")),
+            pedido=self.pedido,
+        )
+
+
+class PlanoIncremental:
+    """
+    Plano de produção em memória que aceita inserções e remoções de pedidos,
+    replanejando apenas os pedidos afetados.
+    """
+
+    def __init__(self, pedidos: list, limites: list, datas: list,
+                 configuracao: ConfiguracaoPlano, calendario, modelo_path: str = DEFAULT_MODELO_PATH):
+        """
+        Args:
+            pedidos (list): PedidoPlanejado na ordem de prioridade.
+            limites (list): Limites diários dos setores ([E3:E12]), na ordem de SETOR_ORDEM.
+            datas (list): Datas do cabeçalho do plano (colunas H em diante).
+            configuracao (ConfiguracaoPlano): Setup e PRIORIDADE_ESTAMPA usados no replanejamento.
+            calendario (CalendarioUteis): Calendário de dias úteis.
+            modelo_path (str): Planilha modelo usada ao salvar o plano.
+        """
+        self.pedidos = list(pedidos)
+        self.limites = list(limites)
+        self.datas = list(datas)
+        self.configuracao = configuracao
+        self.calendario = calendario
+        self.modelo_path = modelo_path
+
+        # Dicionário {coluna: data} a partir da coluna H, como no cabeçalho da planilha
+        self.indice_datas = IndiceDatasPlanilha.a_partir_dos_valores([None] * 7 + self.datas)
+        self.config_setores = montar_config_setores(self.limites, configuracao)
+        self._vazia = MatrizCapacidade.a_partir_do_indice(
+            self.indice_datas, [int(limite) for limite in self.limites], calendario
+        )
+
+        # Pedidos replanejados na última inserção/remoção (sem contar o inserido)
+        self.replanejados = 0
+
+    @classmethod
+    def carregar(
+            cls,
+            caminho_plano: str,
+            calendario_path: str = DEFAULT_CALENDARIO_PATH,
+            config_path: str = DEFAULT_CONFIG_PATH,
+            modelo_path: str = DEFAULT_MODELO_PATH
+        ):
+        """
+        Carrega um plano salvo a partir do banco de planos ou da cópia colunar (.parquet).
+
+        A planilha não guarda o tipo de corte, o setor inicial nem a data de início
+        dos pedidos, sem os quais o replanejamento não reproduz o plano original.
+
+        Raises:
+            ValueError: Se o plano não estiver no banco nem tiver cópia colunar
+                atualizada (SNAPSHOT_PLANO/BANCO_PLANO desligados ou planilha alterada).
+        """
+        snapshot = carregar_tabela_plano(caminho_plano)
+        if snapshot is None:
+            raise ValueError(
+                f"O plano {caminho_plano} não tem cópia colunar nem registro no banco de planos "
+                "(ou a planilha foi alterada depois de salva). Ative SNAPSHOT_PLANO ou BANCO_PLANO "
+                "no arquivo de configuração e gere o plano novamente para replanejá-lo."
+            )
+        pedidos, limites, datas = _ler_snapshot(snapshot)
+        if limites is None:
+            limites = _ler_limites(caminho_plano)
+
+        return cls(pedidos, limites, datas, carregar_configuracao(config_path),
+                   carregar_calendario_uteis(calendario_path), modelo_path)
+
+    def posicao(self, pedido) -> int:
+        """Retorna a posição do pedido (valor da coluna PEDIDO) no plano."""
+        for i, planejado in enumerate(self.pedidos):
+            if str(planejado.pedido) == str(pedido):
+                return i
+        raise ValueError(f"Pedido não encontrado no plano: {pedido}")
+
+    def matriz(self) -> MatrizCapacidade:
+        """Capacidade restante com as reservas de todos os pedidos do plano."""
+        return self._matriz_ate(len(self.pedidos))
+
+    def inserir_pedido(self, dados: dict, posicao: int = None) -> PedidoPlanejado:
+        """
+        Planeja um novo pedido na posição de prioridade indicada.
+
+        Args:
+            dados (dict): Valores de COLUNAS_PEDIDO (SETOR_INICIAL é o setor de início).
+            posicao (int): Posição no plano (padrão: ao final).
+
+        Returns:
+            PedidoPlanejado: O pedido inserido, com as suas reservas.
+        """
+        return self.inserir_pedidos([dados], posicao)[0]
+
+    def inserir_pedidos(self, lista_dados: list, posicao: int = None) -> list:
+        """
+        Planeja novos pedidos, em sequência, a partir da posição indicada. Os pedidos
+        seguintes são percorridos uma única vez para todo o lote.
+
+        Returns:
+            list: Os PedidoPlanejado inseridos.
+        """
+        posicao = len(self.pedidos) if posicao is None else posicao
+        if not 0 <= posicao <= len(self.pedidos):
+            raise IndexError(f"Posição fora do plano: {posicao}")
+
+        matriz = self._matriz_ate(posicao)
+        antes = matriz.restante.copy()
+        novos = []
+        for dados in lista_dados:
+            novo = PedidoPlanejado({coluna: dados.get(coluna) for coluna in COLUNAS_PEDIDO})
+            novo.reservas = self._planejar(novo, matriz)
+            novos.append(novo)
+
+        self.pedidos[posicao:posicao] = novos
+        self._replanejar(posicao + len(novos), matriz, matriz.restante - antes)
+        return novos
+
+    def remover_pedido(self, posicao: int) -> PedidoPlanejado:
+        """
+        Remove o pedido da posição indicada e libera a sua capacidade.
+
+        Returns:
+            PedidoPlanejado: O pedido removido.
+        """
+        return self.remover_pedidos([posicao])[0]
+
+    def remover_pedidos(self, posicoes: list) -> list:
+        """
+        Remove os pedidos das posições indicadas e libera a sua capacidade. Os
+        pedidos seguintes são percorridos uma única vez para todo o lote.
+
+        Returns:
+            list: Os PedidoPlanejado removidos, na ordem do plano.
+        """
+        posicoes = sorted(set(posicoes))
+        if not posicoes:
+            return []
+        for posicao in posicoes:
+            if not 0 <= posicao < len(self.pedidos):
+                raise IndexError(f"Posição fora do plano: {posicao}")
+
+        removidos = [self.pedidos[posicao] for posicao in posicoes]
+        # Cada pedido removido libera a sua capacidade a partir da posição que ocupava
+        # (já descontados os removidos antes dele)
+        liberacoes = {}
+        for removidos_antes, posicao in enumerate(posicoes):
+            liberacoes.setdefault(posicao - removidos_antes, []).append(self.pedidos[posicao].reservas)
+
+        excluir = set(posicoes)
+        self.pedidos = [planejado for i, planejado in enumerate(self.pedidos) if i not in excluir]
+        matriz = self._matriz_ate(posicoes[0])
+        self._replanejar(posicoes[0], matriz, np.zeros_like(matriz.restante), liberacoes)
+        return removidos
+
+    def salvar(self, pasta_destino: str = DEFAULT_EXP_PATH, config_path: str = DEFAULT_CONFIG_PATH) -> str:
+        """
+        Grava o plano como uma nova versão em pasta_destino (e a cópia colunar, se
+        SNAPSHOT_PLANO estiver ativo, e a versão no banco de planos, se BANCO_PLANO estiver ativo).
+
+        Returns:
+            str or None: Caminho do plano salvo.
+        """
+        escritor = EscritorPlanoStreaming(carregar_modelo_plano(self.modelo_path), self.limites)
+        pedidos_snapshot = []
+        for planejado in self.pedidos:
+            dados = [planejado.dados.get(coluna) for coluna in ("PEDIDO", "ENTREGA", "CLIENTE", "PRODUTO", "QUANTIDADE")]
+            linha = escritor.escrever_pedido(dados, planejado.reservas, self.indice_datas)
+            pedidos_snapshot.append((linha, planejado.dados, planejado.reservas))
+
+        configuracao = carregar_configuracao(config_path)
+        snapshot = None
+        if configuracao.snapshot_plano:
+            snapshot = montar_snapshot(pedidos_snapshot, self.datas, self.limites)
+        caminho_plano = salvar_nova_versao(self.modelo_path, escritor.workbook, pasta_destino=pasta_destino,
+                                           config_path=config_path, snapshot=snapshot)
+        if caminho_plano and configuracao.banco_plano:
+            registrar_plano(caminho_plano, pedidos_snapshot, self.datas, self.limites)
+        return caminho_plano
+
+    def _matriz_ate(self, posicao: int) -> MatrizCapacidade:
+        """Capacidade restante vista pelo pedido da posição indicada."""
+        matriz = self._vazia.copia()
+        reservas = [reserva for planejado in self.pedidos[:posicao] for reserva in planejado.reservas]
+        matriz.registrar_reservas(reservas)
+        return matriz
+
+    def _planejar(self, planejado: PedidoPlanejado, matriz: MatrizCapacidade) -> list:
+        """Planeja o pedido sobre a matriz (que recebe as reservas), como em gerar_plano."""
+        if not planejado.dados.get("CORTE"):
+            logger.warning("Pedido %s sem TIPO DE CORTE. Pulando.", planejado.pedido)
+            return []
+        try:
+            resultado = planejar_pedido(
+                planejado.planejamento(), self.config_setores, self.calendario, matriz,
+                priorizar_estampa=self.configuracao.prioridade_estampa,
+                datas_planilha=self.indice_datas,
+            )
+        except Exception as e:
+            logger.error("Erro ao planejar o pedido %s: %s", planejado.pedido, e)
+            return []
+        return resultado.reservas
+
+    def _replanejar(self, inicio: int, matriz: MatrizCapacidade, delta: np.ndarray, liberacoes: dict = None):
+        """
+        Percorre os pedidos a partir de `inicio`, replanejando os que têm alguma
+        célula alterada (delta != 0) na sua janela.
+
+        Args:
+            inicio (int): Primeiro pedido após a alteração.
+            matriz (MatrizCapacidade): Capacidade vista pelo pedido `inicio`.
+            delta (np.ndarray): Diferença da capacidade restante em relação ao plano
+                anterior, no mesmo ponto da sequência.
+            liberacoes (dict): {posição: [reservas]} de pedidos removidos, cuja
+                capacidade passa a estar livre a partir daquela posição.
+        """
+        liberacoes = liberacoes or {}
+        ultima_liberacao = max(liberacoes, default=-1)
+        self.replanejados = 0
+
+        for posicao in range(inicio, len(self.pedidos)):
+            for reservas in liberacoes.get(posicao, []):
+                delta += _consumo(matriz, reservas)
+            if posicao > ultima_liberacao and not delta.any():
+                # Nenhuma célula alterada: os pedidos restantes não mudam
+                break
+
+            planejado = self.pedidos[posicao]
+            if not self._afetado(planejado, matriz, delta):
+                matriz.registrar_reservas(planejado.reservas)
+                continue
+
+            # O plano anterior descontou as reservas antigas; o novo desconta as novas
+            consumo_anterior = _consumo(matriz, planejado.reservas)
+            antes = matriz.restante.copy()
+            planejado.reservas = self._planejar(planejado, matriz)
+            self.replanejados += 1
+            delta += consumo_anterior - (antes - matriz.restante)
+
+        logger.info("Replanejamento incremental: %s pedido(s) replanejado(s)", self.replanejados)
+
+    def _afetado(self, planejado: PedidoPlanejado, matriz: MatrizCapacidade, delta: np.ndarray) -> bool:
+        """Verifica se alguma célula alterada está na janela consultada pelo motor para o pedido."""
+        dados = planejado.dados
+        if not dados.get("CORTE"):
+            return False
+        try:
+            setores = setores_do_pedido(dados["SETOR_INICIAL"], dados["CORTE"])
+        except (ValueError, AttributeError):
+            return False
+
+        # Setores sem limite não consultam a matriz
+        linhas = [matriz.setores.index(setor) for setor in setores
+                  if not self.config_setores[setor]['sem_limite']]
+        if not linhas:
+            return False
+
+        # A produção termina no dia em que o último setor conclui a quantidade;
+        # sem conclusão, o motor percorreu o calendário até o fim
+        concluido = sum(q for setor, _, q in planejado.reservas if setor == setores[-1]) >= dados["QUANTIDADE"]
+        fim = max(dia for _, dia, _ in planejado.reservas) if concluido and planejado.reservas else None
+
+        colunas = matriz.colunas_entre(normalizar_data_inicio(dados.get("INICIO")), fim)
+        return bool(delta[linhas, colunas].any())
+
+
+def _consumo(matriz: MatrizCapacidade, reservas: list) -> np.ndarray:
+    """Capacidade consumida pelas reservas em cada célula, sem alterar a matriz."""
+    consumo = np.zeros_like(matriz.restante)
+    if reservas:
+        referencia = matriz.copia()
+        referencia.restante = consumo
+        referencia.registrar_reservas(reservas, sinal=-1)
+    return consumo
+
+
+def _ler_snapshot(snapshot: pd.DataFrame):
+    """Retorna (pedidos, limites ou None, datas) a partir da cópia colunar."""
+    pedidos = []
+    for _, grupo in snapshot.sort_values("LINHA").groupby("LINHA", sort=True):
+        primeira = grupo.iloc[0]
+        dados = {coluna: _valor_python(primeira[coluna]) for coluna in COLUNAS_PEDIDO}
+        reservas = [
+            (setor, data.to_pydatetime(), int(qtd))
+            for setor, data, qtd in grupo[["SETOR", "DATA", "QTD"]].itertuples(index=False)
+            if pd.notna(setor) and pd.notna(data)
+        ]
+        pedidos.append(PedidoPlanejado(dados, reservas))
+
+    datas = [pd.Timestamp(data).to_pydatetime() for data in snapshot.attrs.get("datas", [])]
+    return pedidos, snapshot.attrs.get("limites"), datas
+
+
+def _valor_python(valor):
+    """Converte escalares do pandas/NumPy para tipos do Python (NaN vira None)."""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    return valor.item() if hasattr(valor, "item") else valor
+
+
+def _ler_limites(caminho_plano: str) -> list:
+    """Lê apenas os limites diários [E3:E12] do plano."""
+    wb = load_workbook(caminho_plano, read_only=True, data_only=True)
+    try:
+        linhas = wb.active.iter_rows(min_row=3, max_row=2 + len(SETOR_ORDEM), min_col=5, max_col=5, values_only=True)
+        return [float(valor or 0) for (valor,) in linhas]
+    finally:
+        wb.close()
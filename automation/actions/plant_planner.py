@@ -0,0 +1,198 @@
+"""
+Planejamento de várias linhas de produção (plantas) em paralelo.
+
+Cada planta tem o seu arquivo de configuração (capacidades, CARGA etc.), o seu
+calendário, a sua planilha modelo e o seu subconjunto de pedidos. As plantas são
+planejadas em processos separados, cada uma com gerar_plano sobre os seus
+próprios arquivos, e cada uma grava o seu plano em uma pasta própria
+(padrão: exp/<planta>/). O resultado é a tabela de pedidos consolidada, com a
+coluna PLANTA, e um resumo por planta.
+
+Uso:
+    plantas = carregar_perfis_plantas("plantas.json")
+    df_consolidado, resumo = planejar_plantas(df_priorizado, plantas)
+
+Formato do arquivo de plantas (caminhos relativos à pasta de execução):
+    [
+        {"nome": "linha1", "config": "data/linha1/_CONFIG.csv", "modelo": "model/linha1.xlsx",
+         "pedidos": ["P-10", "P-23"]},
+        {"nome": "linha2", "config": "data/linha2/_CONFIG.csv", "calendario": "data/linha2/_CALENDARIO.csv"}
+    ]
+"""
+
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import pandas as pd
+
+from automation.actions.create_plan import gerar_plano
+from automation.core.constants import DEFAULT_CALENDARIO_PATH, DEFAULT_CONFIG_PATH, DEFAULT_EXP_PATH, DEFAULT_MODELO_PATH
+from automation.validators.report_validator import validar_prazo
+
+COLUNAS_RESUMO = ["PLANTA", "PEDIDOS", "ATRASADOS", "NAO PLANEJADOS", "CARGA", "ULTIMO DIA", "PLANO"]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PerfilPlanta:
+    """
+    Arquivos e pedidos de uma linha de produção.
+
+    Attributes:
+        nome (str): Nome da planta (coluna PLANTA e pasta de saída padrão).
+        config_path (str): Arquivo de configuração CSV da planta.
+        calendario_path (str): Calendário de dias úteis da planta.
+        modelo_path (str): Planilha modelo da planta.
+        pasta_destino (str): Pasta do plano (padrão: exp/<nome>/).
+        pedidos (tuple): Pedidos (coluna PEDIDO) da planta. None recebe os pedidos
+            não atribuídos a nenhuma outra planta.
+    """
+
+    nome: str
+    config_path: str = DEFAULT_CONFIG_PATH
+    calendario_path: str = DEFAULT_CALENDARIO_PATH
+    modelo_path: str = DEFAULT_MODELO_PATH
+    pasta_destino: str = None
+    pedidos: tuple = None
+
+    @property
+    def destino(self) -> str:
+        return self.pasta_destino or os.path.join(DEFAULT_EXP_PATH, self.nome)
+
+
+def carregar_perfis_plantas(caminho: str) -> list:
+    """
+    Lê os perfis das plantas de um arquivo JSON (ver o formato no início do módulo).
+
+    Returns:
+        list: Lista de PerfilPlanta.
+
+    Raises:
+        ValueError: Se o arquivo não for uma lista de plantas com nome.
+    """
+    with open(caminho, encoding="utf-8") as arquivo:
+        dados = json.load(arquivo)
+    if not isinstance(dados, list) or not dados:
+        raise ValueError(f"O arquivo de plantas deve conter uma lista de plantas: {caminho}")
+
+    plantas = []
+    for item in dados:
+        if not isinstance(item, dict) or not item.get("nome"):
+            raise ValueError(f"Planta sem 'nome' no arquivo {caminho}: {item}")
+        pedidos = item.get("pedidos")
+        plantas.append(PerfilPlanta(
+            nome=str(item["nome"]),
+            config_path=item.get("config", DEFAULT_CONFIG_PATH),
+            calendario_path=item.get("calendario", DEFAULT_CALENDARIO_PATH),
+            modelo_path=item.get("modelo", DEFAULT_MODELO_PATH),
+            pasta_destino=item.get("destino"),
+            pedidos=tuple(str(pedido) for pedido in pedidos) if pedidos is not None else None,
+        ))
+    return plantas
+
+
+def dividir_pedidos(df: pd.DataFrame, plantas: list) -> dict:
+    """
+    Distribui os pedidos entre as plantas, mantendo a ordem de prioridade.
+
+    Returns:
+        dict: {nome da planta: DataFrame com os pedidos da planta}
+
+    Raises:
+        ValueError: Se houver plantas com o mesmo nome ou um pedido atribuído a mais de uma planta.
+    """
+    nomes = [planta.nome for planta in plantas]
+    if len(set(nomes)) != len(nomes):
+        raise ValueError(f"Nomes de planta repetidos: {nomes}")
+
+    codigos = df["PEDIDO"].astype(str)
+    atribuidos = {}
+    for planta in plantas:
+        for pedido in planta.pedidos or ():
+            if pedido in atribuidos:
+                raise ValueError(f"Pedido {pedido} atribuído às plantas {atribuidos[pedido]} e {planta.nome}.")
+            atribuidos[pedido] = planta.nome
+
+    ausentes = set(atribuidos) - set(codigos)
+    if ausentes:
+        logger.warning("Pedidos das plantas não encontrados na tabela: %s", sorted(ausentes))
+
+    restantes = ~codigos.isin(list(atribuidos))
+    return {
+        planta.nome: df[codigos.isin(planta.pedidos) if planta.pedidos is not None else restantes].reset_index(drop=True)
+        for planta in plantas
+    }
+
+
+def planejar_plantas(df_priorizado: pd.DataFrame, plantas: list, workers: int = None, streaming: bool = False):
+    """
+    Planeja cada planta com os seus arquivos, em paralelo, e consolida o resultado.
+
+    Args:
+        df_priorizado (pd.DataFrame): Pedidos na ordem de prioridade.
+        plantas (list): Lista de PerfilPlanta.
+        workers (int): Processos usados. None usa um por planta (limitado pelo
+            número de CPUs); 1 planeja em sequência no próprio processo.
+        streaming (bool): Grava os planos bloco a bloco (ver gerar_plano).
+
+    Returns:
+        tuple: (pedidos de todas as plantas validados por validar_prazo, com a coluna
+            PLANTA; resumo por planta com as colunas de COLUNAS_RESUMO)
+    """
+    pedidos_plantas = dividir_pedidos(df_priorizado, plantas)
+    tarefas = [(planta, pedidos_plantas[planta.nome], streaming) for planta in plantas]
+
+    if workers is None:
+        workers = min(len(tarefas), os.cpu_count() or 1)
+
+    if workers <= 1:
+        resultados = [_planejar_planta(*tarefa) for tarefa in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            resultados = list(executor.map(_planejar_planta, *zip(*tarefas)))
+
+    tabelas = []
+    resumo = []
+    for planta, (df_validado, carga, caminho_plano) in zip(plantas, resultados):
+        df_validado.insert(0, "PLANTA", planta.nome)
+        tabelas.append(df_validado)
+        resumo.append(_resumir_planta(planta.nome, df_validado, carga, caminho_plano))
+
+    df_consolidado = pd.concat(tabelas, ignore_index=True) if tabelas else df_priorizado.iloc[0:0]
+    return df_consolidado, pd.DataFrame(resumo, columns=COLUNAS_RESUMO)
+
+
+def _planejar_planta(planta: PerfilPlanta, df_planta: pd.DataFrame, streaming: bool) -> tuple:
+    """Gera e valida o plano de uma planta. Executado no processo de trabalho."""
+    if df_planta.empty:
+        logger.warning("Planta %s sem pedidos; nenhum plano gerado.", planta.nome)
+        return validar_prazo(df_planta.assign(**{"ULTIMO DIA": pd.NaT}), planta.calendario_path), None, None
+
+    df_produzido, carga, caminho_plano = gerar_plano(
+        df_planta,
+        modelo_path=planta.modelo_path,
+        calendario_path=planta.calendario_path,
+        pasta_destino=planta.destino,
+        config_path=planta.config_path,
+        streaming=streaming,
+    )
+    return validar_prazo(df_produzido, calendario_path=planta.calendario_path), carga, caminho_plano
+
+
+def _resumir_planta(nome: str, df_validado: pd.DataFrame, carga, caminho_plano) -> list:
+    """Retorna os valores de COLUNAS_RESUMO de uma planta."""
+    ultimos = pd.to_datetime(df_validado["ULTIMO DIA"])
+    ultimo_dia = ultimos.max()
+    return [
+        nome,
+        len(df_validado),
+        int((df_validado["PRAZO"] == "❌").sum()),
+        int(ultimos.isna().sum()),
+        carga,
+        ultimo_dia.strftime("%d/%m/%Y") if pd.notna(ultimo_dia) else None,
+        caminho_plano,
+    ]
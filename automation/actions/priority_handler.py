@@ -1,39 +1,138 @@
-from InquirerPy import inquirer
+# Critérios de ordenação disponíveis sem interação (ex.: linha de comando)
+CRITERIOS_PRIORIDADE = {
+    "none": "Não priorizar",
+    "due-date": "Priorizar por prazo de entrega",
+    "quantity": "Priorizar por quantidade de produção",
+}
+
+
+def ordenar_pedidos(df, criterio: str):
+    """
+    Ordena os pedidos conforme um critério, sem interação com o usuário.
+
+    Args:
+        df (pd.DataFrame): Tabela de pedidos formatada.
+        criterio (str): Uma das chaves de CRITERIOS_PRIORIDADE.
+
+    Returns:
+        pd.DataFrame: Tabela ordenada com índice reiniciado.
+    """
+    if criterio == "none":
+        # Retorna a tabela sem nenhuma modificação
+        return df.reset_index(drop=True)
+
+    elif criterio == "due-date":
+        # Ordena por "ENTREGA" em ordem crescente (pela data, não pelo texto DD/MM/AAAA)
+        return df.iloc[ordem_por_entrega(df)].reset_index(drop=True)
+
+    elif criterio == "quantity":
+        # Ordena por "QUANTIDADE" em ordem crescente
+        return df.sort_values(by="QUANTIDADE", ascending=True).reset_index(drop=True)
+
+    raise ValueError(f"Critério de prioridade '{criterio}' não reconhecido. Deve ser um dos: {list(CRITERIOS_PRIORIDADE)}")
+
+
+def ordem_por_entrega(df) -> list:
+    """
+    Retorna as posições dos pedidos ordenadas pela data de entrega.
+
+    ENTREGA pode ser datetime64 ou texto DD/MM/AAAA. Pedidos com a mesma data
+    mantêm a ordem original e datas ausentes ou inválidas ficam no final.
+
+    Returns:
+        list: Posições (0 a len(df) - 1) na ordem de entrega.
+    """
+    import pandas as pd
+
+    entregas = pd.to_datetime(df["ENTREGA"].reset_index(drop=True), format="%d/%m/%Y", errors="coerce")
+    return entregas.sort_values(kind="stable", na_position="last").index.tolist()
+
 
 def definir_prioridade(df):
+    from InquirerPy import inquirer
+
     escolha = inquirer.select(
         message="Como você quer definir a prioridade da produção?",
         choices=[
             "Não priorizar",
             "Priorizar por prazo de entrega",
             "Priorizar por quantidade de produção",
-            "Definir manualmente a ordem de produção"
+            "Definir manualmente a ordem de produção",
+            "Otimizar a ordem de produção (menos atrasos)",
+            "Comparar cenários de prioridade"
         ]
     ).execute()
 
-    if escolha == "Não priorizar":
-        # Retorna a tabela sem nenhuma modificação
-        return df.reset_index(drop=True)
-
-    elif escolha == "Priorizar por prazo de entrega":
-        # Ordena por "ENTREGA" em ordem decrescente
-        df_ordenado = df.sort_values(by="ENTREGA", ascending=True).reset_index(drop=True)
-        return df_ordenado
+    for criterio, descricao in CRITERIOS_PRIORIDADE.items():
+        if escolha == descricao:
+            return ordenar_pedidos(df, criterio)
 
-    elif escolha == "Priorizar por quantidade de produção":
-        # Ordena por "QUANTIDADE" em ordem decrescente
-        df_ordenado = df.sort_values(by="QUANTIDADE", ascending=True).reset_index(drop=True)
-        return df_ordenado
-
-    elif escolha == "Definir manualmente a ordem de produção":
+    if escolha == "Definir manualmente a ordem de produção":
         # Chama a função para definir a ordem manualmente
         return definir_ordem_manual(df)
 
+    if escolha == "Otimizar a ordem de produção (menos atrasos)":
+        return otimizar_prioridade(df)
+
+    if escolha == "Comparar cenários de prioridade":
+        return escolher_cenario(df)
+
+
+def otimizar_prioridade(df):
+    """Busca uma ordem de produção com menos pedidos atrasados (ver actions.priority_optimizer)."""
+    from automation.actions.priority_optimizer import TEMPO_LIMITE_PADRAO, otimizar_ordem
+
+    print(f"\n⏳ Otimizando a ordem de produção (até {TEMPO_LIMITE_PADRAO:.0f} s)...\n")
+    try:
+        df_otimizado, resumo = otimizar_ordem(df)
+    except Exception as e:
+        print(f"\nErro ao otimizar a ordem: {e}\n")
+        print("\nMantendo a ordem original.\n")
+        return df
+
+    print(f"✅ Atrasados: {resumo['atrasados_inicial']} -> {resumo['atrasados']} | "
+          f"Dias de atraso: {resumo['atraso_inicial']} -> {resumo['atraso']} "
+          f"({resumo['avaliacoes']} ordens avaliadas)\n")
+    return df_otimizado
+
+
+def escolher_cenario(df, amostras_aleatorias: int = 3):
+    """
+    Planeja os critérios de prioridade e algumas ordens aleatórias em paralelo,
+    exibe a comparação e retorna a tabela na ordem do cenário escolhido.
+    """
+    from InquirerPy import inquirer
+    from tabulate import tabulate
+    from automation.actions.scenario_runner import gerar_cenarios, comparar_cenarios, aplicar_cenario
+
+    cenarios = gerar_cenarios(df, amostras_aleatorias=amostras_aleatorias)
+    print("\n⏳ Comparando cenários...\n")
+    try:
+        tabela = comparar_cenarios(df, cenarios)
+    except Exception as e:
+        print(f"\nErro ao comparar os cenários: {e}\n")
+        print("\nMantendo a ordem original.\n")
+        return df
+
+    print(tabulate(tabela, headers="keys", tablefmt="grid", showindex=False))
+
+    nome = inquirer.select(
+        message="Qual cenário você quer usar?",
+        choices=[
+            {"name": f"{CRITERIOS_PRIORIDADE.get(cenario, cenario)} ({atrasados} atrasado(s))", "value": cenario}
+            for cenario, atrasados in zip(tabela["CENARIO"], tabela["ATRASADOS"])
+        ]
+    ).execute()
+    return aplicar_cenario(df, cenarios[nome])
+
 
 def definir_ordem_manual(df):
+    from InquirerPy import inquirer
+    from automation.core.calendar_utils import formatar_data
+
     print("\nPedidos disponíveis para ordenar:\n")
     for i, row in df.iterrows():
-        print(f"{i+1}. Pedido {row['PEDIDO']} - {row['PRODUTO']} - Entrega: {row['ENTREGA']}")
+        print(f"{i+1}. Pedido {row['PEDIDO']} - {row['PRODUTO']} - Entrega: {formatar_data(row['ENTREGA'])}")
 
     nova_ordem_str = inquirer.text(
         message="\nDigite os números na nova ordem desejada (ex: 3,1,2,5,4,6):\n"
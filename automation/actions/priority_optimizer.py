@@ -0,0 +1,239 @@
+"""
+Otimização automática da ordem de prioridade (busca local).
+
+Parte da melhor ordem entre a importada e a por prazo de entrega (EDD) e testa
+movimentos aleatórios (mover um pedido atrasado para uma posição anterior ou
+trocar dois pedidos de posição) até o limite de tempo, mantendo os que não pioram
+o custo. O custo é (pedidos atrasados, dias de atraso somados); um pedido que não
+termina dentro do calendário conta como atrasado até o último dia do calendário.
+
+Cada avaliação replaneja apenas os pedidos a partir da primeira posição alterada:
+o estado da matriz de capacidade é guardado a cada `intervalo` posições e as
+reservas de cada pedido da ordem atual ficam em cache, de forma que o prefixo não
+alterado é reconstruído sem chamar o motor. A avaliação é interrompida assim que
+o custo parcial passa do custo atual.
+
+Uso:
+    df_otimizado, resumo = otimizar_ordem(df_formatado, tempo_limite=10)
+"""
+
+import random
+import time
+
+import pandas as pd
+
+from automation.actions.priority_handler import ordem_por_entrega
+from automation.actions.scenario_runner import ContextoCenarios, aplicar_cenario, preparar_contexto
+from automation.core.constants import DEFAULT_CALENDARIO_PATH, DEFAULT_CONFIG_PATH, DEFAULT_MODELO_PATH
+from automation.core.excel_utils import normalizar_data
+from automation.core.scheduling_engine import planejar_pedido
+
+TEMPO_LIMITE_PADRAO = 10.0
+
+
+class OtimizadorPrioridade:
+    """Busca local sobre a ordem dos pedidos com cache do planejamento do prefixo."""
+
+    def __init__(self, contexto: ContextoCenarios, intervalo: int = None):
+        """
+        Args:
+            contexto (ContextoCenarios): Pedidos, limites, calendário e matriz vazia.
+            intervalo (int): Posições entre dois estados guardados da matriz
+                (padrão: cerca de 50 estados por ordem).
+        """
+        self.contexto = contexto
+        self.total = len(contexto.pedidos)
+        self.intervalo = intervalo or max(1, self.total // 50)
+        self.fim_calendario = normalizar_data(contexto.calendario.ultimo_dia)
+        self.avaliacoes = 0
+        self.pedidos_planejados = 0
+
+        self.ordem = None
+        self.custo = None
+        self._reservas = []
+        self._acumulado = [(0, 0)]
+        self._estados = []
+
+    def definir_ordem(self, ordem: list):
+        """Planeja a ordem completa e a torna a ordem atual."""
+        avaliacao = self._avaliar(ordem, 0)
+        self._aceitar(ordem, 0, avaliacao)
+
+    def avaliar(self, ordem: list) -> tuple:
+        """Retorna o custo de uma ordem qualquer, sem alterar a ordem atual."""
+        return self._avaliar(ordem, 0)[0]
+
+    def otimizar(self, tempo_limite: float = TEMPO_LIMITE_PADRAO, max_avaliacoes: int = None, semente: int = 0):
+        """
+        Melhora a ordem atual até o limite de tempo ou de avaliações.
+
+        Returns:
+            tuple: (ordem, custo)
+        """
+        rnd = random.Random(semente)
+        prazo = time.perf_counter() + tempo_limite
+
+        while self.custo[0] > 0 and self.total > 1:
+            if time.perf_counter() >= prazo:
+                break
+            if max_avaliacoes is not None and self.avaliacoes >= max_avaliacoes:
+                break
+
+            candidata, inicio = self._movimento(rnd)
+            avaliacao = self._avaliar(candidata, inicio, teto=self.custo)
+            if avaliacao is not None:
+                self._aceitar(candidata, inicio, avaliacao)
+
+        return list(self.ordem), self.custo
+
+    def _movimento(self, rnd: random.Random):
+        """Gera uma ordem vizinha e a primeira posição alterada."""
+        ordem = list(self.ordem)
+        atrasados = [k for k in range(1, self.total) if self._contribuicao(k)[0]]
+
+        if atrasados and rnd.random() < 0.7:
+            # Antecipa um pedido atrasado
+            origem = rnd.choice(atrasados)
+            destino = rnd.randrange(origem)
+            ordem.insert(destino, ordem.pop(origem))
+            return ordem, destino
+
+        i, j = sorted(rnd.sample(range(self.total), 2))
+        ordem[i], ordem[j] = ordem[j], ordem[i]
+        return ordem, i
+
+    def _contribuicao(self, k: int) -> tuple:
+        anterior, atual = self._acumulado[k], self._acumulado[k + 1]
+        return atual[0] - anterior[0], atual[1] - anterior[1]
+
+    def _avaliar(self, ordem: list, inicio: int, teto: tuple = None):
+        """
+        Planeja a ordem a partir de `inicio`, reaproveitando o prefixo da ordem atual.
+
+        Returns:
+            tuple or None: (custo, reservas, acumulado e estados a partir de inicio),
+                ou None se o custo parcial passou do teto.
+        """
+        self.avaliacoes += 1
+        contexto = self.contexto
+        matriz = contexto.matriz.copia()
+
+        # Reconstrói o estado da matriz antes de `inicio`
+        base = (inicio // self.intervalo) * self.intervalo
+        if base:
+            matriz.restante = self._estados[base // self.intervalo].copy()
+        for k in range(base, inicio):
+            matriz.registrar_reservas(self._reservas[k])
+
+        atrasados, atraso = self._acumulado[inicio]
+        reservas_novas = []
+        acumulado_novo = []
+        estados_novos = []
+
+        for k in range(inicio, self.total):
+            if k % self.intervalo == 0:
+                estados_novos.append(matriz.restante.copy())
+
+            posicao = ordem[k]
+            reservas, atrasado, dias = self._planejar(posicao, matriz)
+            atrasados += atrasado
+            atraso += dias
+            reservas_novas.append(reservas)
+            acumulado_novo.append((atrasados, atraso))
+
+            if teto is not None and (atrasados, atraso) > teto:
+                return None
+
+        return (atrasados, atraso), reservas_novas, acumulado_novo, estados_novos
+
+    def _planejar(self, posicao: int, matriz) -> tuple:
+        """Planeja um pedido sobre a matriz e retorna (reservas, atrasado, dias de atraso)."""
+        contexto = self.contexto
+        pedido = contexto.pedidos[posicao]
+        if pedido is None:
+            return [], 0, 0
+
+        self.pedidos_planejados += 1
+        try:
+            resultado = planejar_pedido(
+                pedido,
+                contexto.config_setores,
+                contexto.calendario,
+                matriz,
+                priorizar_estampa=contexto.priorizar_estampa,
+                datas_planilha=contexto.indice_datas,
+            )
+        except Exception:
+            return [], 0, 0
+
+        entrega = contexto.entregas[posicao]
+        if entrega is None:
+            return resultado.reservas, 0, 0
+
+        if resultado.ultimo_dia is None:
+            # Não termina dentro do calendário
+            return resultado.reservas, 1, max(1, (self.fim_calendario - entrega).days)
+
+        fim = normalizar_data(resultado.ultimo_dia)
+        if fim > entrega:
+            return resultado.reservas, 1, (fim - entrega).days
+        return resultado.reservas, 0, 0
+
+    def _aceitar(self, ordem: list, inicio: int, avaliacao: tuple):
+        """Torna a ordem avaliada a ordem atual, substituindo o cache a partir de inicio."""
+        custo, reservas, acumulado, estados = avaliacao
+        primeiro_estado = -(-inicio // self.intervalo)
+
+        self.ordem = ordem
+        self.custo = custo
+        self._reservas[inicio:] = reservas
+        self._acumulado[inicio + 1:] = acumulado
+        self._estados[primeiro_estado:] = estados
+
+
+def otimizar_ordem(
+        df: pd.DataFrame,
+        tempo_limite: float = TEMPO_LIMITE_PADRAO,
+        max_avaliacoes: int = None,
+        semente: int = 0,
+        modelo_path: str = DEFAULT_MODELO_PATH,
+        calendario_path: str = DEFAULT_CALENDARIO_PATH,
+        config_path: str = DEFAULT_CONFIG_PATH
+    ):
+    """
+    Otimiza a ordem de prioridade dos pedidos para reduzir os atrasos.
+
+    Args:
+        df (pd.DataFrame): Tabela de pedidos formatada (processar_tabela).
+        tempo_limite (float): Tempo máximo da busca, em segundos.
+        max_avaliacoes (int): Número máximo de ordens avaliadas (opcional; com
+            ele e a mesma semente o resultado não depende da velocidade da máquina).
+        semente (int): Semente dos movimentos aleatórios.
+
+    Returns:
+        tuple: (tabela na ordem otimizada, resumo com o custo inicial e o final)
+    """
+    df = df.reset_index(drop=True)
+    contexto = preparar_contexto(df, modelo_path, calendario_path, config_path)
+    otimizador = OtimizadorPrioridade(contexto)
+
+    # Ponto de partida: a melhor entre a ordem importada e a por prazo de entrega
+    iniciais = {"none": list(range(len(df))), "due-date": ordem_por_entrega(df)}
+    custos = {criterio: otimizador.avaliar(ordem) for criterio, ordem in iniciais.items()}
+    partida = min(custos, key=custos.get)
+    otimizador.definir_ordem(iniciais[partida])
+
+    inicio = time.perf_counter()
+    ordem, custo = otimizador.otimizar(tempo_limite, max_avaliacoes, semente)
+
+    resumo = {
+        "partida": partida,
+        "atrasados_inicial": custos[partida][0],
+        "atraso_inicial": custos[partida][1],
+        "atrasados": custo[0],
+        "atraso": custo[1],
+        "avaliacoes": otimizador.avaliacoes,
+        "pedidos_planejados": otimizador.pedidos_planejados,
+        "tempo_s": round(time.perf_counter() - inicio, 2),
+    }
+    return aplicar_cenario(df, ordem), resumo
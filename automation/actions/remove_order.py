@@ -3,12 +3,19 @@ import os
 from InquirerPy import inquirer
 from datetime import datetime
 from automation.ui.table_renderer import processar_tabela
+from automation.core.calendar_utils import formatar_datas
+from automation.core.plan_snapshot import pedidos_do_snapshot
+from automation.core.plan_store import carregar_tabela_plano
 
 def excluir_pedido(arquivo_path: str):
     arquivo_path = os.path.join('exp', arquivo_path)
 
-    # Usa a função processar_tabela para carregar e formatar o DataFrame
-    df_formatado, _ = processar_tabela(arquivo_path)
+    # Usa o banco de planos ou a cópia colunar, se houver; senão processar_tabela carrega e formata a planilha
+    snapshot = carregar_tabela_plano(arquivo_path)
+    if snapshot is not None:
+        df_formatado = pedidos_do_snapshot(snapshot)
+    else:
+        df_formatado, _ = processar_tabela(arquivo_path)
 
     # Cria identificadores únicos baseados nas colunas relevantes
     df_formatado["Identificador"] = (
@@ -38,6 +45,6 @@ def excluir_pedido(arquivo_path: str):
         # Salva o novo arquivo Excel
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_file = f"planejamentoproducao_atualizado_{timestamp}.xlsx"
-        df_formatado.to_excel(output_file, index=False)
+        formatar_datas(df_formatado).to_excel(output_file, index=False)
 
         print(f"Produção removida com sucesso! Arquivo salvo como {output_file}")
\ No newline at end of file
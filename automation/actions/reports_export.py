@@ -1,14 +1,73 @@
 import pandas as pd
-from openpyxl import load_workbook
+from openpyxl import Workbook
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import os
 from automation.core.constants import SETOR_ORDEM
+from automation.core.plan_snapshot import ler_plano_planilha, tabela_setores
+from automation.core.plan_store import carregar_tabela_plano
+from automation.core.instrumentation import cronometrado
 
-def gerar_relatorio_arquivo(arquivo_path: str):
+def _ler_cabecalho_e_setores(arquivo_full_path):
+    """
+    Retorna (linha de cabeçalho, linhas de setor) do plano.
+
+    As linhas são sempre reconstruídas da tabela longa do plano (tabela_setores),
+    lida do banco de planos ou da cópia colunar quando existirem e estiverem
+    atualizados, ou da planilha. Assim, as colunas A a G não dependem das fórmulas
+    da planilha nem de qual cópia do plano existe.
+    """
+    tabela = carregar_tabela_plano(arquivo_full_path)
+    if tabela is not None:
+        print("⚡ Usando o plano registrado (banco ou cópia colunar)")
+    else:
+        tabela = ler_plano_planilha(arquivo_full_path)
+    cabecalho, df_body = tabela_setores(tabela)
+    return pd.DataFrame([cabecalho]), df_body
+
+def _converter_cabecalho(cabecalho: pd.DataFrame) -> pd.DataFrame:
+    """Converte as datas do cabeçalho (a partir da coluna H) para DD/MM."""
+    cabecalho = cabecalho.astype(object)
+    for col_idx in range(7, cabecalho.shape[1]):
+        valor = cabecalho.iat[0, col_idx]
+        if isinstance(valor, datetime) and pd.notna(valor):
+            cabecalho.iat[0, col_idx] = valor.strftime('%d/%m')
+    return cabecalho
+
+def _salvar_relatorio_setor(df_final: pd.DataFrame, output_path: str) -> str:
+    """
+    Grava o relatório de um setor (executado em um processo separado).
+
+    Usa um workbook write-only: as células vazias (a maior parte das colunas de
+    datas) não são criadas, o que torna a gravação muito mais rápida que to_excel.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    for row in df_final.itertuples(index=False, name=None):
+        ws.append([None if pd.isna(valor) else valor for valor in row])
+    wb.save(output_path)
+    return output_path
+
+@cronometrado()
+def gerar_relatorio_arquivo(arquivo_path: str, pasta_origem: str = 'exp', interativo: bool = True, workers: int = None):
+    """
+    Gera uma planilha por setor a partir de um plano salvo.
+
+    O plano é lido uma única vez (do banco ou da cópia colunar, se houver); cada setor é
+    selecionado por máscara sobre as linhas de pedidos e os arquivos são
+    gravados em paralelo.
+
+    Args:
+        arquivo_path (str): Nome (ou caminho) do plano; é procurado em pasta_origem.
+        pasta_origem (str): Pasta onde estão os planos (padrão: exp).
+        interativo (bool): Se False, não aguarda o ENTER ao final.
+        workers (int): Processos usados na gravação. None usa um por setor (limitado
+            pelo número de CPUs); 1 grava em sequência no próprio processo.
+    """
     print("Iniciou função de exportar arquivo")
     print(f"Arquivo base: {arquivo_path}")
 
-    arquivo_full_path = os.path.join('exp', os.path.basename(arquivo_path))
+    arquivo_full_path = os.path.join(pasta_origem, os.path.basename(arquivo_path))
     print(f"Arquivo completo com rota: {arquivo_full_path}")
 
     setores = SETOR_ORDEM
@@ -17,58 +76,36 @@ def gerar_relatorio_arquivo(arquivo_path: str):
     output_dir = os.path.join(os.path.dirname(arquivo_full_path), nome_base)
     os.makedirs(output_dir, exist_ok=True)
 
-    wb = load_workbook(arquivo_full_path, data_only=True)
-    ws = wb.active
-    data = [[cell.value for cell in row] for row in ws.iter_rows()]
-    df_base = pd.DataFrame(data)
+    df_head, df_body = _ler_cabecalho_e_setores(arquivo_full_path)
 
+    # Cabeçalho com as datas convertidas uma única vez para todos os setores
+    df_head = _converter_cabecalho(df_head)
+    linhas_validas = df_body[0].notna() | df_body[4].notna()
+
+    relatorios = []
     for setor in setores:
         print(f"Processando setor: {setor}")
-        df_setor = df_base.copy()
-        df_setor.drop(index=range(2, 12), inplace=True, errors='ignore')
-        df_setor.iloc[0, 6:] = df_setor.iloc[0, 6:].fillna("")
-
-        df_head = df_setor.iloc[1:2]
-        df_body = df_setor.iloc[2:]
-
-        df_filtered = df_body[
-            (df_body[6] == setor) &
-            (df_body[0].notna() | df_body[4].notna())
-        ]
-
-        df_final = pd.concat([df_head, df_filtered])
-
-        # Resetar índices para facilitar o processamento
-        df_final = df_final.reset_index(drop=True)
-        
-        # Criar um novo DataFrame convertendo todas as colunas para evitar warnings
-        dados_convertidos = []
-        
-        for row_idx in range(len(df_final)):
-            linha_convertida = []
-            for col_idx in range(df_final.shape[1]):
-                valor = df_final.iat[row_idx, col_idx]
-                
-                # Se for uma coluna de data (a partir do índice 7) e for datetime, converter
-                if col_idx >= 7 and isinstance(valor, datetime) and pd.notna(valor):
-                    linha_convertida.append(valor.strftime('%d/%m'))
-                else:
-                    linha_convertida.append(valor)
-            
-            dados_convertidos.append(linha_convertida)
-        
-        # Criar novo DataFrame com os dados convertidos
-        df_final = pd.DataFrame(dados_convertidos)
+        df_filtered = df_body[(df_body[6] == setor) & linhas_validas]
+        df_final = pd.concat([df_head, df_filtered], ignore_index=True)
 
         output_filename = f"planejamento_{setor}.xlsx"
-        output_path = os.path.join(output_dir, output_filename)
+        relatorios.append((df_final, os.path.join(output_dir, output_filename)))
+
+    if workers is None:
+        workers = min(len(relatorios), os.cpu_count() or 1)
 
-        df_final.to_excel(output_path, index=False, header=False)
+    if workers <= 1:
+        caminhos = [_salvar_relatorio_setor(df_final, output_path) for df_final, output_path in relatorios]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            caminhos = list(executor.map(_salvar_relatorio_setor, *zip(*relatorios)))
 
+    for output_path in caminhos:
         print(f"  ✔ Arquivo salvo: {output_path}")
 
     print("\n" + "="*50)
     print("✅ PROCESSO CONCLUÍDO COM SUCESSO!")
     print(f"📁 Todos os relatórios foram salvos em: {output_dir}")
     print("="*50)
-    input("\nPressione ENTER para voltar ao menu inicial...")
\ No newline at end of file
+    if interativo:
+        input("\nPressione ENTER para voltar ao menu inicial...")
@@ -0,0 +1,255 @@
+"""
+Comparação de cenários de prioridade ("e se?").
+
+Cada cenário é uma ordem dos pedidos importados (por prazo, por quantidade, como
+importado, listas manuais ou amostras aleatórias). Todos são planejados pelo
+motor, sem gravar planilhas, cada um sobre uma cópia independente da matriz de
+capacidade, em paralelo. O resultado é uma tabela com os pedidos atrasados, o
+delay total e o último dia usado em cada cenário.
+
+Uso:
+    cenarios = gerar_cenarios(df_formatado, amostras_aleatorias=5)
+    tabela = comparar_cenarios(df_formatado, cenarios)
+    df_priorizado = aplicar_cenario(df_formatado, cenarios[tabela.iloc[0]["CENARIO"]])
+"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from automation.actions.priority_handler import CRITERIOS_PRIORIDADE, ordem_por_entrega, ordenar_pedidos
+from automation.core.calendar_utils import CalendarioUteis, carregar_calendario_uteis
+from automation.core.capacity_ledger import MatrizCapacidade
+from automation.core.config import carregar_configuracao
+from automation.core.constants import DEFAULT_CALENDARIO_PATH, DEFAULT_CONFIG_PATH, DEFAULT_MODELO_PATH
+from automation.core.excel_utils import IndiceDatasPlanilha, normalizar_data
+from automation.core.production_planner import montar_config_setores
+from automation.core.scheduling_engine import PedidoPlanejamento, planejar_pedido, normalizar_data_inicio
+
+COLUNAS_COMPARACAO = ["CENARIO", "ATRASADOS", "DELAY TOTAL", "ULTIMO DIA", "NAO PLANEJADOS"]
+
+
+@dataclass
+class ContextoCenarios:
+    """Entradas comuns a todos os cenários, enviadas uma única vez a cada processo."""
+
+    pedidos: list
+    entregas: list
+    config_setores: dict
+    calendario: CalendarioUteis
+    matriz: MatrizCapacidade
+    indice_datas: IndiceDatasPlanilha
+    priorizar_estampa: bool
+
+
+def gerar_cenarios(
+        df: pd.DataFrame,
+        criterios=tuple(CRITERIOS_PRIORIDADE),
+        ordens_manuais: dict = None,
+        amostras_aleatorias: int = 0,
+        semente: int = 0
+    ) -> dict:
+    """
+    Monta os cenários a comparar como {nome: posições dos pedidos em df}.
+
+    Args:
+        df (pd.DataFrame): Tabela de pedidos formatada (processar_tabela).
+        criterios (list): Critérios de CRITERIOS_PRIORIDADE (padrão: todos).
+        ordens_manuais (dict): {nome: [valores de PEDIDO]}. Os pedidos não listados
+            seguem ao final, na ordem importada.
+        amostras_aleatorias (int): Número de ordens aleatórias.
+        semente (int): Semente das ordens aleatórias.
+
+    Returns:
+        dict: {nome do cenário: lista de posições}
+    """
+    df = df.reset_index(drop=True)
+    posicoes = df.assign(_POSICAO=range(len(df)))
+    # O cenário por prazo de entrega ordena pelas datas, não pelo texto DD/MM/AAAA
+    cenarios = {
+        criterio: ordem_por_entrega(df) if criterio == "due-date" else ordenar_pedidos(posicoes, criterio)["_POSICAO"].tolist()
+        for criterio in criterios
+    }
+
+    pedidos = [str(pedido) for pedido in df["PEDIDO"]]
+    for nome, lista in (ordens_manuais or {}).items():
+        ordem = []
+        for pedido in lista:
+            if str(pedido) not in pedidos:
+                raise ValueError(f"Pedido '{pedido}' do cenário '{nome}' não está na tabela de pedidos.")
+            posicao = pedidos.index(str(pedido))
+            if posicao not in ordem:
+                ordem.append(posicao)
+        cenarios[nome] = ordem + [posicao for posicao in range(len(df)) if posicao not in ordem]
+
+    rnd = random.Random(semente)
+    for i in range(amostras_aleatorias):
+        cenarios[f"aleatorio-{i + 1}"] = rnd.sample(range(len(df)), len(df))
+
+    return cenarios
+
+
+def aplicar_cenario(df: pd.DataFrame, ordem: list) -> pd.DataFrame:
+    """Retorna a tabela de pedidos na ordem do cenário."""
+    return df.reset_index(drop=True).iloc[ordem].reset_index(drop=True)
+
+
+def preparar_contexto(
+        df: pd.DataFrame,
+        modelo_path: str = DEFAULT_MODELO_PATH,
+        calendario_path: str = DEFAULT_CALENDARIO_PATH,
+        config_path: str = DEFAULT_CONFIG_PATH
+    ) -> ContextoCenarios:
+    """Prepara pedidos, limites, calendário e a matriz vazia, como em gerar_plano."""
+    configuracao = carregar_configuracao(config_path)
+    limites = [valor * (configuracao.carga / 100) for valor in configuracao.limites_maximos()]
+    calendario = carregar_calendario_uteis(calendario_path)
+    indice_datas = _ler_indice_datas(modelo_path)
+
+    # Pedidos sem tipo de corte ou com data de início inválida não são planejados
+    pedidos = []
+    for row in df.reset_index(drop=True).itertuples(index=False):
+        pedido = None
+        if row.CORTE:
+            try:
+                pedido = PedidoPlanejamento(
+                    quantidade=row.QUANTIDADE,
+                    setor_inicial=row.SETOR,
+                    corte=row.CORTE,
+                    data_inicio=normalizar_data_inicio(row.INICIO),
+                    pedido=row.PEDIDO,
+                )
+            except ValueError:
+                pedido = None
+        pedidos.append(pedido)
+    entregas = pd.to_datetime(df["ENTREGA"], format="%d/%m/%Y", errors="coerce")
+
+    return ContextoCenarios(
+        pedidos=pedidos,
+        entregas=[None if pd.isna(data) else data.date() for data in entregas],
+        config_setores=montar_config_setores(limites, configuracao),
+        calendario=calendario,
+        matriz=MatrizCapacidade.a_partir_do_indice(indice_datas, [int(valor) for valor in limites], calendario),
+        indice_datas=indice_datas,
+        priorizar_estampa=configuracao.prioridade_estampa,
+    )
+
+
+def _ler_indice_datas(modelo_path: str) -> IndiceDatasPlanilha:
+    """Lê apenas a linha de datas do modelo."""
+    wb = load_workbook(modelo_path, read_only=True)
+    try:
+        valores = next(wb.active.iter_rows(min_row=2, max_row=2, values_only=True))
+    finally:
+        wb.close()
+    return IndiceDatasPlanilha.a_partir_dos_valores(list(valores))
+
+
+def comparar_cenarios(
+        df: pd.DataFrame,
+        cenarios: dict,
+        workers: int = None,
+        modelo_path: str = DEFAULT_MODELO_PATH,
+        calendario_path: str = DEFAULT_CALENDARIO_PATH,
+        config_path: str = DEFAULT_CONFIG_PATH
+    ) -> pd.DataFrame:
+    """
+    Planeja cada cenário e retorna a tabela comparativa.
+
+    Args:
+        df (pd.DataFrame): Tabela de pedidos formatada (processar_tabela).
+        cenarios (dict): {nome: posições dos pedidos}, ver gerar_cenarios.
+        workers (int): Processos usados. None usa um por cenário (limitado pelo
+            número de CPUs); 1 planeja em sequência no próprio processo.
+
+    Returns:
+        pd.DataFrame: Colunas de COLUNAS_COMPARACAO, do melhor para o pior cenário
+            (menos atrasados, menor delay total, último dia mais cedo).
+    """
+    contexto = preparar_contexto(df, modelo_path, calendario_path, config_path)
+    nomes = list(cenarios)
+    ordens = [cenarios[nome] for nome in nomes]
+
+    if workers is None:
+        workers = min(len(nomes), os.cpu_count() or 1)
+
+    if workers <= 1:
+        resultados = [_avaliar(contexto, nome, ordem) for nome, ordem in zip(nomes, ordens)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_processo,
+                                 initargs=(contexto,)) as executor:
+            resultados = list(executor.map(_avaliar_no_processo, nomes, ordens))
+
+    tabela = pd.DataFrame(resultados, columns=COLUNAS_COMPARACAO)
+    tabela = tabela.sort_values(["ATRASADOS", "DELAY TOTAL", "ULTIMO DIA"], na_position="last", kind="stable")
+    tabela["ULTIMO DIA"] = tabela["ULTIMO DIA"].map(lambda dia: dia.strftime('%d/%m/%Y') if pd.notna(dia) else None)
+    return tabela.reset_index(drop=True)
+
+
+# Contexto do processo de trabalho (definido uma única vez por processo)
+_contexto_processo = None
+
+
+def _inicializar_processo(contexto: ContextoCenarios):
+    global _contexto_processo
+    _contexto_processo = contexto
+
+
+def _avaliar_no_processo(nome: str, ordem: list) -> list:
+    return _avaliar(_contexto_processo, nome, ordem)
+
+
+def _avaliar(contexto: ContextoCenarios, nome: str, ordem: list) -> list:
+    """
+    Planeja os pedidos na ordem do cenário sobre uma cópia da matriz.
+
+    Pedidos sem tipo de corte ou com erro no planejamento não recebem reservas,
+    como em gerar_plano, e são contados em NAO PLANEJADOS.
+
+    Returns:
+        list: Valores de COLUNAS_COMPARACAO.
+    """
+    matriz = contexto.matriz.copia()
+    atrasados = 0
+    delay_total = 0
+    nao_planejados = 0
+    ultimo_dia = None
+
+    for posicao in ordem:
+        pedido = contexto.pedidos[posicao]
+        resultado = None
+        if pedido is not None:
+            try:
+                resultado = planejar_pedido(
+                    pedido,
+                    contexto.config_setores,
+                    contexto.calendario,
+                    matriz,
+                    priorizar_estampa=contexto.priorizar_estampa,
+                    datas_planilha=contexto.indice_datas,
+                )
+            except Exception:
+                resultado = None
+
+        if resultado is None:
+            nao_planejados += 1
+            continue
+
+        delay_total += resultado.delay
+        if resultado.ultimo_dia is None:
+            # A produção não termina dentro do calendário
+            nao_planejados += 1
+            continue
+
+        fim = normalizar_data(resultado.ultimo_dia)
+        entrega = contexto.entregas[posicao]
+        if entrega is not None and fim > entrega:
+            atrasados += 1
+        if ultimo_dia is None or fim > ultimo_dia:
+            ultimo_dia = fim
+
+    return [nome, atrasados, delay_total, ultimo_dia, nao_planejados]
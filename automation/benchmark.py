@@ -0,0 +1,380 @@
+"""
+Benchmark do planejamento com carteiras de pedidos sintéticas.
+
+Gera planilhas de pedidos no formato de ordem.xlsx, um calendário de dias úteis
+cobrindo as datas do modelo e uma cópia do arquivo de configuração com
+PRIORIDADE_ESTAMPA ligada/desligada. Mede separadamente cada etapa do fluxo:
+
+    processar_tabela -> criar_novo_plano -> validar_prazo -> gerar_relatorio_arquivo
+
+Uso:
+    python -m automation bench --sizes 10 100 1000 --out bench.json
+
+O resultado é gravado em JSON para comparar versões.
+
+O tempo de importação dos pontos de entrada é medido à parte, em processos
+novos, contra um orçamento em milissegundos (ORCAMENTO_IMPORTACAO_MS):
+    python -m automation bench --imports
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from automation.core.constants import SETOR_ORDEM, DEFAULT_CONFIG_PATH
+
+TAMANHOS_PADRAO = (10, 100, 1000)
+
+# Setores que podem iniciar um pedido (mesmas opções aceitas por processar_tabela)
+SETORES_INICIAIS = [setor for setor in SETOR_ORDEM if setor != 'Distribuição']
+
+QUANTIDADES = [50, 150, 300, 700, 1200, 2500, 4000]
+
+# Orçamento do tempo de importação (ms) de cada ponto de entrada, em um processo novo
+ORCAMENTO_IMPORTACAO_MS = {
+    "automation": 20,
+    "automation.cli": 50,
+    "automation.core.production_planner": 100,
+}
+
+# Bibliotecas que só devem ser importadas dentro das funções que as usam
+BIBLIOTECAS_PESADAS = ("pandas", "openpyxl", "InquirerPy", "prompt_toolkit", "tabulate", "pyfiglet")
+
+_SCRIPT_IMPORTACAO = (
+    "import json, sys, time\n"
+    "inicio = time.perf_counter()\n"
+    "import {modulo}\n"
+    "fim = time.perf_counter()\n"
+    "print(json.dumps([fim - inicio, [m for m in {pesadas!r} if m in sys.modules]]))\n"
+)
+
+
+def gerar_carteira_pedidos(
+        quantidade: int,
+        proporcao_laser: float = 0.5,
+        setores: list = None,
+        data_base: date = date(2025, 5, 8),
+        semente: int = 0
+    ) -> pd.DataFrame:
+    """
+    Gera uma carteira de pedidos sintética com as colunas de ordem.xlsx.
+
+    Args:
+        quantidade (int): Número de pedidos.
+        proporcao_laser (float): Fração dos pedidos com corte Laser (o restante é Manual).
+        setores (list): Setores iniciais sorteados (padrão: SETORES_INICIAIS).
+        data_base (date): Data inicial mais cedo possível.
+        semente (int): Semente do gerador aleatório, para carteiras reproduzíveis.
+
+    Returns:
+        pd.DataFrame: Pedidos com Pedido, Entrega, Cliente, Produto, QTD,
+            Tipo de Corte, Data Inicio e Setor.
+    """
+    rnd = random.Random(semente)
+    setores = setores or SETORES_INICIAIS
+    linhas = []
+    for i in range(quantidade):
+        inicio = data_base + timedelta(days=rnd.randint(0, 40))
+        linhas.append({
+            "Pedido": f"P-{i + 1}",
+            "Entrega": datetime.combine(inicio + timedelta(days=rnd.randint(5, 60)), datetime.min.time()),
+            "Cliente": f"CLIENTE {i % 50}",
+            "Produto": f"PRODUTO {i % 20}",
+            "QTD": rnd.choice(QUANTIDADES),
+            "Tipo de Corte": "Laser" if rnd.random() < proporcao_laser else "Manual",
+            "Data Inicio": datetime.combine(inicio, datetime.min.time()),
+            "Setor": rnd.choice(setores),
+        })
+    return pd.DataFrame(linhas)
+
+
+def gerar_calendario(caminho: str, inicio: date = date(2025, 5, 1), fim: date = date(2025, 12, 31)):
+    """
+    Grava um calendário sintético (segunda a sexta úteis) no formato de _CALENDARIO.csv.
+    """
+    linhas = []
+    dia = inicio
+    while dia <= fim:
+        linhas.append({
+            "ANO": dia.year,
+            "MÊS": dia.month,
+            "DIA": dia.day,
+            "SEMANA": dia.strftime("%A"),
+            "DATA": dia.strftime("%d/%m/%Y"),
+            "VALOR": "UTIL" if dia.weekday() < 5 else "FINAL_DE_SEMANA",
+        })
+        dia += timedelta(days=1)
+    pd.DataFrame(linhas).to_csv(caminho, index=False)
+
+
+def gerar_configuracao(caminho: str, prioridade_estampa: bool, config_path: str = DEFAULT_CONFIG_PATH,
+                       copias_plano: bool = False):
+    """
+    Copia o arquivo de configuração alterando PRIORIDADE_ESTAMPA.
+
+    Com copias_plano, liga também SNAPSHOT_PLANO e BANCO_PLANO, para que o plano
+    seja gravado com a cópia colunar e registrado no banco.
+    """
+    config_df = pd.read_csv(config_path, encoding='utf-16')
+    config_df.loc[config_df['PARAMETRO'] == 'PRIORIDADE_ESTAMPA', 'VALOR'] = "Sim" if prioridade_estampa else "Não"
+    if copias_plano:
+        config_df.loc[config_df['PARAMETRO'].isin(['SNAPSHOT_PLANO', 'BANCO_PLANO']), 'VALOR'] = "Sim"
+    config_df.to_csv(caminho, index=False, encoding='utf-16')
+
+
+def _cronometrar(tempos: dict, etapa: str, funcao, *args, **kwargs):
+    """Executa a função sem a saída de print e guarda o tempo em segundos."""
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultado = funcao(*args, **kwargs)
+    tempos[etapa] = round(time.perf_counter() - inicio, 4)
+    return resultado
+
+
+def executar_cenario(
+        pasta: str,
+        quantidade: int,
+        proporcao_laser: float = 0.5,
+        prioridade_estampa: bool = False,
+        semente: int = 0,
+        verificar: bool = False,
+        workers: int = None
+    ) -> dict:
+    """
+    Executa o fluxo completo para uma carteira sintética e mede cada etapa.
+
+    Args:
+        pasta (str): Pasta de trabalho (carteira, calendário, configuração e planos).
+        quantidade (int): Número de pedidos.
+        proporcao_laser (float): Fração dos pedidos com corte Laser.
+        prioridade_estampa (bool): Valor de PRIORIDADE_ESTAMPA.
+        semente (int): Semente da carteira.
+        verificar (bool): Se True, confere que o motor com e sem o salto de dias
+            ociosos produz exatamente as mesmas reservas e que o banco, a cópia
+            colunar e a planilha do plano devolvem a mesma tabela (as cópias são
+            gravadas nesse caso, o que entra no tempo de criar_novo_plano).
+        workers (int): Processos usados em gerar_relatorio_arquivo.
+
+    Returns:
+        dict: Parâmetros do cenário, tempos por etapa (s) e pedidos atrasados.
+    """
+    from automation.ui.table_renderer import processar_tabela
+    from automation.actions.create_plan import gerar_plano
+    from automation.validators.report_validator import validar_prazo
+    from automation.actions.reports_export import gerar_relatorio_arquivo
+
+    caminho_pedidos = os.path.join(pasta, f"pedidos_{quantidade}.xlsx")
+    caminho_calendario = os.path.join(pasta, "_CALENDARIO.csv")
+    caminho_config = os.path.join(pasta, "_CONFIG.csv")
+    pasta_planos = os.path.join(pasta, "exp")
+
+    gerar_carteira_pedidos(quantidade, proporcao_laser, semente=semente).to_excel(caminho_pedidos, index=False)
+    gerar_calendario(caminho_calendario)
+    gerar_configuracao(caminho_config, prioridade_estampa, copias_plano=verificar)
+
+    tempos = {}
+    df_formatado, _ = _cronometrar(tempos, "processar_tabela", processar_tabela, caminho_pedidos, interativo=False)
+    df_produzido, carga, caminho_plano = _cronometrar(
+        tempos, "criar_novo_plano", gerar_plano, df_formatado,
+        calendario_path=caminho_calendario, pasta_destino=pasta_planos, config_path=caminho_config
+    )
+    df_validado = _cronometrar(tempos, "validar_prazo", validar_prazo, df_produzido, calendario_path=caminho_calendario)
+    if caminho_plano:
+        _cronometrar(tempos, "gerar_relatorio_arquivo", gerar_relatorio_arquivo,
+                     caminho_plano, pasta_origem=pasta_planos, interativo=False, workers=workers)
+
+    resultado = {
+        "pedidos": quantidade,
+        "proporcao_laser": proporcao_laser,
+        "prioridade_estampa": prioridade_estampa,
+        "workers": workers,
+        "carga": carga,
+        "atrasados": int((df_validado["PRAZO"] == "❌").sum()),
+        "tempos": tempos,
+        "total": round(sum(tempos.values()), 4),
+    }
+    if verificar:
+        resultado["caminho_rapido_identico"] = verificar_caminho_rapido(
+            df_formatado, caminho_calendario, caminho_config
+        )
+        if caminho_plano:
+            from automation.core.plan_store import comparar_leituras_plano
+            resultado["divergencias_leitura"] = comparar_leituras_plano(caminho_plano)
+    return resultado
+
+
+def verificar_caminho_rapido(df_formatado: pd.DataFrame, calendario_path: str, config_path: str) -> bool:
+    """
+    Teste diferencial do motor: planeja a carteira com e sem o salto de dias
+    ociosos e compara reservas, primeiro/último dia e delay de cada pedido.
+    """
+    from openpyxl import load_workbook
+    from automation.core.constants import DEFAULT_MODELO_PATH
+    from automation.core.calendar_utils import carregar_calendario_uteis
+    from automation.core.capacity_ledger import MatrizCapacidade
+    from automation.core.config import carregar_configuracao
+    from automation.core.excel_utils import atualizar_celulas_limite, obter_indice_datas
+    from automation.core.production_planner import obter_perfis_setores
+    from automation.core.scheduling_engine import PedidoPlanejamento, planejar_pedidos
+
+    configuracao = carregar_configuracao(config_path)
+    ws = load_workbook(DEFAULT_MODELO_PATH).active
+    atualizar_celulas_limite(ws, [valor * configuracao.carga / 100 for valor in configuracao.limites_maximos()])
+
+    calendario = carregar_calendario_uteis(calendario_path)
+    config_setores = obter_perfis_setores(ws, configuracao)
+    indice_datas = obter_indice_datas(ws)
+    matriz = MatrizCapacidade.a_partir_da_planilha(ws, calendario)
+    pedidos = [
+        PedidoPlanejamento(row.QUANTIDADE, row.SETOR, row.CORTE, row.INICIO, row.PEDIDO)
+        for row in df_formatado.itertuples(index=False)
+    ]
+
+    resultados = {}
+    for caminho_rapido in (True, False):
+        resultados[caminho_rapido] = [
+            (r.reservas, r.primeiro_dia, r.ultimo_dia, r.delay)
+            for r in planejar_pedidos(pedidos, config_setores, calendario, matriz.copia(),
+                                      configuracao.prioridade_estampa, indice_datas, caminho_rapido)
+        ]
+    return resultados[True] == resultados[False]
+
+
+def medir_importacao(modulo: str, repeticoes: int = 5) -> dict:
+    """
+    Mede o tempo de `import modulo` em processos novos (o menor de `repeticoes`).
+
+    Returns:
+        dict: Módulo, tempo em ms e bibliotecas pesadas carregadas pela importação.
+    """
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = _SCRIPT_IMPORTACAO.format(modulo=modulo, pesadas=BIBLIOTECAS_PESADAS)
+    tempos = []
+    for _ in range(repeticoes):
+        processo = subprocess.run([sys.executable, "-c", script], cwd=raiz,
+                                  capture_output=True, text=True, check=True)
+        tempo, pesadas = json.loads(processo.stdout.strip().splitlines()[-1])
+        tempos.append(tempo)
+    return {"modulo": modulo, "ms": round(min(tempos) * 1000, 1), "bibliotecas_pesadas": pesadas}
+
+
+def executar_benchmark_importacao(
+        orcamento: dict = None,
+        repeticoes: int = 5,
+        saida: str = None,
+        rotulo: str = None
+    ) -> dict:
+    """
+    Mede a importação de cada ponto de entrada e compara com o orçamento.
+
+    Um módulo está dentro do orçamento se importa em até `orcamento[modulo]` ms
+    e não carrega nenhuma de BIBLIOTECAS_PESADAS.
+
+    Args:
+        orcamento (dict): {módulo: ms} (padrão: ORCAMENTO_IMPORTACAO_MS).
+        repeticoes (int): Processos por módulo; vale o menor tempo.
+        saida (str): Caminho do arquivo JSON de resultados (opcional).
+        rotulo (str): Identificação da versão medida (ex.: hash do commit).
+
+    Returns:
+        dict: Metadados, medições e se todas ficaram dentro do orçamento.
+    """
+    orcamento = orcamento or ORCAMENTO_IMPORTACAO_MS
+    relatorio = {
+        "rotulo": rotulo,
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "importacoes": [],
+    }
+
+    for modulo, limite_ms in orcamento.items():
+        medicao = medir_importacao(modulo, repeticoes)
+        medicao["orcamento_ms"] = limite_ms
+        medicao["dentro_do_orcamento"] = medicao["ms"] <= limite_ms and not medicao["bibliotecas_pesadas"]
+        relatorio["importacoes"].append(medicao)
+
+        simbolo = "✅" if medicao["dentro_do_orcamento"] else "❌"
+        pesadas = f" | carrega: {', '.join(medicao['bibliotecas_pesadas'])}" if medicao["bibliotecas_pesadas"] else ""
+        print(f"{simbolo} import {modulo}: {medicao['ms']:.1f} ms (orçamento {limite_ms} ms){pesadas}")
+
+    relatorio["dentro_do_orcamento"] = all(m["dentro_do_orcamento"] for m in relatorio["importacoes"])
+
+    if saida:
+        with open(saida, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultados salvos em: {saida}")
+
+    return relatorio
+
+
+def executar_benchmark(
+        tamanhos=TAMANHOS_PADRAO,
+        proporcao_laser: float = 0.5,
+        prioridades=(False, True),
+        semente: int = 0,
+        verificar: bool = False,
+        workers: int = None,
+        saida: str = None,
+        rotulo: str = None
+    ) -> dict:
+    """
+    Executa os cenários (tamanho x PRIORIDADE_ESTAMPA) e, opcionalmente, grava o JSON.
+
+    Args:
+        tamanhos (list): Números de pedidos (ex.: 10, 100, 1000, 10000).
+        proporcao_laser (float): Fração dos pedidos com corte Laser.
+        prioridades (list): Valores de PRIORIDADE_ESTAMPA a medir.
+        semente (int): Semente das carteiras.
+        verificar (bool): Executa também o teste diferencial do motor e a comparação
+            das leituras do plano.
+        workers (int): Processos usados na exportação dos relatórios.
+        saida (str): Caminho do arquivo JSON de resultados (opcional).
+        rotulo (str): Identificação da versão medida (ex.: hash do commit).
+
+    Returns:
+        dict: Metadados da execução e lista de cenários.
+    """
+    relatorio = {
+        "rotulo": rotulo,
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "semente": semente,
+        "cenarios": [],
+    }
+
+    for quantidade in tamanhos:
+        for prioridade_estampa in prioridades:
+            pasta = tempfile.mkdtemp(prefix="bench_plano_")
+            try:
+                cenario = executar_cenario(
+                    pasta, quantidade, proporcao_laser, prioridade_estampa, semente, verificar, workers
+                )
+            finally:
+                shutil.rmtree(pasta, ignore_errors=True)
+            relatorio["cenarios"].append(cenario)
+            print(f"📏 {quantidade:>6} pedidos | estampa {'P' if prioridade_estampa else 'N'} | "
+                  + " | ".join(f"{etapa}: {tempo:.3f}s" for etapa, tempo in cenario["tempos"].items()))
+            if cenario.get("caminho_rapido_identico") is False:
+                print("❌ Caminho rápido divergiu da simulação dia a dia!")
+            for divergencia in cenario.get("divergencias_leitura", []):
+                print(f"❌ Leituras do plano divergem: {divergencia}")
+
+    if saida:
+        with open(saida, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultados salvos em: {saida}")
+
+    return relatorio
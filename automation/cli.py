@@ -0,0 +1,396 @@
+"""
+Linha de comando sem interação para execuções agendadas (ex.: cron).
+
+Uso:
+    python -m automation plan --orders ordem.xlsx --priority due-date --out exp/
+    python -m automation plan --orders ordem.xlsx --streaming
+    python -m automation plan --orders ordem.xlsx --priority optimize --time-budget 30
+    python -m automation report --plan exp/planejamento_....xlsx --workers 4
+    python -m automation replan --plan exp/planejamento_....xlsx --remove P-10 --insert novos.xlsx --position 0
+    python -m automation scenarios --orders ordem.xlsx --random 10 --custom urgentes=P-3,P-7
+    python -m automation bookings --sector Costura --from 02/06/2025 --to 06/06/2025
+    python -m automation bench --sizes 10 100 1000 --out bench.json
+    python -m automation bench --imports
+    python -m automation plan --orders ordem.xlsx --stats-json metricas.json
+    python -m automation plan --orders ordem.xlsx --profile
+    python -m automation plan --orders ordem.xlsx --plants plantas.json --workers 4
+
+Este módulo não importa pyfiglet, InquirerPy nem tabulate.
+"""
+
+import argparse
+import os
+import sys
+
+from automation.core.constants import SETOR_ORDEM, DEFAULT_EXP_PATH, DEFAULT_CALENDARIO_PATH, DEFAULT_CONFIG_PATH, DEFAULT_MODELO_PATH
+from automation.core.instrumentation import (
+    ativar_instrumentacao, imprimir_resumo_instrumentacao, salvar_instrumentacao_json
+)
+from automation.core.log_utils import configurar_logging
+from automation.core.profiling import PERFILADORES, perfilar
+
+# Códigos de saída
+SAIDA_OK = 0
+SAIDA_ERRO = 1
+SAIDA_PEDIDOS_ATRASADOS = 3
+
+
+def _comando_plan(args) -> int:
+    """Executa processar_tabela -> ordenar_pedidos -> gerar_plano -> validar_prazo."""
+    from automation.ui.table_renderer import processar_tabela
+    from automation.actions.priority_handler import ordenar_pedidos
+    from automation.actions.create_plan import gerar_plano
+    from automation.validators.report_validator import validar_prazo, resumo_gargalos
+    from automation.core.calendar_utils import formatar_datas
+
+    if args.plants and args.priority == "optimize":
+        raise ValueError("--priority optimize não pode ser combinado com --plants.")
+
+    df_formatado, _ = processar_tabela(args.orders, interativo=False)
+    if args.priority == "optimize":
+        from automation.actions.priority_optimizer import otimizar_ordem
+
+        df_priorizado, resumo = otimizar_ordem(
+            df_formatado,
+            tempo_limite=args.time_budget,
+            semente=args.seed,
+            modelo_path=args.template,
+            calendario_path=args.calendar,
+            config_path=args.config,
+        )
+        print(f"Otimização: atrasados {resumo['atrasados_inicial']} -> {resumo['atrasados']}, "
+              f"dias de atraso {resumo['atraso_inicial']} -> {resumo['atraso']} "
+              f"({resumo['avaliacoes']} ordens avaliadas em {resumo['tempo_s']} s)")
+    else:
+        df_priorizado = ordenar_pedidos(df_formatado, args.priority)
+
+    if args.plants:
+        return _planejar_plantas(args, df_priorizado)
+
+    df_produzido, carga, caminho_plano = gerar_plano(
+        df_priorizado,
+        modelo_path=args.template,
+        calendario_path=args.calendar,
+        pasta_destino=args.out,
+        config_path=args.config,
+        streaming=args.streaming,
+    )
+    if caminho_plano is None:
+        print("❌ Não foi possível salvar o plano.", file=sys.stderr)
+        return SAIDA_ERRO
+
+    df_validado = validar_prazo(df_produzido, calendario_path=args.calendar)
+
+    print(f"\n🗓️  Plano salvo em: {caminho_plano}")
+    print(f"Carga: {carga} %\n")
+    print(formatar_datas(df_validado).to_string(index=False))
+
+    atrasados = int((df_validado["PRAZO"] == "❌").sum())
+    print(f"\nPedidos: {len(df_validado)} | Atrasados: {atrasados}")
+    gargalos = resumo_gargalos(df_validado)
+    if not gargalos.empty:
+        print("Gargalos dos atrasados: " + ", ".join(f"{setor} {total}" for setor, total in gargalos.items()))
+
+    if args.fail_on_late and atrasados:
+        return SAIDA_PEDIDOS_ATRASADOS
+    return SAIDA_OK
+
+
+def _planejar_plantas(args, df_priorizado) -> int:
+    """Planeja cada planta de --plants em paralelo e exibe o resumo consolidado."""
+    from automation.actions.plant_planner import carregar_perfis_plantas, planejar_plantas
+    from automation.core.calendar_utils import formatar_datas
+
+    plantas = carregar_perfis_plantas(args.plants)
+    df_consolidado, resumo = planejar_plantas(df_priorizado, plantas, workers=args.workers, streaming=args.streaming)
+    if resumo["PLANO"].isna().any():
+        sem_plano = resumo.loc[resumo["PLANO"].isna(), "PLANTA"].tolist()
+        print(f"⚠️  Plantas sem plano salvo: {sem_plano}", file=sys.stderr)
+
+    print()
+    print(formatar_datas(df_consolidado).to_string(index=False))
+    print()
+    print(resumo.to_string(index=False))
+
+    atrasados = int(resumo["ATRASADOS"].sum())
+    print(f"\nPlantas: {len(resumo)} | Pedidos: {len(df_consolidado)} | Atrasados: {atrasados}")
+
+    if args.fail_on_late and atrasados:
+        return SAIDA_PEDIDOS_ATRASADOS
+    return SAIDA_OK
+
+
+def _comando_report(args) -> int:
+    """Gera os relatórios por setor de um plano salvo."""
+    import os
+    from automation.actions.reports_export import gerar_relatorio_arquivo
+
+    if not os.path.isfile(args.plan):
+        raise FileNotFoundError(f"Plano não encontrado: {args.plan}")
+    gerar_relatorio_arquivo(
+        os.path.basename(args.plan),
+        pasta_origem=os.path.dirname(args.plan) or ".",
+        interativo=False,
+        workers=args.workers,
+    )
+    return SAIDA_OK
+
+
+def _comando_replan(args) -> int:
+    """Insere e/ou remove pedidos de um plano salvo, replanejando apenas os pedidos afetados."""
+    import os
+    from automation.actions.incremental_plan import PlanoIncremental
+
+    if not os.path.isfile(args.plan):
+        raise FileNotFoundError(f"Plano não encontrado: {args.plan}")
+    plano = PlanoIncremental.carregar(args.plan, calendario_path=args.calendar, modelo_path=args.template)
+
+    replanejados = 0
+    if args.remove:
+        plano.remover_pedidos([plano.posicao(pedido) for pedido in args.remove])
+        replanejados += plano.replanejados
+        print(f"🗑️  Pedidos removidos: {', '.join(args.remove)} ({plano.replanejados} pedido(s) replanejado(s))")
+
+    if args.insert:
+        from automation.ui.table_renderer import processar_tabela
+        from automation.core.calendar_utils import formatar_datas
+
+        # O plano salvo guarda as datas dos pedidos como DD/MM/AAAA
+        df_novos, _ = processar_tabela(args.insert, interativo=False)
+        lista_dados = formatar_datas(df_novos).rename(columns={"SETOR": "SETOR_INICIAL"}).to_dict("records")
+        plano.inserir_pedidos(lista_dados, args.position)
+        replanejados += plano.replanejados
+        print(f"📥 Pedidos inseridos: {len(lista_dados)} ({plano.replanejados} pedido(s) replanejado(s))")
+
+    caminho_plano = plano.salvar(pasta_destino=args.out)
+    if caminho_plano is None:
+        print("❌ Não foi possível salvar o plano.", file=sys.stderr)
+        return SAIDA_ERRO
+    print(f"\n🗓️  Plano salvo em: {caminho_plano}")
+    print(f"Pedidos: {len(plano.pedidos)} | Replanejados: {replanejados}")
+    return SAIDA_OK
+
+
+def _comando_scenarios(args) -> int:
+    """Compara cenários de prioridade planejando cada um em paralelo, sem gravar planos."""
+    from automation.ui.table_renderer import processar_tabela
+    from automation.actions.scenario_runner import gerar_cenarios, comparar_cenarios
+
+    ordens_manuais = {}
+    for definicao in args.custom or []:
+        nome, separador, pedidos = definicao.partition("=")
+        if not separador or not nome.strip():
+            raise ValueError(f"Cenário manual inválido: '{definicao}'. Use NOME=PEDIDO,PEDIDO,...")
+        ordens_manuais[nome.strip()] = [pedido.strip() for pedido in pedidos.split(",") if pedido.strip()]
+
+    df_formatado, _ = processar_tabela(args.orders, interativo=False)
+    cenarios = gerar_cenarios(
+        df_formatado,
+        criterios=args.priority,
+        ordens_manuais=ordens_manuais,
+        amostras_aleatorias=args.random,
+        semente=args.seed,
+    )
+    tabela = comparar_cenarios(
+        df_formatado,
+        cenarios,
+        workers=args.workers,
+        modelo_path=args.template,
+        calendario_path=args.calendar,
+    )
+
+    print(tabela.to_string(index=False))
+    print(f"\nPedidos: {len(df_formatado)} | Cenários: {len(tabela)} | Melhor: {tabela['CENARIO'].iloc[0]}")
+    return SAIDA_OK
+
+
+def _comando_bookings(args) -> int:
+    """Consulta as reservas de um plano registrado no banco de planos, sem abrir a planilha."""
+    from datetime import datetime
+    from automation.core.plan_store import consultar_reservas, listar_versoes
+
+    if args.versions:
+        print(listar_versoes(args.folder).to_string(index=False))
+        return SAIDA_OK
+
+    inicio = datetime.strptime(args.date_from, "%d/%m/%Y") if args.date_from else None
+    fim = datetime.strptime(args.date_to, "%d/%m/%Y") if args.date_to else None
+    reservas = consultar_reservas(args.folder, setor=args.sector, inicio=inicio, fim=fim,
+                                  plano=args.plan, pedido=args.order)
+    reservas["DATA"] = reservas["DATA"].dt.strftime("%d/%m/%Y")
+
+    print(reservas.to_string(index=False))
+    print(f"\nReservas: {len(reservas)} | Quantidade: {int(reservas['QTD'].sum())}")
+    return SAIDA_OK
+
+
+def _comando_bench(args) -> int:
+    """Executa o benchmark com carteiras sintéticas e grava o JSON de resultados."""
+    from automation.benchmark import executar_benchmark, executar_benchmark_importacao
+
+    if args.imports:
+        relatorio = executar_benchmark_importacao(saida=args.out, rotulo=args.label)
+        return SAIDA_OK if relatorio["dentro_do_orcamento"] else SAIDA_ERRO
+
+    prioridades = {"off": (False,), "on": (True,), "both": (False, True)}[args.estampa]
+    relatorio = executar_benchmark(
+        tamanhos=args.sizes,
+        proporcao_laser=args.laser,
+        prioridades=prioridades,
+        semente=args.seed,
+        verificar=args.verify,
+        workers=args.workers,
+        saida=args.out,
+        rotulo=args.label,
+    )
+    if args.verify and not all(
+        c.get("caminho_rapido_identico") and not c.get("divergencias_leitura") for c in relatorio["cenarios"]
+    ):
+        return SAIDA_ERRO
+    return SAIDA_OK
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    """Monta o parser de argumentos da linha de comando."""
+    from automation.actions.priority_handler import CRITERIOS_PRIORIDADE
+
+    parser = argparse.ArgumentParser(
+        prog="python -m automation",
+        description="Planejamento de produção sem interação.",
+    )
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    # Opções de log comuns a todos os comandos
+    comum = argparse.ArgumentParser(add_help=False)
+    comum.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                       help="Nível das mensagens no console (padrão: INFO).")
+    comum.add_argument("--quiet", action="store_true", help="Exibe apenas avisos e erros.")
+    comum.add_argument("--trace", metavar="ARQUIVO",
+                       help="Grava um rastreamento JSON lines com uma linha por pedido planejado.")
+    comum.add_argument("--stats", action="store_true",
+                       help="Exibe ao final o tempo de cada etapa e os contadores (células, CSVs, dias simulados).")
+    comum.add_argument("--stats-json", metavar="ARQUIVO",
+                       help="Grava o tempo de cada etapa e os contadores em JSON.")
+    comum.add_argument("--profile", nargs="?", const="auto", choices=PERFILADORES,
+                       help="Executa o comando sob o perfilador (auto: pyinstrument se instalado, senão cProfile) "
+                            "e grava o perfil ao lado do plano gerado.")
+
+    plan = subparsers.add_parser("plan", parents=[comum],
+                                 help="Gera um novo plano a partir de uma planilha de pedidos.")
+    plan.add_argument("--orders", required=True, help="Planilha de pedidos (.xlsx).")
+    plan.add_argument("--priority", choices=list(CRITERIOS_PRIORIDADE) + ["optimize"], default="none",
+                      help="Critério de prioridade dos pedidos; optimize busca a ordem com menos atrasos (padrão: none).")
+    plan.add_argument("--time-budget", type=float, default=10.0,
+                      help="Tempo máximo, em segundos, da busca de --priority optimize (padrão: 10).")
+    plan.add_argument("--seed", type=int, default=0, help="Semente da busca de --priority optimize (padrão: 0).")
+    plan.add_argument("--out", default=DEFAULT_EXP_PATH, help=f"Pasta de saída do plano (padrão: {DEFAULT_EXP_PATH}).")
+    plan.add_argument("--template", default=DEFAULT_MODELO_PATH, help=f"Planilha modelo (padrão: {DEFAULT_MODELO_PATH}).")
+    plan.add_argument("--calendar", default=DEFAULT_CALENDARIO_PATH, help=f"Calendário de dias úteis (padrão: {DEFAULT_CALENDARIO_PATH}).")
+    plan.add_argument("--config", default=DEFAULT_CONFIG_PATH, help=f"Arquivo de configuração (padrão: {DEFAULT_CONFIG_PATH}).")
+    plan.add_argument("--plants", metavar="ARQUIVO",
+                      help="Arquivo JSON com as linhas de produção (configuração, calendário, modelo e pedidos de cada uma); "
+                           "cada linha é planejada em paralelo e gera o seu plano em exp/<planta>/.")
+    plan.add_argument("--workers", type=int,
+                      help="Processos usados com --plants (padrão: um por planta, limitado pelas CPUs).")
+    plan.add_argument("--streaming", action="store_true",
+                      help="Grava o plano bloco a bloco (memória constante; contém apenas os blocos usados).")
+    plan.add_argument("--fail-on-late", action="store_true",
+                      help=f"Retorna código {SAIDA_PEDIDOS_ATRASADOS} se algum pedido ficar atrasado.")
+    plan.set_defaults(func=_comando_plan)
+
+    report = subparsers.add_parser("report", parents=[comum],
+                                   help="Exporta uma planilha por setor a partir de um plano salvo.")
+    report.add_argument("--plan", required=True, help="Plano salvo (.xlsx), ex.: exp/planejamento_....xlsx.")
+    report.add_argument("--workers", type=int,
+                        help="Processos usados na gravação dos relatórios (padrão: um por setor, limitado pelas CPUs).")
+    report.set_defaults(func=_comando_report)
+
+    replan = subparsers.add_parser("replan", parents=[comum],
+                                   help="Insere ou remove pedidos de um plano salvo sem replanejar todos os pedidos.")
+    replan.add_argument("--plan", required=True, help="Plano salvo (.xlsx), ex.: exp/planejamento_....xlsx.")
+    replan.add_argument("--remove", nargs="+", metavar="PEDIDO", help="Pedidos (coluna Pedido) a remover.")
+    replan.add_argument("--insert", metavar="ARQUIVO", help="Planilha com os pedidos a inserir (mesmo formato de --orders).")
+    replan.add_argument("--position", type=int,
+                        help="Posição de prioridade dos pedidos inseridos (0 = primeiro; padrão: ao final).")
+    replan.add_argument("--out", default=DEFAULT_EXP_PATH, help=f"Pasta de saída do plano (padrão: {DEFAULT_EXP_PATH}).")
+    replan.add_argument("--template", default=DEFAULT_MODELO_PATH, help=f"Planilha modelo (padrão: {DEFAULT_MODELO_PATH}).")
+    replan.add_argument("--calendar", default=DEFAULT_CALENDARIO_PATH, help=f"Calendário de dias úteis (padrão: {DEFAULT_CALENDARIO_PATH}).")
+    replan.set_defaults(func=_comando_replan)
+
+    scenarios = subparsers.add_parser("scenarios", parents=[comum],
+                                      help="Compara ordens de prioridade (atrasos, delay e último dia) sem gravar planos.")
+    scenarios.add_argument("--orders", required=True, help="Planilha de pedidos (.xlsx).")
+    scenarios.add_argument("--priority", nargs="*", choices=list(CRITERIOS_PRIORIDADE), default=list(CRITERIOS_PRIORIDADE),
+                           help="Critérios de prioridade comparados (padrão: todos).")
+    scenarios.add_argument("--custom", nargs="+", metavar="NOME=PEDIDOS",
+                           help="Ordens manuais, ex.: urgentes=P-3,P-7 (os demais pedidos seguem na ordem importada).")
+    scenarios.add_argument("--random", type=int, default=0, help="Número de ordens aleatórias (padrão: 0).")
+    scenarios.add_argument("--seed", type=int, default=0, help="Semente das ordens aleatórias (padrão: 0).")
+    scenarios.add_argument("--workers", type=int,
+                           help="Processos usados (padrão: um por cenário, limitado pelas CPUs).")
+    scenarios.add_argument("--template", default=DEFAULT_MODELO_PATH, help=f"Planilha modelo (padrão: {DEFAULT_MODELO_PATH}).")
+    scenarios.add_argument("--calendar", default=DEFAULT_CALENDARIO_PATH, help=f"Calendário de dias úteis (padrão: {DEFAULT_CALENDARIO_PATH}).")
+    scenarios.set_defaults(func=_comando_scenarios, log_level="WARNING")
+
+    bookings = subparsers.add_parser("bookings", parents=[comum],
+                                     help="Consulta as reservas de um plano registrado no banco de planos (planos.sqlite).")
+    bookings.add_argument("--folder", default=DEFAULT_EXP_PATH, help=f"Pasta dos planos (padrão: {DEFAULT_EXP_PATH}).")
+    bookings.add_argument("--plan", help="Plano (.xlsx) consultado (padrão: a versão mais recente da pasta).")
+    bookings.add_argument("--sector", choices=SETOR_ORDEM, help="Setor (padrão: todos).")
+    bookings.add_argument("--from", dest="date_from", metavar="DD/MM/AAAA", help="Primeiro dia do período.")
+    bookings.add_argument("--to", dest="date_to", metavar="DD/MM/AAAA", help="Último dia do período.")
+    bookings.add_argument("--order", help="Pedido (coluna Pedido).")
+    bookings.add_argument("--versions", action="store_true", help="Lista as versões registradas na pasta.")
+    bookings.set_defaults(func=_comando_bookings, log_level="WARNING")
+
+    bench = subparsers.add_parser("bench", parents=[comum],
+                                  help="Mede o tempo de cada etapa com carteiras de pedidos sintéticas.")
+    bench.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000],
+                       help="Quantidades de pedidos (padrão: 10 100 1000).")
+    bench.add_argument("--laser", type=float, default=0.5,
+                       help="Fração dos pedidos com corte Laser (padrão: 0.5).")
+    bench.add_argument("--estampa", choices=["off", "on", "both"], default="both",
+                       help="PRIORIDADE_ESTAMPA desligada, ligada ou ambas (padrão: both).")
+    bench.add_argument("--seed", type=int, default=0, help="Semente das carteiras (padrão: 0).")
+    bench.add_argument("--verify", action="store_true",
+                       help="Confere que o salto de dias ociosos do motor não altera o plano e que o "
+                            "banco, a cópia colunar e a planilha devolvem a mesma tabela.")
+    bench.add_argument("--workers", type=int,
+                       help="Processos usados na exportação dos relatórios (padrão: um por setor, limitado pelas CPUs).")
+    bench.add_argument("--imports", action="store_true",
+                       help="Mede apenas o tempo de importação dos pontos de entrada contra o orçamento.")
+    bench.add_argument("--label", help="Identificação da versão medida (ex.: hash do commit).")
+    bench.add_argument("--out", help="Arquivo JSON de resultados.")
+    bench.set_defaults(func=_comando_bench, log_level="WARNING")
+
+    return parser
+
+
+def _pasta_perfil(args) -> str:
+    """Pasta do perfil quando o comando não salva um plano (ver core.profiling)."""
+    if args.comando in ("plan", "replan"):
+        return args.out
+    if args.comando == "bench" and args.out:
+        # No bench, --out é o arquivo JSON de resultados
+        return os.path.dirname(args.out) or "."
+    return DEFAULT_EXP_PATH
+
+
+def main(argv=None) -> int:
+    """Ponto de entrada da linha de comando. Retorna o código de saída."""
+    args = criar_parser().parse_args(argv)
+    configurar_logging(args.log_level, silencioso=args.quiet, arquivo_trace=args.trace)
+    if args.stats or args.stats_json:
+        ativar_instrumentacao()
+    try:
+        with perfilar(args.comando, args.profile, pasta_destino=_pasta_perfil(args),
+                      referencia=getattr(args, "plan", None)):
+            return args.func(args)
+    except (FileNotFoundError, ValueError, IOError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return SAIDA_ERRO
+    finally:
+        if args.stats:
+            imprimir_resumo_instrumentacao()
+        if args.stats_json:
+            salvar_instrumentacao_json(args.stats_json)
@@ -1,17 +1,45 @@
 """
 Módulo core que contém as funcionalidades principais do sistema de planejamento de produção.
+
+Os nomes abaixo são carregados sob demanda, como em `automation/__init__.py`:
+importar um submódulo (ex.: automation.core.scheduling_engine) não importa os
+demais.
 """
 
-from automation.core.constants import SETOR_ORDEM
-from automation.core.calendar_utils import obter_proximos_dias_uteis
-from automation.core.excel_utils import encontrar_coluna_por_data
-from automation.core.file_utils import salvar_nova_versao
-from automation.core.production_planner import preencher_producao
-
-__all__ = [
-    'SETOR_ORDEM',
-    'obter_proximos_dias_uteis',
-    'encontrar_coluna_por_data',
-    'salvar_nova_versao',
-    'preencher_producao'
-]
\ No newline at end of file
+import importlib
+
+# Nome exposto -> módulo onde ele é definido
+_EXPORTACOES = {
+    'SETOR_ORDEM': 'automation.core.constants',
+    'obter_proximos_dias_uteis': 'automation.core.calendar_utils',
+    'CalendarioUteis': 'automation.core.calendar_utils',
+    'carregar_calendario_uteis': 'automation.core.calendar_utils',
+    'encontrar_coluna_por_data': 'automation.core.excel_utils',
+    'IndiceDatasPlanilha': 'automation.core.excel_utils',
+    'obter_indice_datas': 'automation.core.excel_utils',
+    'MatrizCapacidade': 'automation.core.capacity_ledger',
+    'salvar_nova_versao': 'automation.core.file_utils',
+    'consultar_reservas': 'automation.core.plan_store',
+    'preencher_producao': 'automation.core.production_planner',
+    'PedidoPlanejamento': 'automation.core.scheduling_engine',
+    'ResultadoPedido': 'automation.core.scheduling_engine',
+    'planejar_pedido': 'automation.core.scheduling_engine',
+    'planejar_pedidos': 'automation.core.scheduling_engine',
+    'ativar_instrumentacao': 'automation.core.instrumentation',
+    'resumo_instrumentacao': 'automation.core.instrumentation',
+}
+
+__all__ = list(_EXPORTACOES)
+
+
+def __getattr__(nome):
+    modulo = _EXPORTACOES.get(nome)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(importlib.import_module(modulo), nome)
+    globals()[nome] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -2,9 +2,15 @@
 Funções de utilidade para lidar com o calendário de dias úteis.
 """
 
-import pandas as pd
-from datetime import datetime
+import os
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from datetime import date, datetime
+from itertools import islice
+
+import numpy as np
 from automation.core.constants import DEFAULT_CALENDARIO_PATH
+from automation.core.instrumentation import contar, medir
 
 def carregar_calendario(calendario_path=DEFAULT_CALENDARIO_PATH):
     """
@@ -16,16 +22,211 @@ def carregar_calendario(calendario_path=DEFAULT_CALENDARIO_PATH):
     Returns:
         pandas.DataFrame: DataFrame contendo o calendário com datas convertidas.
     """
+    import pandas as pd
+
+    contar("csv_lidos")
     try:
-        df_cal = pd.read_csv(calendario_path)
-        df_cal['DATA'] = pd.to_datetime(df_cal['DATA'], format="%d/%m/%Y")
+        with medir("ler_calendario"):
+            df_cal = pd.read_csv(calendario_path)
+            df_cal['DATA'] = pd.to_datetime(df_cal['DATA'], format="%d/%m/%Y")
         return df_cal
     except Exception as e:
         raise IOError(f"Erro ao carregar calendário: {e}")
 
+class JanelaDias(Sequence):
+    """
+    Visão somente leitura de um trecho da lista de dias úteis, sem cópia.
+    """
+
+    def __init__(self, dias: list, inicio: int, fim: int):
+        self._dias = dias
+        self._inicio = inicio
+        self._fim = max(inicio, min(fim, len(dias)))
+
+    def __len__(self):
+        return self._fim - self._inicio
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            inicio, fim, passo = idx.indices(len(self))
+            if passo != 1:
+                return [self[i] for i in range(inicio, fim, passo)]
+            return JanelaDias(self._dias, self._inicio + inicio, self._inicio + fim)
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("Índice fora da janela de dias úteis")
+        return self._dias[self._inicio + idx]
+
+    def __iter__(self):
+        return islice(self._dias, self._inicio, self._fim)
+
+    @property
+    def inicio(self) -> int:
+        """Posição do primeiro dia da janela na lista completa de dias úteis."""
+        return self._inicio
+
+    def __repr__(self):
+        return f"JanelaDias({len(self)} dias)"
+
+
+class CalendarioUteis:
+    """
+    Calendário de dias úteis ordenado, com busca binária da data inicial.
+
+    Construído uma única vez por arquivo de calendário (ver carregar_calendario_uteis).
+    """
+
+    def __init__(self, dias_uteis):
+        self._dias = sorted(dias_uteis)
+        self._dias_semana = None
+        self._dias_array = None
+
+    @classmethod
+    def a_partir_do_arquivo(cls, calendario_path=DEFAULT_CALENDARIO_PATH):
+        """
+        Cria o calendário a partir do arquivo CSV, mantendo apenas os dias marcados como UTIL.
+        
+        Args:
+            calendario_path (str): Caminho para o arquivo do calendário.
+            
+        Returns:
+            CalendarioUteis: Calendário com os dias úteis ordenados.
+        """
+        df_cal = carregar_calendario(calendario_path)
+        dias = df_cal.loc[df_cal['VALOR'] == 'UTIL', 'DATA'].dt.to_pydatetime()
+        return cls(list(dias))
+
+    def __len__(self):
+        return len(self._dias)
+
+    def __getitem__(self, idx):
+        return self._dias[idx]
+
+    def dias_semana(self) -> np.ndarray:
+        """Dia da semana (0=segunda) de cada dia útil, calculado uma única vez."""
+        if self._dias_semana is None:
+            self._dias_semana = np.fromiter((dia.weekday() for dia in self._dias), dtype=np.int8, count=len(self._dias))
+        return self._dias_semana
+
+    def dias_array(self) -> np.ndarray:
+        """Dias úteis como datetime64[D], para cálculos vetorizados (calculado uma única vez)."""
+        if self._dias_array is None:
+            self._dias_array = np.array(self._dias, dtype="datetime64[D]")
+        return self._dias_array
+
+    def posicao(self, data) -> int:
+        """Retorna o índice do primeiro dia útil maior ou igual à data."""
+        return bisect_left(self._dias, _converter_data(data))
+
+    def proximos(self, data_inicio, quantidade: int = None) -> JanelaDias:
+        """
+        Retorna os dias úteis a partir de data_inicio (inclusive).
+
+        Args:
+            data_inicio (datetime ou str): Data inicial para busca.
+            quantidade (int): Quantidade de dias úteis. Se None, retorna todos os
+                dias até o fim do calendário, permitindo estender o horizonte sob demanda.
+
+        Returns:
+            JanelaDias: Visão dos dias úteis selecionados (sem cópia da lista).
+        """
+        inicio = self.posicao(data_inicio)
+        fim = len(self._dias) if quantidade is None else inicio + quantidade
+        return JanelaDias(self._dias, inicio, fim)
+
+    def dias_uteis_entre(self, inicio, fim) -> int:
+        """
+        Conta os dias úteis d tais que inicio < d <= fim.
+        Se fim for anterior a inicio, o resultado é negativo.
+
+        Args:
+            inicio (datetime ou str): Data de referência (ex.: data de entrega).
+            fim (datetime ou str): Data comparada (ex.: último dia de produção).
+
+        Returns:
+            int: Quantidade de dias úteis entre as datas.
+        """
+        inicio = _converter_data(inicio)
+        fim = _converter_data(fim)
+        if fim >= inicio:
+            return bisect_right(self._dias, fim) - bisect_right(self._dias, inicio)
+        return -(bisect_right(self._dias, inicio) - bisect_right(self._dias, fim))
+
+    @property
+    def ultimo_dia(self):
+        """Último dia útil do calendário, ou None se estiver vazio."""
+        return self._dias[-1] if self._dias else None
+
+
+# Colunas de data das tabelas de pedidos, mantidas como datetime64 e formatadas só na exibição/exportação
+COLUNAS_DATA = ("ENTREGA", "INICIO", "PRIMEIRO DIA", "ULTIMO DIA")
+
+
+def formatar_data(valor):
+    """Formata date/datetime como DD/MM/AAAA; NaT vira None e os demais valores são mantidos."""
+    if isinstance(valor, (datetime, date)):
+        return None if valor != valor else valor.strftime("%d/%m/%Y")
+    return valor
+
+
+def formatar_datas(df, colunas=COLUNAS_DATA):
+    """
+    Retorna uma cópia do DataFrame com as colunas de data datetime64 formatadas
+    como DD/MM/AAAA, para exibir ou exportar a tabela.
+    """
+    import pandas as pd
+
+    df = df.copy()
+    for coluna in colunas:
+        if coluna in df and pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            df[coluna] = df[coluna].dt.strftime("%d/%m/%Y")
+    return df
+
+
+def _converter_data(data):
+    """Converte str (DD/MM/AAAA), date ou Timestamp para datetime."""
+    if isinstance(data, str):
+        return datetime.strptime(data, "%d/%m/%Y")
+    if isinstance(data, datetime):
+        return data
+    if isinstance(data, date):
+        return datetime(data.year, data.month, data.day)
+    return data
+
+
+# Cache por caminho: {caminho: ((mtime_ns, tamanho), CalendarioUteis)}
+_cache_calendarios = {}
+
+
+def carregar_calendario_uteis(calendario_path=DEFAULT_CALENDARIO_PATH) -> CalendarioUteis:
+    """
+    Retorna o calendário de dias úteis, relendo o arquivo apenas se ele foi modificado.
+
+    Args:
+        calendario_path (str): Caminho para o arquivo do calendário.
+
+    Returns:
+        CalendarioUteis: Calendário de dias úteis.
+    """
+    try:
+        stat = os.stat(calendario_path)
+    except OSError as e:
+        raise IOError(f"Erro ao carregar calendário: {e}")
+    assinatura = (stat.st_mtime_ns, stat.st_size)
+
+    em_cache = _cache_calendarios.get(calendario_path)
+    if em_cache and em_cache[0] == assinatura:
+        return em_cache[1]
+
+    calendario = CalendarioUteis.a_partir_do_arquivo(calendario_path)
+    _cache_calendarios[calendario_path] = (assinatura, calendario)
+    return calendario
+
+
 def obter_proximos_dias_uteis(data_inicio, dias_necessarios, calendario_path=DEFAULT_CALENDARIO_PATH):
     """
-    Obtém uma lista de dias úteis a partir da data fornecida (inclusive).
+    Obtém os dias úteis a partir da data fornecida (inclusive).
     
     Args:
         data_inicio (datetime ou str): Data inicial para busca.
@@ -33,33 +234,7 @@ def obter_proximos_dias_uteis(data_inicio, dias_necessarios, calendario_path=DEF
         calendario_path (str): Caminho para o arquivo de calendário.
         
     Returns:
-        list: Lista de objetos datetime representando os dias úteis.
+        JanelaDias: Sequência de objetos datetime representando os dias úteis.
     """
-    df_cal = carregar_calendario(calendario_path)
-    
-    # Filtra apenas dias úteis
-    dias_uteis = df_cal[df_cal['VALOR'] == 'UTIL']['DATA'].tolist()
-    
-    # Converte data_inicio para datetime se for string
-    if isinstance(data_inicio, str):
-        data_inicio = datetime.strptime(data_inicio, "%d/%m/%Y")
-    
-    # Usa a data exata fornecida
-    data_proxima = data_inicio
-    
-    # Encontra a posição do próximo dia útil a partir da data fornecida (inclusive)
-    encontrou = False
-    proxima_data_util_idx = 0
-    
-    for i, data in enumerate(dias_uteis):
-        if data >= data_proxima:
-            proxima_data_util_idx = i
-            encontrou = True
-            break
-    
-    if not encontrou:
-        return []
-    
-    # Retorna os próximos dias úteis necessários
-    dias_selecionados = dias_uteis[proxima_data_util_idx:proxima_data_util_idx + dias_necessarios]
-    return dias_selecionados
\ No newline at end of file
+    calendario = carregar_calendario_uteis(calendario_path)
+    return calendario.proximos(data_inicio, dias_necessarios)
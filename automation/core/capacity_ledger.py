@@ -0,0 +1,219 @@
+"""
+Matriz em memória da capacidade por setor e dia útil.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from automation.core.constants import SETOR_ORDEM
+from automation.core.excel_utils import obter_indice_datas, obter_limite_producao, normalizar_data
+from automation.core.instrumentation import contar
+
+if TYPE_CHECKING:
+    from openpyxl.worksheet.worksheet import Worksheet
+
+
+class MatrizCapacidade:
+    """
+    Capacidade restante por (setor, dia), em um array NumPy denso de forma
+    (setores x dias).
+
+    É construída uma única vez a partir da planilha modelo, com os limites de
+    E3:E12 (já ajustados pela CARGA), e atualizada a cada pedido planejado. A
+    consulta da produção já planejada é O(1) e a visão de carga/utilização do
+    plano inteiro é uma redução sobre a matriz.
+    """
+
+    def __init__(self, datas, capacidades, setores=SETOR_ORDEM):
+        """
+        Args:
+            datas (list): Dias (date ou datetime) das colunas da matriz, em ordem.
+            capacidades (list): Capacidade diária de cada setor, na ordem de `setores`.
+            setores (list): Setores das linhas da matriz.
+        """
+        self.setores = list(setores)
+        self.datas = [normalizar_data(data) for data in datas]
+        self._idx_setor = {setor: i for i, setor in enumerate(self.setores)}
+        self._idx_data = {data: j for j, data in enumerate(self.datas)}
+        self.capacidade = np.asarray(capacidades, dtype=np.int64)
+        self.restante = np.repeat(self.capacidade[:, None], len(self.datas), axis=1)
+        self._colunas_calendario = None
+
+    @classmethod
+    def a_partir_da_planilha(cls, ws: Worksheet, calendario=None, linha_inicial: int = 13):
+        """
+        Cria a matriz com os limites de [E3:E12] e a produção já existente na planilha.
+
+        Args:
+            ws (Worksheet): Planilha do openpyxl.
+            calendario (CalendarioUteis): Se informado, as colunas da matriz ficam
+                restritas aos dias úteis do calendário.
+            linha_inicial (int): Primeira linha dos pedidos.
+
+        Returns:
+            MatrizCapacidade: Matriz com a capacidade restante de cada setor por dia.
+        """
+        indice_datas = obter_indice_datas(ws)
+        capacidades = [obter_limite_producao(ws, i + 3) for i in range(len(SETOR_ORDEM))]
+        matriz = cls.a_partir_do_indice(indice_datas, capacidades, calendario)
+
+        colunas = indice_datas.colunas()
+        if not colunas:
+            return matriz
+
+        primeira_coluna = min(colunas)
+        ultima_coluna = max(colunas)
+        setores = set(SETOR_ORDEM)
+        linhas_lidas = 0
+
+        for row in ws.iter_rows(min_row=linha_inicial, max_col=ultima_coluna, values_only=True):
+            linhas_lidas += 1
+            setor = row[6] if len(row) > 6 else None  # Coluna G
+            if setor not in setores:
+                continue
+            for col in range(primeira_coluna, ultima_coluna + 1):
+                valor = row[col - 1]
+                if not valor or colunas.get(col) not in matriz:
+                    continue
+                try:
+                    matriz.registrar(setor, colunas[col], int(valor))
+                except (ValueError, TypeError):
+                    continue
+        contar("celulas_lidas", linhas_lidas * ultima_coluna)
+        return matriz
+
+    @classmethod
+    def a_partir_do_indice(cls, indice_datas, capacidades, calendario=None):
+        """
+        Cria uma matriz vazia com as datas do cabeçalho da planilha.
+
+        Args:
+            indice_datas (IndiceDatasPlanilha): Índice de datas do cabeçalho.
+            capacidades (list): Capacidade diária de cada setor, na ordem de SETOR_ORDEM.
+            calendario (CalendarioUteis): Se informado, restringe as colunas aos dias úteis.
+
+        Returns:
+            MatrizCapacidade: Matriz sem produção planejada.
+        """
+        datas = sorted(set(indice_datas.colunas().values()))
+        if calendario is not None:
+            dias_uteis = {normalizar_data(dia) for dia in calendario}
+            datas = [data for data in datas if data in dias_uteis]
+        return cls(datas, capacidades)
+
+    def __contains__(self, data):
+        return normalizar_data(data) in self._idx_data
+
+    def copia(self):
+        """Retorna uma cópia independente da matriz (mesmas datas e capacidades)."""
+        nova = MatrizCapacidade.__new__(MatrizCapacidade)
+        nova.setores = self.setores
+        nova.datas = self.datas
+        nova._idx_setor = self._idx_setor
+        nova._idx_data = self._idx_data
+        nova.capacidade = self.capacidade
+        nova.restante = self.restante.copy()
+        nova._colunas_calendario = self._colunas_calendario
+        return nova
+
+    def planejado(self, setor: str, data) -> int:
+        """Retorna a produção já planejada para o setor na data (0 fora da matriz)."""
+        j = self._idx_data.get(normalizar_data(data))
+        if j is None:
+            return 0
+        i = self._idx_setor[setor]
+        return int(self.capacidade[i] - self.restante[i, j])
+
+    def disponivel(self, setor: str, data, limite_max: int = None) -> int:
+        """Retorna a capacidade restante do setor na data (pelo limite da matriz ou pelo informado)."""
+        if limite_max is None:
+            limite_max = int(self.capacidade[self._idx_setor[setor]])
+        return max(0, limite_max - self.planejado(setor, data))
+
+    def colunas_entre(self, inicio, fim=None) -> slice:
+        """Faixa de colunas com as datas entre inicio e fim (inclusive; fim None = até a última)."""
+        primeira = bisect_left(self.datas, normalizar_data(inicio))
+        ultima = len(self.datas) if fim is None else bisect_right(self.datas, normalizar_data(fim))
+        return slice(primeira, ultima)
+
+    def colunas_calendario(self, calendario) -> np.ndarray:
+        """
+        Coluna da matriz correspondente a cada dia útil do calendário (-1 se o dia
+        não estiver na matriz). O resultado é guardado para o último calendário usado.
+        """
+        if self._colunas_calendario is None or self._colunas_calendario[0] is not calendario:
+            colunas = np.fromiter(
+                (self._idx_data.get(normalizar_data(dia), -1) for dia in calendario),
+                dtype=np.intp, count=len(calendario)
+            )
+            self._colunas_calendario = (calendario, colunas)
+        return self._colunas_calendario[1]
+
+    def disponivel_nos_dias(self, setor: str, colunas: np.ndarray, limite_max: int = None) -> np.ndarray:
+        """
+        Versão vetorizada de `disponivel` para várias colunas de uma vez.
+        Colunas -1 (dias fora da matriz) não têm produção planejada.
+        """
+        i = self._idx_setor[setor]
+        if limite_max is None:
+            limite_max = int(self.capacidade[i])
+        planejado = np.where(colunas >= 0, self.capacidade[i] - self.restante[i, colunas], 0)
+        return np.maximum(0, limite_max - planejado)
+
+    def registrar(self, setor: str, data, quantidade: int):
+        """Reserva produção do setor na data."""
+        self.restante[self._idx_setor[setor], self._idx_data[normalizar_data(data)]] -= int(quantidade)
+
+    def registrar_reservas(self, reservas, sinal: int = 1):
+        """
+        Aplica de uma vez as reservas (setor, dia, quantidade) de um pedido.
+
+        Args:
+            reservas (list): Tuplas (setor, dia, quantidade).
+            sinal (int): 1 para reservar, -1 para liberar a capacidade.
+        """
+        if not reservas:
+            return
+        total = len(reservas)
+        linhas = np.fromiter((self._idx_setor[setor] for setor, _, _ in reservas), dtype=np.intp, count=total)
+        colunas = np.fromiter((self._idx_data[normalizar_data(dia)] for _, dia, _ in reservas), dtype=np.intp, count=total)
+        quantidades = np.fromiter((int(q) for _, _, q in reservas), dtype=np.int64, count=total)
+        np.subtract.at(self.restante, (linhas, colunas), sinal * quantidades)
+
+    def planejado_total(self) -> np.ndarray:
+        """Retorna a matriz (setores x dias) da produção planejada."""
+        return self.capacidade[:, None] - self.restante
+
+    def janela_utilizada(self):
+        """Retorna (primeira, última) coluna com produção planejada, ou None."""
+        colunas = np.flatnonzero((self.restante != self.capacidade[:, None]).any(axis=0))
+        if colunas.size == 0:
+            return None
+        return int(colunas[0]), int(colunas[-1])
+
+    def utilizacao(self, capacidades=None) -> dict:
+        """
+        Percentual da capacidade usada por setor entre o primeiro e o último dia do plano.
+
+        Args:
+            capacidades (list): Capacidade diária de cada setor usada como base (ex.: os
+                limites de [E3:E12] sem truncar). Padrão: a capacidade inteira da matriz.
+
+        Returns:
+            dict: {setor: percentual}
+        """
+        janela = self.janela_utilizada()
+        if janela is None:
+            return {setor: 0.0 for setor in self.setores}
+        if capacidades is None:
+            capacidades = self.capacidade
+        planejado = self.planejado_total()[:, janela[0]:janela[1] + 1].sum(axis=1)
+        capacidade = np.asarray(capacidades, dtype=np.float64) * (janela[1] - janela[0] + 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percentual = np.where(capacidade > 0, 100.0 * planejado / capacidade, 0.0)
+        return dict(zip(self.setores, np.round(percentual, 1).tolist()))
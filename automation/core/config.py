@@ -0,0 +1,126 @@
+"""
+Carregamento em cache do arquivo de configuração (_CONFIG.csv).
+
+O arquivo é lido uma única vez e mantido em memória enquanto não for alterado;
+a verificação é feita pela data de modificação, de forma que alterações feitas
+pelo menu de configurações passam a valer sem reiniciar o programa.
+"""
+
+import os
+import unicodedata
+from dataclasses import dataclass, field
+
+from automation.core.constants import SETOR_ORDEM, DEFAULT_CONFIG_PATH
+from automation.core.instrumentation import contar, medir
+
+# Valores usados quando um parâmetro está ausente ou inválido no arquivo
+CAPACIDADES_PADRAO = [5000, 2000, 750, 500, 2000, 350, 800, 500, 1000, 1000]
+CARGA_PADRAO = 100
+SETUP_PADRAO = 100.0
+DELTA_DIAS_ESTAMPA_PADRAO = 5
+
+
+def nome_parametro_setor(setor_nome: str) -> str:
+    """Converte o nome do setor no parâmetro de capacidade (ex.: 'Separação MP' -> 'MAX_SEPARACAO_MP')."""
+    return "MAX_" + unicodedata.normalize('NFKD', setor_nome).encode('ASCII', 'ignore').decode('ASCII').upper().replace(" ", "_")
+
+
+@dataclass(frozen=True)
+class ConfiguracaoPlano:
+    """Parâmetros tipados do arquivo de configuração."""
+
+    capacidades: dict
+    setup: float = SETUP_PADRAO
+    carga: int = CARGA_PADRAO
+    prioridade_estampa: bool = False
+    delta_dias_estampa: int = DELTA_DIAS_ESTAMPA_PADRAO
+    snapshot_plano: bool = False
+    banco_plano: bool = False
+    parametros: dict = field(default_factory=dict)
+
+    def limites_maximos(self) -> list:
+        """Retorna as capacidades máximas na ordem de SETOR_ORDEM."""
+        return [self.capacidades[setor] for setor in SETOR_ORDEM]
+
+    def valor(self, parametro: str):
+        """Retorna o VALOR bruto (texto) de um parâmetro, ou None."""
+        return self.parametros.get(parametro)
+
+
+# Cache por caminho: {caminho: ((mtime_ns, tamanho), ConfiguracaoPlano)}
+_cache_configuracao = {}
+
+
+def carregar_configuracao(config_path=DEFAULT_CONFIG_PATH) -> ConfiguracaoPlano:
+    """
+    Retorna a configuração do arquivo, relendo-o apenas se ele foi modificado.
+
+    Args:
+        config_path (str): Caminho para o arquivo de configuração CSV (UTF-16).
+
+    Returns:
+        ConfiguracaoPlano: Configuração tipada.
+
+    Raises:
+        FileNotFoundError: Se o arquivo não existir.
+        ValueError: Se o arquivo não contiver as colunas 'PARAMETRO' e 'VALOR'.
+    """
+    stat = os.stat(config_path)
+    assinatura = (stat.st_mtime_ns, stat.st_size)
+
+    em_cache = _cache_configuracao.get(config_path)
+    if em_cache and em_cache[0] == assinatura:
+        return em_cache[1]
+
+    configuracao = _ler_configuracao(config_path)
+    _cache_configuracao[config_path] = (assinatura, configuracao)
+    return configuracao
+
+
+def limpar_cache_configuracao():
+    """Descarta todas as configurações em cache."""
+    _cache_configuracao.clear()
+
+
+def _ler_configuracao(config_path) -> ConfiguracaoPlano:
+    """Lê e converte o arquivo de configuração."""
+    import pandas as pd
+
+    contar("csv_lidos")
+    with medir("ler_configuracao"):
+        df = pd.read_csv(config_path, encoding='utf-16', dtype=str)
+
+    # Verifica se as colunas esperadas estão presentes
+    if 'PARAMETRO' not in df.columns or 'VALOR' not in df.columns:
+        raise ValueError("O arquivo de configuração não contém as colunas 'PARAMETRO' e 'VALOR'.")
+
+    parametros = dict(zip(df['PARAMETRO'].str.strip(), df['VALOR'].str.strip()))
+
+    capacidades = {}
+    for setor, padrao in zip(SETOR_ORDEM, CAPACIDADES_PADRAO):
+        parametro = nome_parametro_setor(setor)
+        capacidades[setor] = _converter(parametros, parametro, int, padrao)
+
+    return ConfiguracaoPlano(
+        capacidades=capacidades,
+        setup=_converter(parametros, 'SETUP', float, SETUP_PADRAO),
+        carga=_converter(parametros, 'CARGA', int, CARGA_PADRAO, avisar=False),
+        prioridade_estampa=parametros.get('PRIORIDADE_ESTAMPA') == 'Sim',
+        delta_dias_estampa=_converter(parametros, 'DELTA_DIAS_ESTAMPA', int, DELTA_DIAS_ESTAMPA_PADRAO, avisar=False),
+        snapshot_plano=parametros.get('SNAPSHOT_PLANO') == 'Sim',
+        banco_plano=parametros.get('BANCO_PLANO') == 'Sim',
+        parametros=parametros,
+    )
+
+
+def _converter(parametros: dict, parametro: str, tipo, padrao, avisar: bool = True):
+    """Converte um parâmetro para o tipo desejado, usando o padrão se ausente ou inválido."""
+    if parametro not in parametros:
+        if avisar:
+            print(f"⚠ Parâmetro '{parametro}' não encontrado no arquivo de configuração. Usando valor padrão {padrao}.")
+        return padrao
+    try:
+        return tipo(parametros[parametro])
+    except (ValueError, TypeError):
+        print(f"⚠ Erro ao converter o valor de '{parametro}'. Valor encontrado: '{parametros[parametro]}'. Usando valor padrão {padrao}.")
+        return padrao
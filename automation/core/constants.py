@@ -12,41 +12,35 @@ SETOR_ORDEM = [
 DEFAULT_CALENDARIO_PATH = 'data/_CALENDARIO.csv'
 DEFAULT_CONFIG_PATH = 'data/_CONFIG.csv'
 DEFAULT_EXP_PATH = 'exp/'
+DEFAULT_MODELO_PATH = 'model/planejamento.xlsx'
 
-import pandas as pd
-from automation.core.constants import DEFAULT_CONFIG_PATH
-
-def obter_valor_parametro(parametro: str):
+def obter_valor_parametro(parametro: str, config_path: str = DEFAULT_CONFIG_PATH):
     """
-    Consulta o arquivo DEFAULT_CONFIG_PATH e retorna o VALOR do PARAMETRO fornecido.
+    Consulta o arquivo de configuração e retorna o VALOR do PARAMETRO fornecido.
+    O arquivo é lido uma única vez e relido apenas quando for modificado.
 
     Args:
         parametro (str): O nome do parâmetro a ser consultado.
+        config_path (str): Caminho para o arquivo de configuração.
 
     Returns:
         str: O valor do parâmetro, se encontrado.
         None: Se o parâmetro não for encontrado.
     """
+    from automation.core.config import carregar_configuracao
+
     try:
-        # Lê o arquivo de configuração
-        df = pd.read_csv(DEFAULT_CONFIG_PATH, encoding='utf-16')
-        
-        # Verifica se as colunas esperadas estão presentes
-        if 'PARAMETRO' not in df.columns or 'VALOR' not in df.columns:
-            raise ValueError("O arquivo de configuração não contém as colunas 'PARAMETRO' e 'VALOR'.")
-        
-        # Busca o parâmetro no DataFrame
-        resultado = df.loc[df['PARAMETRO'] == parametro, 'VALOR']
+        valor = carregar_configuracao(config_path).valor(parametro)
         
         # Retorna o valor se encontrado, caso contrário retorna None
-        if not resultado.empty:
-            return resultado.iloc[0]
+        if valor is not None:
+            return valor
         else:
             print(f"⚠ Parâmetro '{parametro}' não encontrado no arquivo de configuração.")
             return None
     except FileNotFoundError:
-        print(f"⚠ Arquivo de configuração não encontrado: {DEFAULT_CONFIG_PATH}")
+        print(f"⚠ Arquivo de configuração não encontrado: {config_path}")
         return None
     except Exception as e:
         print(f"⚠ Erro ao consultar o parâmetro '{parametro}': {e}")
-        return None
\ No newline at end of file
+        return None
@@ -1,11 +1,127 @@
 """
 Funções de utilidade para manipulação de planilhas Excel.
 """
-import csv
-import pandas as pd
+from __future__ import annotations
+
+import weakref
 from datetime import datetime
-from openpyxl.worksheet.worksheet import Worksheet
+from typing import TYPE_CHECKING
 from automation.core.constants import DEFAULT_CONFIG_PATH
+from automation.core.config import carregar_configuracao, CAPACIDADES_PADRAO
+from automation.core.instrumentation import contar
+from automation.core.plan_layout import DESLOCAMENTO_SETOR
+
+if TYPE_CHECKING:
+    from openpyxl.worksheet.worksheet import Worksheet
+
+
+class IndiceDatasPlanilha:
+    """
+    Índice data -> coluna da linha de cabeçalho (linha 2) da planilha.
+
+    O cabeçalho é lido e convertido uma única vez; as consultas seguintes são O(1).
+    Aceita células datetime ou strings nos formatos DD/MM/YYYY e YYYY-MM-DD.
+    """
+
+    def __init__(self, ws: Worksheet = None, linha_cabecalho: int = 2, coluna_inicial: int = 8):
+        self._colunas = {}
+        self._datas = {}
+        if ws is None:
+            return
+        valores = {
+            col: ws.cell(row=linha_cabecalho, column=col).value
+            for col in range(coluna_inicial, ws.max_column + 1)  # Começando da coluna H (8)
+        }
+        contar("celulas_lidas", len(valores))
+        self._indexar(valores)
+
+    @classmethod
+    def a_partir_dos_valores(cls, valores, coluna_inicial: int = 8):
+        """
+        Cria o índice a partir dos valores da linha de cabeçalho, sem planilha carregada.
+
+        Args:
+            valores (list): Valores da linha de cabeçalho a partir da coluna A.
+            coluna_inicial (int): Primeira coluna de datas (H = 8).
+        """
+        indice = cls()
+        indice._indexar({
+            col: valores[col - 1] for col in range(coluna_inicial, len(valores) + 1)
+        })
+        return indice
+
+    def _indexar(self, valores: dict):
+        for col, cell_value in valores.items():
+            data = _converter_data_cabecalho(cell_value)
+            if data is None:
+                continue
+            self._datas[col] = data
+            # Mantém a primeira coluna encontrada, como na busca linear original
+            self._colunas.setdefault(data, col)
+
+    def coluna(self, data):
+        """Retorna o número da coluna da data ou None se ela não estiver na planilha."""
+        return self._colunas.get(normalizar_data(data))
+
+    def data(self, coluna: int):
+        """Retorna a data (date) da coluna ou None."""
+        return self._datas.get(coluna)
+
+    def colunas(self):
+        """Retorna o dicionário {coluna: date} em ordem de coluna."""
+        return dict(self._datas)
+
+    def __contains__(self, data):
+        return normalizar_data(data) in self._colunas
+
+    def __len__(self):
+        return len(self._datas)
+
+
+def normalizar_data(data):
+    """Normaliza datetime/Timestamp/date para um objeto date."""
+    if isinstance(data, datetime):
+        return data.date()
+    return data
+
+
+def _converter_data_cabecalho(cell_value):
+    """Converte o valor de uma célula do cabeçalho em date, ou None."""
+    if isinstance(cell_value, datetime):
+        return cell_value.date()
+    if isinstance(cell_value, str):
+        for formato in ("%d/%m/%Y", "%Y-%m-%d"):
+            try:
+                return datetime.strptime(cell_value, formato).date()
+            except ValueError:
+                pass
+    return None
+
+
+# Um índice por planilha carregada; descartado junto com a planilha
+_indices_datas = weakref.WeakKeyDictionary()
+
+
+def obter_indice_datas(ws: Worksheet) -> IndiceDatasPlanilha:
+    """
+    Retorna o índice de datas da planilha, construindo-o na primeira chamada.
+
+    Args:
+        ws (Worksheet): Planilha do openpyxl.
+
+    Returns:
+        IndiceDatasPlanilha: Índice data -> coluna da planilha.
+    """
+    indice = _indices_datas.get(ws)
+    if indice is None:
+        indice = IndiceDatasPlanilha(ws)
+        _indices_datas[ws] = indice
+    return indice
+
+
+def descartar_indice_datas(ws: Worksheet):
+    """Descarta o índice em cache da planilha (ex.: após alterar o cabeçalho)."""
+    _indices_datas.pop(ws, None)
 
 
 def encontrar_coluna_por_data(ws: Worksheet, data):
@@ -20,34 +136,8 @@ def encontrar_coluna_por_data(ws: Worksheet, data):
     Returns:
         int or None: Número da coluna se encontrada, None caso contrário.
     """
-    data_str = data.strftime("%d/%m/%Y")
-    
-    for col in range(8, ws.max_column + 1):  # Começando da coluna H (8)
-        cell_value = ws.cell(row=2, column=col).value
-        
-        # Verifica se o valor da célula é uma data
-        if isinstance(cell_value, datetime):
-            # Compara o valor da data
-            if cell_value.date() == data.date():
-                return col
-        elif isinstance(cell_value, str):
-            # Tenta converter para datetime se for string
-            try:
-                # Tenta primeiro o formato DD/MM/YYYY
-                cell_date = datetime.strptime(cell_value, "%d/%m/%Y")
-                if cell_date.date() == data.date():
-                    return col
-            except ValueError:
-                try:
-                    # Tenta o formato YYYY-MM-DD
-                    cell_date = datetime.strptime(cell_value, "%Y-%m-%d")
-                    if cell_date.date() == data.date():
-                        return col
-                except ValueError:
-                    # Ignora se não conseguir converter
-                    pass
-    
-    return None
+    contar("encontrar_coluna_por_data")
+    return obter_indice_datas(ws).coluna(data)
 
 def calcular_producao_planejada(ws: Worksheet, setor_nome: str, coluna: int, linha_limite: int):
     """
@@ -71,6 +161,28 @@ def calcular_producao_planejada(ws: Worksheet, setor_nome: str, coluna: int, lin
             
     return valor_planejado
 
+def escrever_reservas(ws: Worksheet, linha: int, reservas, indice_datas: IndiceDatasPlanilha = None):
+    """
+    Grava na planilha, em uma única passada, as reservas de um pedido.
+
+    Args:
+        ws (Worksheet): Planilha do openpyxl.
+        linha (int): Linha do pedido; cada setor fica em linha + DESLOCAMENTO_SETOR[setor].
+        reservas (list): Tuplas (setor, dia, quantidade) produzidas pelo motor de planejamento.
+        indice_datas (IndiceDatasPlanilha): Índice de datas da planilha (opcional).
+    """
+    if indice_datas is None:
+        indice_datas = obter_indice_datas(ws)
+    gravadas = 0
+    for setor, dia, quantidade in reservas:
+        col = indice_datas.coluna(dia)
+        if col is None:
+            continue
+        cell = ws.cell(row=linha + DESLOCAMENTO_SETOR[setor], column=col)
+        cell.value = (cell.value or 0) + quantidade
+        gravadas += 1
+    contar("celulas_gravadas", gravadas)
+
 def obter_limite_producao(ws: Worksheet, linha_limite: int):
     """
     Obtém o limite de produção diário para um setor.
@@ -82,6 +194,7 @@ def obter_limite_producao(ws: Worksheet, linha_limite: int):
     Returns:
         int: Valor limite de produção diária para o setor.
     """
+    contar("celulas_lidas")
     try:
         valor_limite_cell = ws.cell(row=linha_limite, column=5).value
         valor_limite_max = int(valor_limite_cell) if valor_limite_cell is not None else 0
@@ -90,22 +203,17 @@ def obter_limite_producao(ws: Worksheet, linha_limite: int):
         return 0
 
 def obter_carga_producao(config_path=DEFAULT_CONFIG_PATH):
-    
-    try:
-        df = pd.read_csv(config_path, encoding='utf-16')
+    """
+    Obtém o percentual de CARGA do arquivo de configuração.
 
-        # Verifica se as colunas esperadas estão presentes
-        if 'PARAMETRO' not in df.columns or 'VALOR' not in df.columns:
-            print("⚠ Erro: Colunas 'PARAMETRO' ou 'VALOR' estão ausentes no arquivo CSV.")
-            raise ValueError("Colunas obrigatórias ausentes no arquivo CSV.")
-        
-        config_data = pd.Series(df['VALOR'].values, index=df['PARAMETRO']).to_dict()
+    Args:
+        config_path (str): Caminho para o arquivo de configuração CSV.
 
-        if "CARGA" in config_data:
-            return int(config_data['CARGA'])
-        else:
-            return 100
-        
+    Returns:
+        int: Percentual de carga produtiva, ou 100 se não for possível ler o arquivo.
+    """
+    try:
+        return carregar_configuracao(config_path).carga
     except FileNotFoundError:
         print(f"Arquivo de configuração não encontrado: {config_path}. Usando valores padrão 100%")
     except ValueError as e:
@@ -125,39 +233,9 @@ def atualizar_limites_maximos(config_path=DEFAULT_CONFIG_PATH):
     Returns:
         list: Lista de valores de limites máximos.
     """
-    max_list = []
-    standard_list = [5000, 2000, 750, 500, 2000, 350, 800, 500, 1000, 1000]
-    max_order_list = [
-        'MAX_PCP', 'MAX_SEPARACAO_MP', 'MAX_CORTE_MANUAL', 'MAX_IMPRESSAO',
-        'MAX_ESTAMPA', 'MAX_CORTE_LASER','MAX_DISTRIBUICAO', 'MAX_COSTURA', 'MAX_ARREMATE', 'MAX_EMBALAGEM',
-    ]
+    standard_list = list(CAPACIDADES_PADRAO)
     try:
-        df = pd.read_csv(config_path, encoding='utf-16')
-
-        # Verifica se as colunas esperadas estão presentes
-        if 'PARAMETRO' not in df.columns or 'VALOR' not in df.columns:
-            print("⚠ Erro: Colunas 'PARAMETRO' ou 'VALOR' estão ausentes no arquivo CSV.")
-            raise ValueError("Colunas obrigatórias ausentes no arquivo CSV.")
-
-        # Cria um dicionário com os valores do arquivo
-        config_data = pd.Series(df['VALOR'].values, index=df['PARAMETRO']).to_dict()
-
-        # Itera na ordem de max_order_list e busca os valores correspondentes
-        max_list = []
-        for parametro in max_order_list:
-            if parametro in config_data:
-                try:
-                    valor = int(config_data[parametro])
-                    max_list.append(valor)
-                except ValueError:
-                    print(f"⚠ Erro ao converter o valor de '{parametro}' para inteiro. Valor encontrado: '{config_data[parametro]}'")
-                    max_list.append(standard_list[max_order_list.index(parametro)])
-            else:
-                print(f"⚠ Parâmetro '{parametro}' não encontrado no arquivo de configuração. Usando valor padrão {standard_list[max_order_list.index(parametro)]}.")
-                max_list.append(standard_list[max_order_list.index(parametro)])
-
-        return max_list
-
+        return carregar_configuracao(config_path).limites_maximos()
     except FileNotFoundError:
         print(f"Arquivo de configuração não encontrado: {config_path}. Usando valores padrão ({standard_list}).")
     except ValueError as e:
@@ -184,3 +262,4 @@ def atualizar_celulas_limite(ws: Worksheet, max_list: list):
         linha = 3 + i
         coluna = 5  # Coluna E é a 5ª coluna
         ws.cell(row=linha, column=coluna, value=valor)
+    contar("celulas_gravadas", len(max_list))
@@ -4,33 +4,57 @@ Funções de utilidade para manipulação de arquivos.
 
 from datetime import datetime
 from pathlib import Path
-from automation.core.constants import DEFAULT_CONFIG_PATH, obter_valor_parametro
-from automation.core.excel_utils import obter_carga_producao
+from automation.core.constants import DEFAULT_CONFIG_PATH, DEFAULT_EXP_PATH
+from automation.core.config import carregar_configuracao
+from automation.core.instrumentation import cronometrado
 
+# Carimbo de data/hora dos nomes das versões salvas (também usado pelos perfis de execução)
+FORMATO_CARIMBO = "%Y_%m_%d__%H_%M_%S"
 
-def salvar_nova_versao(caminho_original, workbook):
+# Caminho da última versão salva neste processo
+_ultima_versao = None
+
+
+def carimbo_versao() -> str:
+    """Retorna o carimbo de data/hora usado nos nomes das versões salvas."""
+    return datetime.now().strftime(FORMATO_CARIMBO)
+
+
+def ultima_versao_salva():
+    """Retorna o caminho da última versão salva por salvar_nova_versao neste processo (ou None)."""
+    return _ultima_versao
+
+
+@cronometrado()
+def salvar_nova_versao(caminho_original, workbook, pasta_destino=DEFAULT_EXP_PATH, config_path=DEFAULT_CONFIG_PATH,
+                       snapshot=None):
     """
     Salva a planilha em uma nova versão na pasta exp/
     
     Args:
         caminho_original (str): Caminho do arquivo original.
         workbook: Objeto workbook do openpyxl.
+        pasta_destino (str): Pasta onde a nova versão é salva (padrão: exp/).
+        config_path (str): Arquivo de configuração usado para compor o nome (CARGA e PRIORIDADE_ESTAMPA).
+        snapshot (pd.DataFrame): Tabela longa do plano (core.plan_snapshot). Se informada,
+            é gravada ao lado da planilha, com o mesmo nome e extensão .parquet.
         
     Returns:
         str or None: Caminho da nova versão salva ou None em caso de erro.
     """
+    global _ultima_versao
     try:
         # Garantir que a pasta exp/ existe
-        pasta_exp = Path("exp")
-        pasta_exp.mkdir(exist_ok=True)
+        pasta_exp = Path(pasta_destino)
+        pasta_exp.mkdir(parents=True, exist_ok=True)
         
         # Obter o nome do arquivo original
         base_nome = Path(caminho_original).stem
         extensao = Path(caminho_original).suffix
         
-        carga_prod = obter_carga_producao(config_path=DEFAULT_CONFIG_PATH)
-        priorizar_estampa_value = obter_valor_parametro('PRIORIDADE_ESTAMPA')
-        if priorizar_estampa_value:
+        configuracao = carregar_configuracao(config_path)
+        carga_prod = configuracao.carga
+        if configuracao.prioridade_estampa:
             priorizado = "P"
         else:
             priorizado = "N"
@@ -38,12 +62,19 @@ def salvar_nova_versao(caminho_original, workbook):
 
 
         # Gerar um nome de arquivo com timestamp
-        timestamp = datetime.now().strftime("%Y_%m_%d__%H_%M_%S")
+        timestamp = carimbo_versao()
         novo_nome = f"{base_nome}_c{carga_prod}_{priorizado}__{timestamp}_{extensao}"
         novo_caminho = pasta_exp / novo_nome
         
         # Salvar a planilha no novo caminho
         workbook.save(str(novo_caminho))
-        return str(novo_caminho)
+
+        # A cópia colunar é gravada depois da planilha, para ser a mais recente
+        if snapshot is not None:
+            from automation.core.plan_snapshot import salvar_snapshot
+
+            salvar_snapshot(str(novo_caminho), snapshot)
+        _ultima_versao = str(novo_caminho)
+        return _ultima_versao
     except Exception as e:
         return None
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+Instrumentação opcional do planejamento: tempos por etapa e contadores.
+
+Desativada por padrão. Enquanto desativada, `contar` e as funções decoradas com
+`cronometrado` apenas verificam um indicador e `medir` devolve um contexto vazio,
+de modo que o custo é desprezível.
+
+Uso:
+    ativar_instrumentacao()
+    ...                                   # planejamento, relatórios etc.
+    imprimir_resumo_instrumentacao()      # ou salvar_instrumentacao_json("metricas.json")
+
+Pela linha de comando: `--stats` ou `--stats-json ARQUIVO`; no menu interativo:
+variável de ambiente PLANEJAMENTO_METRICAS=1 (resumo ao sair) ou
+PLANEJAMENTO_METRICAS=arquivo.json.
+
+Apenas o processo atual é medido (os processos de trabalho dos relatórios em
+paralelo não entram na contagem).
+"""
+
+import atexit
+import functools
+import json
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+_ativa = False
+_contadores = {}
+# {etapa: [chamadas, tempo total (s)]}
+_tempos = {}
+_contexto_vazio = nullcontext()
+
+
+def ativar_instrumentacao():
+    """Ativa a coleta de tempos e contadores (os valores anteriores são mantidos)."""
+    global _ativa
+    _ativa = True
+
+
+def desativar_instrumentacao():
+    """Desativa a coleta."""
+    global _ativa
+    _ativa = False
+
+
+def instrumentacao_ativa() -> bool:
+    return _ativa
+
+
+def limpar_instrumentacao():
+    """Zera os tempos e contadores."""
+    _contadores.clear()
+    _tempos.clear()
+
+
+def contar(nome: str, quantidade: int = 1):
+    """Soma `quantidade` ao contador `nome`."""
+    if not _ativa:
+        return
+    _contadores[nome] = _contadores.get(nome, 0) + quantidade
+
+
+def _registrar_tempo(nome: str, duracao: float):
+    registro = _tempos.setdefault(nome, [0, 0.0])
+    registro[0] += 1
+    registro[1] += duracao
+
+
+@contextmanager
+def _medir(nome: str):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        _registrar_tempo(nome, time.perf_counter() - inicio)
+
+
+def medir(nome: str):
+    """Contexto que soma o tempo do bloco à etapa `nome`."""
+    if not _ativa:
+        return _contexto_vazio
+    return _medir(nome)
+
+
+def cronometrado(nome: str = None):
+    """Decorador que soma o tempo de cada chamada da função à etapa `nome` (padrão: nome da função)."""
+    def decorador(funcao):
+        etapa = nome or funcao.__name__
+
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if not _ativa:
+                return funcao(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                _registrar_tempo(etapa, time.perf_counter() - inicio)
+        return envolvida
+    return decorador
+
+
+def resumo_instrumentacao() -> dict:
+    """
+    Returns:
+        dict: {"tempos": {etapa: {"chamadas", "total_s"}}, "contadores": {nome: valor}}
+    """
+    return {
+        "tempos": {
+            etapa: {"chamadas": chamadas, "total_s": round(total, 6)}
+            for etapa, (chamadas, total) in sorted(_tempos.items(), key=lambda item: -item[1][1])
+        },
+        "contadores": dict(sorted(_contadores.items())),
+    }
+
+
+def imprimir_resumo_instrumentacao(arquivo=None):
+    """Imprime as etapas (da mais demorada para a mais rápida) e os contadores."""
+    arquivo = arquivo or sys.stdout
+    resumo = resumo_instrumentacao()
+    largura = max([len(nome) for nome in list(resumo["tempos"]) + list(resumo["contadores"])] + [10])
+
+    print("\n📊 Instrumentação", file=arquivo)
+    print(f"{'Etapa':<{largura}}  {'Chamadas':>9}  {'Tempo (s)':>10}", file=arquivo)
+    for etapa, valores in resumo["tempos"].items():
+        print(f"{etapa:<{largura}}  {valores['chamadas']:>9}  {valores['total_s']:>10.3f}", file=arquivo)
+    print(f"\n{'Contador':<{largura}}  {'Valor':>9}", file=arquivo)
+    for nome, valor in resumo["contadores"].items():
+        print(f"{nome:<{largura}}  {valor:>9}", file=arquivo)
+
+
+def salvar_instrumentacao_json(caminho: str):
+    """Grava o resumo em JSON."""
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(resumo_instrumentacao(), arquivo, ensure_ascii=False, indent=2)
+
+
+def finalizar_instrumentacao(destino: str = None):
+    """Grava o resumo em `destino` (.json) ou o imprime se destino não for um arquivo JSON."""
+    if destino and destino.lower().endswith(".json"):
+        salvar_instrumentacao_json(destino)
+        print(f"📊 Instrumentação gravada em: {destino}")
+    else:
+        imprimir_resumo_instrumentacao()
+
+
+def configurar_instrumentacao(destino: str = None):
+    """
+    Ativa a instrumentação e registra o resumo para o fim do programa.
+
+    Args:
+        destino (str): Valor de PLANEJAMENTO_METRICAS: vazio/None não ativa; um
+            caminho .json grava o resumo no arquivo; qualquer outro valor imprime o resumo.
+    """
+    if not destino or destino.strip().lower() in ("0", "nao", "não", "false"):
+        return
+    ativar_instrumentacao()
+    atexit.register(finalizar_instrumentacao, destino)
@@ -0,0 +1,75 @@
+"""
+Configuração de logging do planejamento de produção.
+
+As mensagens do laço de planejamento usam o logger "automation" com
+argumentos no estilo %, de modo que não são formatadas quando o nível
+está desativado (modo silencioso).
+
+O rastreamento opcional por pedido usa o logger "automation.trace", que
+grava uma linha JSON por pedido planejado.
+"""
+
+import json
+import logging
+import sys
+from datetime import date, datetime
+
+# Logger de rastreamento (JSON lines); desativado até configurar_logging receber um arquivo
+logger_trace = logging.getLogger("automation.trace")
+logger_trace.propagate = False
+logger_trace.setLevel(logging.CRITICAL + 1)
+
+_handler_console = None
+_handler_trace = None
+
+
+class FormatadorJsonLinhas(logging.Formatter):
+    """Formata registros cujo `msg` é um dicionário como uma linha JSON."""
+
+    def format(self, record):
+        return json.dumps(record.msg, ensure_ascii=False, default=_serializar)
+
+
+def _serializar(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.strftime("%Y-%m-%d")
+    return str(valor)
+
+
+def configurar_logging(nivel="INFO", silencioso: bool = False, arquivo_trace: str = None):
+    """
+    Configura o logger "automation" e, opcionalmente, o arquivo de rastreamento.
+
+    Args:
+        nivel (str ou int): Nível das mensagens no console (DEBUG, INFO, WARNING...).
+        silencioso (bool): Se True, exibe apenas avisos e erros.
+        arquivo_trace (str): Caminho do arquivo JSON lines com uma linha por pedido.
+            Se None, o rastreamento fica desativado.
+    """
+    global _handler_console, _handler_trace
+
+    logger = logging.getLogger("automation")
+    if silencioso:
+        nivel = logging.WARNING
+    elif isinstance(nivel, str):
+        nivel = logging.getLevelName(nivel.upper())
+        if not isinstance(nivel, int):
+            nivel = logging.INFO
+    logger.setLevel(nivel)
+
+    if _handler_console is None:
+        _handler_console = logging.StreamHandler(sys.stdout)
+        _handler_console.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(_handler_console)
+
+    if _handler_trace is not None:
+        logger_trace.removeHandler(_handler_trace)
+        _handler_trace.close()
+        _handler_trace = None
+        logger_trace.setLevel(logging.CRITICAL + 1)
+
+    if arquivo_trace:
+        _handler_trace = logging.FileHandler(arquivo_trace, mode="w", encoding="utf-8")
+        _handler_trace.setFormatter(FormatadorJsonLinhas())
+        logger_trace.addHandler(_handler_trace)
+        logger_trace.setLevel(logging.INFO)
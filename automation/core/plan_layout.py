@@ -0,0 +1,123 @@
+"""
+Disposição dos blocos de pedido na planilha do plano.
+
+Cada pedido ocupa um bloco de TAMANHO_BLOCO linhas a partir de
+PRIMEIRA_LINHA_PEDIDOS: a linha do pedido (colunas A a E) seguida de uma linha
+por setor, na ordem de SETOR_ORDEM. O CursorPlano guarda os blocos ocupados e a
+posição do próximo bloco livre, de forma que incluir um pedido não exige
+percorrer a coluna A da planilha.
+"""
+
+from __future__ import annotations
+
+import weakref
+from typing import TYPE_CHECKING
+
+from automation.core.constants import SETOR_ORDEM
+
+if TYPE_CHECKING:
+    from openpyxl.worksheet.worksheet import Worksheet
+
+PRIMEIRA_LINHA_PEDIDOS = 13
+TAMANHO_BLOCO = len(SETOR_ORDEM) + 1
+
+# Distância entre a linha do pedido e a linha de cada setor no bloco
+DESLOCAMENTO_SETOR = {setor: i + 1 for i, setor in enumerate(SETOR_ORDEM)}
+
+
+def linha_setor(linha_pedido: int, setor: str) -> int:
+    """Retorna a linha do setor no bloco do pedido."""
+    return linha_pedido + DESLOCAMENTO_SETOR[setor]
+
+
+class CursorPlano:
+    """
+    Blocos de pedido ocupados na planilha e o próximo bloco livre.
+
+    Uso:
+        cursor = obter_cursor_plano(ws)
+        linha = cursor.ocupar()            # linha do pedido no próximo bloco livre
+        ws.cell(row=linha_setor(linha, "Costura"), column=col)
+    """
+
+    def __init__(self, ocupadas=(), primeira_linha: int = PRIMEIRA_LINHA_PEDIDOS):
+        """
+        Args:
+            ocupadas (iterable): Linhas de pedido já ocupadas.
+            primeira_linha (int): Linha do primeiro bloco de pedido.
+        """
+        self.primeira_linha = primeira_linha
+        self.ocupadas = set()
+        for linha in ocupadas:
+            self._validar(linha)
+            self.ocupadas.add(linha)
+        self._livre = primeira_linha
+        self._avancar()
+
+    @classmethod
+    def a_partir_da_planilha(cls, ws: Worksheet, primeira_linha: int = PRIMEIRA_LINHA_PEDIDOS):
+        """Lê a coluna A uma única vez e marca os blocos com pedido."""
+        ocupadas = []
+        colunas = ws.iter_rows(min_row=primeira_linha, max_col=1, values_only=True)
+        for deslocamento, (valor,) in enumerate(colunas):
+            if deslocamento % TAMANHO_BLOCO == 0 and valor:
+                ocupadas.append(primeira_linha + deslocamento)
+        return cls(ocupadas, primeira_linha)
+
+    @property
+    def proxima_linha(self) -> int:
+        """Linha do pedido no primeiro bloco livre."""
+        return self._livre
+
+    def ocupar(self, linha: int = None) -> int:
+        """
+        Marca um bloco como ocupado.
+
+        Args:
+            linha (int): Linha do pedido (padrão: o primeiro bloco livre).
+
+        Returns:
+            int: Linha do pedido ocupada.
+        """
+        if linha is None:
+            linha = self._livre
+        self._validar(linha)
+        self.ocupadas.add(linha)
+        self._avancar()
+        return linha
+
+    def liberar(self, linha: int):
+        """Marca o bloco do pedido como livre."""
+        self.ocupadas.discard(linha)
+        if linha < self._livre:
+            self._livre = linha
+
+    def blocos(self) -> list:
+        """Linhas dos pedidos ocupados, em ordem."""
+        return sorted(self.ocupadas)
+
+    def _avancar(self):
+        while self._livre in self.ocupadas:
+            self._livre += TAMANHO_BLOCO
+
+    def _validar(self, linha: int):
+        if linha < self.primeira_linha or (linha - self.primeira_linha) % TAMANHO_BLOCO:
+            raise ValueError(f"A linha {linha} não é o início de um bloco de pedido.")
+
+
+# Um cursor por planilha carregada; descartado junto com a planilha
+_cursores = weakref.WeakKeyDictionary()
+
+
+def obter_cursor_plano(ws: Worksheet) -> CursorPlano:
+    """Retorna o cursor de blocos da planilha, lendo a coluna A na primeira chamada."""
+    cursor = _cursores.get(ws)
+    if cursor is None:
+        cursor = CursorPlano.a_partir_da_planilha(ws)
+        _cursores[ws] = cursor
+    return cursor
+
+
+def descartar_cursor_plano(ws: Worksheet):
+    """Descarta o cursor em cache da planilha (ex.: após inserir ou excluir linhas)."""
+    _cursores.pop(ws, None)
@@ -0,0 +1,207 @@
+"""
+Cópia colunar (Parquet) de um plano salvo em exp/.
+
+Ao lado de cada plano .xlsx pode ser gravado um arquivo .parquet com o mesmo
+nome, em formato longo: uma linha por reserva (pedido, setor, data, quantidade)
+com os dados do pedido. Pedidos sem nenhuma reserva aparecem em uma única linha
+com SETOR e DATA vazios. As datas do cabeçalho e os limites diários de E3:E12
+ficam nos metadados (DataFrame.attrs["datas"] e ["limites"]).
+
+A gravação e a leitura dependem do pyarrow, que é opcional: sem ele, a cópia
+não é gravada e os leitores usam a planilha, lida no mesmo formato longo por
+ler_plano_planilha.
+"""
+
+import logging
+import os
+
+import pandas as pd
+
+from automation.core.constants import SETOR_ORDEM
+from automation.core.plan_layout import PRIMEIRA_LINHA_PEDIDOS, TAMANHO_BLOCO
+
+logger = logging.getLogger(__name__)
+
+EXTENSAO_SNAPSHOT = ".parquet"
+
+# Dados do pedido (mesmos nomes de processar_tabela; SETOR é o setor inicial)
+COLUNAS_PEDIDO = ["PEDIDO", "ENTREGA", "CLIENTE", "PRODUTO", "QUANTIDADE", "CORTE", "INICIO", "SETOR_INICIAL"]
+
+# Colunas da reserva
+COLUNAS_RESERVA = ["SETOR", "DATA", "QTD"]
+
+# Colunas da tabela longa que a planilha também guarda (sem CORTE, INICIO e SETOR_INICIAL)
+COLUNAS_PLANILHA = ["LINHA", "PEDIDO", "ENTREGA", "CLIENTE", "PRODUTO", "QUANTIDADE"] + COLUNAS_RESERVA
+
+# Cabeçalho das colunas A a G dos blocos de pedido no plano
+CABECALHO_PLANO = ["Pedido", "Entrega", "Cliente", "Produto", "QTD", "RESTA", "Setor"]
+
+
+def caminho_snapshot(caminho_plano: str) -> str:
+    """Retorna o caminho da cópia colunar de um plano (mesmo nome, extensão .parquet)."""
+    return os.path.splitext(caminho_plano)[0] + EXTENSAO_SNAPSHOT
+
+
+def montar_snapshot(pedidos: list, datas: list, limites: list = None) -> pd.DataFrame:
+    """
+    Monta a tabela longa do plano.
+
+    Args:
+        pedidos (list): Tuplas (linha do pedido no plano, dict com COLUNAS_PEDIDO,
+            reservas [(setor, dia, quantidade)]) na ordem do plano.
+        datas (list): Datas do cabeçalho do plano (colunas H em diante).
+        limites (list): Limites diários dos setores ([E3:E12]), na ordem de SETOR_ORDEM.
+
+    Returns:
+        pd.DataFrame: Colunas LINHA, COLUNAS_PEDIDO e COLUNAS_RESERVA.
+    """
+    registros = []
+    for linha, dados, reservas in pedidos:
+        base = [linha] + [dados.get(coluna) for coluna in COLUNAS_PEDIDO]
+        if not reservas:
+            registros.append(base + [None, None, 0])
+            continue
+        for setor, dia, quantidade in reservas:
+            registros.append(base + [setor, dia, quantidade])
+
+    snapshot = pd.DataFrame(registros, columns=["LINHA"] + COLUNAS_PEDIDO + COLUNAS_RESERVA)
+    snapshot["DATA"] = pd.to_datetime(snapshot["DATA"])
+    snapshot["QTD"] = snapshot["QTD"].astype("int64")
+    snapshot.attrs["datas"] = [pd.Timestamp(data).isoformat() for data in datas]
+    if limites is not None:
+        snapshot.attrs["limites"] = [float(limite) for limite in limites]
+    return _uniformizar_tipos(snapshot)
+
+
+def _uniformizar_tipos(snapshot: pd.DataFrame) -> pd.DataFrame:
+    """Converte para texto as colunas com valores de tipos diferentes (ex.: pedidos 123 e 'P-1')."""
+    for coluna in COLUNAS_PEDIDO:
+        tipos = {type(valor) for valor in snapshot[coluna].dropna()}
+        if len(tipos) > 1:
+            snapshot[coluna] = snapshot[coluna].map(lambda valor: None if pd.isna(valor) else str(valor))
+    return snapshot
+
+
+def salvar_snapshot(caminho_plano: str, snapshot: pd.DataFrame):
+    """
+    Grava a cópia colunar ao lado do plano.
+
+    Returns:
+        str or None: Caminho do arquivo gravado, ou None se o pyarrow não estiver
+            instalado ou a gravação falhar.
+    """
+    destino = caminho_snapshot(caminho_plano)
+    try:
+        snapshot.to_parquet(destino, index=False)
+    except ImportError:
+        logger.warning("pyarrow não instalado: a cópia colunar do plano não foi gravada.")
+        return None
+    except Exception as e:
+        logger.warning("Não foi possível gravar a cópia colunar do plano: %s", e)
+        return None
+    return destino
+
+
+def carregar_snapshot(caminho_plano: str):
+    """
+    Lê a cópia colunar de um plano, se ela existir e for mais recente que o .xlsx.
+
+    Returns:
+        pd.DataFrame or None: Tabela longa do plano, ou None se a planilha deve
+            ser lida (cópia ausente, desatualizada ou pyarrow indisponível).
+    """
+    origem = caminho_snapshot(caminho_plano)
+    if not os.path.isfile(origem):
+        return None
+    if os.path.isfile(caminho_plano) and os.path.getmtime(origem) < os.path.getmtime(caminho_plano):
+        logger.info("Cópia colunar mais antiga que o plano; usando a planilha: %s", caminho_plano)
+        return None
+    try:
+        return pd.read_parquet(origem)
+    except ImportError:
+        return None
+    except Exception as e:
+        logger.warning("Não foi possível ler a cópia colunar do plano: %s", e)
+        return None
+
+
+def ler_plano_planilha(caminho_plano: str) -> pd.DataFrame:
+    """
+    Lê a tabela longa de um plano diretamente da planilha, no formato de montar_snapshot.
+
+    Os dados do pedido vêm das colunas A a E da linha do pedido e as reservas, das
+    linhas de setor; as fórmulas das linhas de setor não são usadas. A planilha não
+    guarda CORTE, INICIO nem SETOR_INICIAL, que ficam vazios: nas demais colunas
+    (COLUNAS_PLANILHA) a tabela é igual à do banco e à da cópia colunar do mesmo plano.
+
+    Returns:
+        pd.DataFrame: Colunas LINHA, COLUNAS_PEDIDO e COLUNAS_RESERVA (attrs "datas" e "limites").
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(caminho_plano, read_only=True, data_only=True)
+    try:
+        linhas = [list(row) for row in wb.active.iter_rows(values_only=True)]
+    finally:
+        wb.close()
+
+    # Linha 2: datas a partir da coluna H; linhas 3 a 12: limites diários em E
+    datas = [valor for valor in linhas[1][7:] if valor is not None]
+    limites = [float(linhas[2 + i][4] or 0) for i in range(len(SETOR_ORDEM))]
+
+    pedidos = []
+    for indice in range(PRIMEIRA_LINHA_PEDIDOS - 1, len(linhas), TAMANHO_BLOCO):
+        valores = linhas[indice]
+        if not valores or valores[0] in (None, ""):
+            continue
+        reservas = []
+        for posicao, setor in enumerate(SETOR_ORDEM, start=1):
+            if indice + posicao >= len(linhas):
+                break
+            for data, quantidade in zip(datas, linhas[indice + posicao][7:]):
+                if isinstance(quantidade, (int, float)) and quantidade:
+                    reservas.append((setor, data, int(quantidade)))
+        # Mesma ordem das reservas do motor: por dia e, no dia, pela ordem dos setores
+        reservas.sort(key=lambda reserva: (reserva[1], SETOR_ORDEM.index(reserva[0])))
+        pedidos.append((indice + 1, dict(zip(COLUNAS_PEDIDO[:5], valores[:5])), reservas))
+
+    return montar_snapshot(pedidos, datas, limites)
+
+
+def pedidos_do_snapshot(snapshot: pd.DataFrame) -> pd.DataFrame:
+    """Retorna uma linha por pedido, com as colunas de processar_tabela."""
+    pedidos = snapshot.drop_duplicates("LINHA").sort_values("LINHA")
+    pedidos = pedidos[COLUNAS_PEDIDO].rename(columns={"SETOR_INICIAL": "SETOR"})
+    return pedidos.reset_index(drop=True)
+
+
+def tabela_setores(snapshot: pd.DataFrame):
+    """
+    Reconstrói as linhas de setor dos blocos de pedido, como na planilha do plano.
+
+    Returns:
+        tuple: (cabeçalho [Pedido .. Setor, datas...], DataFrame com colunas
+            numeradas como na planilha: 0 a 6 para A a G e 7 em diante para as datas)
+    """
+    datas = [pd.Timestamp(data) for data in snapshot.attrs.get("datas", [])]
+    if not datas:
+        datas = sorted(snapshot["DATA"].dropna().unique())
+    cabecalho = CABECALHO_PLANO + [data.to_pydatetime() for data in datas]
+
+    pedidos = snapshot.drop_duplicates("LINHA").set_index("LINHA").sort_index()
+    reservas = snapshot.dropna(subset=["SETOR", "DATA"])
+    planejado = reservas.pivot_table(index=["LINHA", "SETOR"], columns="DATA", values="QTD", aggfunc="sum")
+    planejado = planejado.reindex(columns=datas)
+
+    # Um bloco por pedido: uma linha para cada setor, mesmo sem produção planejada
+    indice = pd.MultiIndex.from_product([pedidos.index, SETOR_ORDEM], names=["LINHA", "SETOR"])
+    planejado = planejado.reindex(indice)
+
+    metadados = pedidos.loc[indice.get_level_values("LINHA"), ["PEDIDO", "ENTREGA", "CLIENTE", "PRODUTO", "QUANTIDADE"]]
+    linhas = pd.DataFrame(metadados.to_numpy(dtype=object), columns=range(5))
+    linhas[5] = metadados["QUANTIDADE"].to_numpy() - planejado.sum(axis=1).to_numpy()
+    linhas[6] = indice.get_level_values("SETOR")
+
+    valores = planejado.astype("Int64").astype(object).where(planejado.notna(), None).to_numpy()
+    datas_df = pd.DataFrame(valores, columns=range(7, 7 + len(datas)))
+    return cabecalho, pd.concat([linhas, datas_df], axis=1)
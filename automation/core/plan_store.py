@@ -0,0 +1,371 @@
+"""
+Banco SQLite com o estado dos planos salvos (pedidos, reservas e capacidades).
+
+Cada pasta de planos (ex.: exp/) tem um arquivo planos.sqlite com uma versão por
+plano .xlsx salvo. A planilha continua sendo o formato de exportação; o banco é
+lido pela exportação de relatórios, pela exclusão de pedidos e pelo replanejamento
+incremental, no mesmo formato longo da cópia colunar (ver core.plan_snapshot), e
+permite consultar as reservas sem abrir o Excel:
+
+    reservas = consultar_reservas("exp", setor="Costura", inicio="2025-06-02", fim="2025-06-06")
+
+Tabelas:
+    versoes      (id, plano, criado_em, carga, datas, assinatura)
+    capacidades  (versao_id, setor, limite)
+    pedidos      (versao_id, linha, pedido, entrega, cliente, produto, quantidade, corte, inicio, setor_inicial)
+    reservas     (versao_id, linha, setor, data, qtd)
+
+As reservas são indexadas por (setor, data) e os pedidos por pedido. Uma versão
+deixa de ser usada se a planilha for alterada depois do registro (ex.: editada no
+Excel); nesse caso os leitores voltam para a cópia colunar ou para a planilha.
+
+As três leituras de um mesmo plano (banco, cópia colunar e planilha) devolvem a
+mesma tabela longa, com as mesmas datas e limites; a planilha não guarda CORTE,
+INICIO e SETOR_INICIAL, que ficam vazios. comparar_leituras_plano confere isso
+(é executada pelo benchmark com --verify).
+"""
+
+import json
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from automation.core.constants import SETOR_ORDEM
+from automation.core.instrumentation import cronometrado
+from automation.core.plan_snapshot import COLUNAS_PEDIDO, COLUNAS_PLANILHA, carregar_snapshot, ler_plano_planilha
+
+logger = logging.getLogger(__name__)
+
+NOME_BANCO = "planos.sqlite"
+
+_ESQUEMA = """
+BEGIN;
+CREATE TABLE IF NOT EXISTS versoes (
+    id INTEGER PRIMARY KEY,
+    plano TEXT NOT NULL UNIQUE,
+    criado_em TEXT NOT NULL,
+    carga REAL,
+    datas TEXT NOT NULL,
+    assinatura TEXT
+);
+CREATE TABLE IF NOT EXISTS capacidades (
+    versao_id INTEGER NOT NULL,
+    setor TEXT NOT NULL,
+    limite REAL,
+    PRIMARY KEY (versao_id, setor)
+);
+CREATE TABLE IF NOT EXISTS pedidos (
+    versao_id INTEGER NOT NULL,
+    linha INTEGER NOT NULL,
+    pedido, entrega, cliente, produto, quantidade, corte, inicio, setor_inicial,
+    PRIMARY KEY (versao_id, linha)
+);
+CREATE TABLE IF NOT EXISTS reservas (
+    versao_id INTEGER NOT NULL,
+    linha INTEGER NOT NULL,
+    setor TEXT NOT NULL,
+    data TEXT NOT NULL,
+    qtd INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reservas_setor_data ON reservas (setor, data);
+CREATE INDEX IF NOT EXISTS idx_reservas_versao_linha ON reservas (versao_id, linha);
+CREATE INDEX IF NOT EXISTS idx_pedidos_pedido ON pedidos (pedido);
+COMMIT;
+"""
+
+# Colunas da tabela pedidos na ordem de COLUNAS_PEDIDO
+_COLUNAS_SQL_PEDIDO = ["pedido", "entrega", "cliente", "produto", "quantidade", "corte", "inicio", "setor_inicial"]
+
+
+def caminho_banco(caminho_plano: str) -> str:
+    """Retorna o banco da pasta do plano (ex.: exp/planos.sqlite)."""
+    return os.path.join(os.path.dirname(caminho_plano), NOME_BANCO)
+
+
+def _conectar(banco: str, criar_esquema: bool = False) -> sqlite3.Connection:
+    """Abre o banco; o esquema só é criado no registro de um plano (leituras não abrem transação)."""
+    conexao = sqlite3.connect(banco, timeout=30)
+    if criar_esquema:
+        conexao.executescript(_ESQUEMA)
+    return conexao
+
+
+def _tem_esquema(conexao: sqlite3.Connection) -> bool:
+    """Indica se o banco já tem as tabelas; sem elas, nenhuma versão foi registrada."""
+    return conexao.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'versoes'"
+    ).fetchone() is not None
+
+
+def _assinatura(caminho_plano: str):
+    try:
+        stat = os.stat(caminho_plano)
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _valor_sql(valor):
+    """Converte o valor para um tipo aceito pelo SQLite (datas como DD/MM/AAAA)."""
+    if valor is None:
+        return None
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and np.isnan(valor):
+        return None
+    if isinstance(valor, (datetime, date)):
+        return valor.strftime("%d/%m/%Y")
+    if isinstance(valor, (int, float, str)):
+        return valor
+    return str(valor)
+
+
+def _data_iso(dia) -> str:
+    if not isinstance(dia, (datetime, date)):
+        dia = pd.Timestamp(dia)
+    return dia.strftime("%Y-%m-%d")
+
+
+@cronometrado()
+def registrar_plano(caminho_plano: str, pedidos: list, datas: list, limites: list, carga=None):
+    """
+    Registra um plano salvo como uma nova versão no banco da sua pasta.
+
+    Args:
+        caminho_plano (str): Plano .xlsx já gravado.
+        pedidos (list): Tuplas (linha do pedido no plano, dict com COLUNAS_PEDIDO,
+            reservas [(setor, dia, quantidade)]), como em montar_snapshot.
+        datas (list): Datas do cabeçalho do plano.
+        limites (list): Limites diários dos setores, na ordem de SETOR_ORDEM.
+        carga (float): Carga de produção do plano (%).
+
+    Returns:
+        int or None: Identificador da versão, ou None se o registro falhar.
+    """
+    banco = caminho_banco(caminho_plano)
+    plano = os.path.basename(caminho_plano)
+    try:
+        with closing(_conectar(banco, criar_esquema=True)) as conexao, conexao:
+            conexao.execute(
+                "DELETE FROM reservas WHERE versao_id IN (SELECT id FROM versoes WHERE plano = ?)", (plano,)
+            )
+            for tabela in ("capacidades", "pedidos"):
+                conexao.execute(
+                    f"DELETE FROM {tabela} WHERE versao_id IN (SELECT id FROM versoes WHERE plano = ?)", (plano,)
+                )
+            conexao.execute("DELETE FROM versoes WHERE plano = ?", (plano,))
+
+            cursor = conexao.execute(
+                "INSERT INTO versoes (plano, criado_em, carga, datas, assinatura) VALUES (?, ?, ?, ?, ?)",
+                (plano, datetime.now().isoformat(timespec="seconds"), _valor_sql(carga),
+                 json.dumps([_data_iso(data) for data in datas]), _assinatura(caminho_plano)),
+            )
+            versao_id = cursor.lastrowid
+
+            conexao.executemany(
+                "INSERT INTO capacidades (versao_id, setor, limite) VALUES (?, ?, ?)",
+                [(versao_id, setor, float(limite)) for setor, limite in zip(SETOR_ORDEM, limites)],
+            )
+            conexao.executemany(
+                f"INSERT INTO pedidos (versao_id, linha, {', '.join(_COLUNAS_SQL_PEDIDO)}) "
+                f"VALUES (?, ?, {', '.join('?' * len(_COLUNAS_SQL_PEDIDO))})",
+                [
+                    (versao_id, int(linha), *[_valor_sql(dados.get(coluna)) for coluna in COLUNAS_PEDIDO])
+                    for linha, dados, _ in pedidos
+                ],
+            )
+            conexao.executemany(
+                "INSERT INTO reservas (versao_id, linha, setor, data, qtd) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (versao_id, int(linha), setor, _data_iso(dia), int(quantidade))
+                    for linha, _, reservas in pedidos
+                    for setor, dia, quantidade in reservas
+                ),
+            )
+    except sqlite3.Error as e:
+        logger.warning("Não foi possível registrar o plano no banco %s: %s", banco, e)
+        return None
+    return versao_id
+
+
+def carregar_plano_banco(caminho_plano: str):
+    """
+    Lê a versão de um plano no banco, no formato longo de core.plan_snapshot.
+
+    Returns:
+        pd.DataFrame or None: Tabela longa do plano (attrs "datas" e "limites"), ou
+            None se o plano não estiver registrado ou a planilha tiver sido alterada.
+    """
+    banco = caminho_banco(caminho_plano)
+    if not os.path.isfile(banco):
+        return None
+    try:
+        with closing(_conectar(banco)) as conexao:
+            if not _tem_esquema(conexao):
+                return None
+            versao = conexao.execute(
+                "SELECT id, datas, assinatura FROM versoes WHERE plano = ?", (os.path.basename(caminho_plano),)
+            ).fetchone()
+            if versao is None:
+                return None
+            versao_id, datas, assinatura = versao
+            if os.path.isfile(caminho_plano) and _assinatura(caminho_plano) != assinatura:
+                logger.info("Planilha alterada depois do registro no banco; usando a planilha: %s", caminho_plano)
+                return None
+
+            colunas = ", ".join(f"{sql} AS {coluna}" for sql, coluna in zip(_COLUNAS_SQL_PEDIDO, COLUNAS_PEDIDO))
+            pedidos = pd.read_sql_query(
+                f"SELECT linha AS LINHA, {colunas} FROM pedidos WHERE versao_id = ? ORDER BY linha",
+                conexao, params=(versao_id,),
+            )
+            reservas = pd.read_sql_query(
+                "SELECT linha AS LINHA, setor AS SETOR, data AS DATA, qtd AS QTD "
+                "FROM reservas WHERE versao_id = ? ORDER BY rowid",
+                conexao, params=(versao_id,),
+            )
+            capacidades = dict(conexao.execute(
+                "SELECT setor, limite FROM capacidades WHERE versao_id = ?", (versao_id,)
+            ).fetchall())
+    except sqlite3.Error as e:
+        logger.warning("Não foi possível ler o plano do banco %s: %s", banco, e)
+        return None
+
+    tabela = pedidos.merge(reservas, on="LINHA", how="left", sort=False)
+    tabela = tabela.sort_values("LINHA", kind="stable").reset_index(drop=True)
+    tabela["DATA"] = pd.to_datetime(tabela["DATA"], format="%Y-%m-%d")
+    tabela["QTD"] = tabela["QTD"].fillna(0).astype("int64")
+    tabela.attrs["datas"] = [pd.Timestamp(data).isoformat() for data in json.loads(datas)]
+    if capacidades:
+        tabela.attrs["limites"] = [capacidades.get(setor, 0.0) for setor in SETOR_ORDEM]
+    return tabela
+
+
+def carregar_tabela_plano(caminho_plano: str):
+    """
+    Retorna a tabela longa de um plano salvo: do banco, se registrado, ou da cópia colunar.
+
+    Returns:
+        pd.DataFrame or None: None se a planilha deve ser lida.
+    """
+    tabela = carregar_plano_banco(caminho_plano)
+    if tabela is None:
+        tabela = carregar_snapshot(caminho_plano)
+    return tabela
+
+
+def comparar_leituras_plano(caminho_plano: str) -> list:
+    """
+    Confere que o banco, a cópia colunar e a planilha devolvem a mesma tabela do plano.
+
+    O banco e a cópia colunar são comparados em todas as colunas; a planilha, nas
+    COLUNAS_PLANILHA. As datas e os limites (attrs) também são comparados. Fontes
+    ausentes ou desatualizadas são ignoradas.
+
+    Returns:
+        list: Divergências encontradas (vazia se as leituras forem iguais).
+    """
+    leituras = {
+        "banco": carregar_plano_banco(caminho_plano),
+        "cópia colunar": carregar_snapshot(caminho_plano),
+        "planilha": ler_plano_planilha(caminho_plano),
+    }
+    leituras = {fonte: tabela for fonte, tabela in leituras.items() if tabela is not None}
+
+    divergencias = []
+    fontes = list(leituras)
+    for i, fonte in enumerate(fontes):
+        for outra in fontes[i + 1:]:
+            a, b = leituras[fonte], leituras[outra]
+            for atributo in ("datas", "limites"):
+                if a.attrs.get(atributo) != b.attrs.get(atributo):
+                    divergencias.append(f"{fonte} x {outra}: {atributo} diferentes")
+            colunas = COLUNAS_PLANILHA if "planilha" in (fonte, outra) else list(a.columns)
+            try:
+                pd.testing.assert_frame_equal(
+                    a[colunas].reset_index(drop=True), b[colunas].reset_index(drop=True), check_dtype=False
+                )
+            except (AssertionError, KeyError) as e:
+                divergencias.append(f"{fonte} x {outra}: {str(e).strip().splitlines()[0]}")
+    return divergencias
+
+
+def listar_versoes(pasta: str) -> pd.DataFrame:
+    """Retorna as versões registradas no banco da pasta, da mais recente para a mais antiga."""
+    banco = os.path.join(pasta, NOME_BANCO)
+    vazio = pd.DataFrame(columns=["PLANO", "CRIADO EM", "CARGA", "PEDIDOS"])
+    if not os.path.isfile(banco):
+        return vazio
+    with closing(_conectar(banco)) as conexao:
+        if not _tem_esquema(conexao):
+            return vazio
+        return pd.read_sql_query(
+            "SELECT v.plano AS PLANO, v.criado_em AS \"CRIADO EM\", v.carga AS CARGA, "
+            "(SELECT COUNT(*) FROM pedidos p WHERE p.versao_id = v.id) AS PEDIDOS "
+            "FROM versoes v ORDER BY v.criado_em DESC, v.id DESC",
+            conexao,
+        )
+
+
+def consultar_reservas(pasta: str, setor: str = None, inicio=None, fim=None, plano: str = None,
+                       pedido=None) -> pd.DataFrame:
+    """
+    Consulta as reservas de uma versão do plano.
+
+    Args:
+        pasta (str): Pasta dos planos (ex.: exp).
+        setor (str): Setor (opcional).
+        inicio, fim: Período, inclusive (date, datetime ou texto AAAA-MM-DD; opcionais).
+        plano (str): Nome do plano .xlsx (padrão: a versão mais recente).
+        pedido: Pedido (coluna PEDIDO; opcional).
+
+    Returns:
+        pd.DataFrame: Colunas PEDIDO, CLIENTE, PRODUTO, SETOR, DATA e QTD, por data e linha.
+
+    Raises:
+        FileNotFoundError: Se a pasta não tiver banco ou o plano não estiver registrado.
+    """
+    banco = os.path.join(pasta, NOME_BANCO)
+    if not os.path.isfile(banco):
+        raise FileNotFoundError(f"Nenhum plano registrado em {pasta} ({NOME_BANCO} não encontrado).")
+
+    with closing(_conectar(banco)) as conexao:
+        if not _tem_esquema(conexao):
+            raise FileNotFoundError(f"Nenhum plano registrado em {banco}.")
+        if plano is None:
+            versao = conexao.execute("SELECT id FROM versoes ORDER BY criado_em DESC, id DESC LIMIT 1").fetchone()
+        else:
+            versao = conexao.execute(
+                "SELECT id FROM versoes WHERE plano = ?", (os.path.basename(plano),)
+            ).fetchone()
+        if versao is None:
+            raise FileNotFoundError(f"Plano não registrado em {banco}: {plano or '(nenhuma versão)'}")
+
+        condicoes = ["r.versao_id = ?"]
+        parametros = [versao[0]]
+        if setor is not None:
+            condicoes.append("r.setor = ?")
+            parametros.append(setor)
+        if inicio is not None:
+            condicoes.append("r.data >= ?")
+            parametros.append(_data_iso(inicio))
+        if fim is not None:
+            condicoes.append("r.data <= ?")
+            parametros.append(_data_iso(fim))
+        if pedido is not None:
+            condicoes.append("p.pedido = ?")
+            parametros.append(_valor_sql(pedido))
+
+        reservas = pd.read_sql_query(
+            "SELECT p.pedido AS PEDIDO, p.cliente AS CLIENTE, p.produto AS PRODUTO, "
+            "r.setor AS SETOR, r.data AS DATA, r.qtd AS QTD "
+            "FROM reservas r JOIN pedidos p ON p.versao_id = r.versao_id AND p.linha = r.linha "
+            f"WHERE {' AND '.join(condicoes)} ORDER BY r.data, r.linha",
+            conexao, params=parametros,
+        )
+    reservas["DATA"] = pd.to_datetime(reservas["DATA"], format="%Y-%m-%d")
+    return reservas
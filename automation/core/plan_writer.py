@@ -0,0 +1,254 @@
+"""
+Gravação do plano em modo streaming (workbook write-only do openpyxl).
+
+O modelo é lido uma única vez e reduzido ao que é necessário para reproduzi-lo:
+as linhas de cabeçalho/limites (1 a 12), o bloco de 11 linhas de um pedido
+(linhas 13 a 23) com fórmulas e estilos, larguras de coluna, agrupamento das
+linhas e formatação condicional. Cada pedido planejado é então gravado como um
+bloco, com as fórmulas transladadas para a sua posição, sem manter as células
+do plano em memória.
+"""
+
+import os
+from copy import copy
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import Rule
+from openpyxl.formula.translate import Translator
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
+
+from automation.core.excel_utils import IndiceDatasPlanilha
+from automation.core.plan_layout import DESLOCAMENTO_SETOR, PRIMEIRA_LINHA_PEDIDOS, TAMANHO_BLOCO
+
+LINHA_CABECALHO_DATAS = 2
+
+# Atributos de estilo copiados de cada célula do modelo
+_ATRIBUTOS_ESTILO = ("font", "fill", "border", "alignment", "number_format", "protection")
+
+
+class ModeloPlano:
+    """Estrutura do modelo de planejamento necessária para gravar um plano em streaming."""
+
+    def __init__(self, modelo_path: str):
+        wb = load_workbook(modelo_path)
+        ws = wb.active
+        self.titulo = ws.title
+        self.max_coluna = ws.max_column
+        self.cabecalho = self._ler_linhas(ws, 1, PRIMEIRA_LINHA_PEDIDOS - 1)
+        self.bloco = self._ler_linhas(ws, PRIMEIRA_LINHA_PEDIDOS, PRIMEIRA_LINHA_PEDIDOS + TAMANHO_BLOCO - 1)
+
+        self.larguras = {letra: dim.width for letra, dim in ws.column_dimensions.items() if dim.width}
+        self.alturas = {
+            linha: (dim.height, dim.outlineLevel, dim.hidden)
+            for linha, dim in ws.row_dimensions.items()
+            if linha < PRIMEIRA_LINHA_PEDIDOS + TAMANHO_BLOCO
+        }
+        self.congelar = ws.freeze_panes
+        self.zoom = ws.sheet_view.zoomScale
+        self.resumo_abaixo = ws.sheet_properties.outlinePr.summaryBelow if ws.sheet_properties.outlinePr else None
+
+        # Formatação condicional do cabeçalho (fixa) e do primeiro bloco (repetida em cada pedido)
+        self.formatacao_cabecalho = []
+        self.formatacao_bloco = []
+        ultima_linha_bloco = PRIMEIRA_LINHA_PEDIDOS + TAMANHO_BLOCO - 1
+        for formatacao in ws.conditional_formatting:
+            for faixa in formatacao.sqref.ranges:
+                if faixa.max_row < PRIMEIRA_LINHA_PEDIDOS:
+                    self.formatacao_cabecalho.append((faixa.coord, formatacao.rules))
+                elif faixa.max_row <= ultima_linha_bloco:
+                    self.formatacao_bloco.append((faixa, formatacao.rules))
+
+        self.indice_datas = IndiceDatasPlanilha.a_partir_dos_valores(
+            [valor for valor, _ in self.cabecalho[LINHA_CABECALHO_DATAS - 1]]
+        )
+        wb.close()
+
+    def _ler_linhas(self, ws, primeira: int, ultima: int) -> list:
+        """
+        Retorna [(valor, estilo ou None)] por linha. O estilo é uma tupla com cópias
+        de _ATRIBUTOS_ESTILO, independente do workbook do modelo (que é descartado).
+        """
+        estilos = {}
+        linhas = []
+        for row in ws.iter_rows(min_row=primeira, max_row=ultima, max_col=self.max_coluna):
+            linha = []
+            for cell in row:
+                estilo = None
+                if cell.has_style:
+                    estilo = estilos.get(cell.style_id)
+                    if estilo is None:
+                        estilo = tuple(copy(getattr(cell, atributo)) for atributo in _ATRIBUTOS_ESTILO)
+                        estilos[cell.style_id] = estilo
+                linha.append((cell.value, estilo))
+            linhas.append(linha)
+        return linhas
+
+
+# Cache por caminho: {caminho: ((mtime_ns, tamanho), ModeloPlano)}
+_cache_modelos = {}
+
+
+def carregar_modelo_plano(modelo_path: str) -> ModeloPlano:
+    """Retorna a estrutura do modelo, relendo o arquivo apenas se ele foi modificado."""
+    stat = os.stat(modelo_path)
+    assinatura = (stat.st_mtime_ns, stat.st_size)
+
+    em_cache = _cache_modelos.get(modelo_path)
+    if em_cache and em_cache[0] == assinatura:
+        return em_cache[1]
+
+    modelo = ModeloPlano(modelo_path)
+    _cache_modelos[modelo_path] = (assinatura, modelo)
+    return modelo
+
+
+class EscritorPlanoStreaming:
+    """
+    Grava o plano linha a linha em um workbook write-only.
+
+    Uso:
+        escritor = EscritorPlanoStreaming(modelo, limites)
+        escritor.escrever_pedido([pedido, entrega, cliente, produto, quantidade], reservas)
+        ...
+        escritor.workbook.save(caminho)   # ou salvar_nova_versao(..., escritor.workbook)
+    """
+
+    def __init__(self, modelo: ModeloPlano, limites: list):
+        """
+        Args:
+            modelo (ModeloPlano): Estrutura do modelo.
+            limites (list): Valores de [E3:E12] (limites diários já ajustados pela CARGA).
+        """
+        self.modelo = modelo
+        self.workbook = Workbook(write_only=True)
+        self.ws = self.workbook.create_sheet(modelo.titulo)
+        self.pedidos = 0
+        self._estilos = {}
+        self._tradutores = {}
+
+        self._configurar_planilha()
+
+        for i, valores in enumerate(modelo.cabecalho):
+            linha = i + 1
+            sobrescrever = {}
+            if 3 <= linha < 3 + len(limites):
+                sobrescrever[5] = limites[linha - 3]  # Coluna E
+            self._escrever_linha(valores, linha, sobrescrever)
+
+    @property
+    def proxima_linha(self) -> int:
+        """Linha em que será gravado o próximo pedido."""
+        return PRIMEIRA_LINHA_PEDIDOS + self.pedidos * TAMANHO_BLOCO
+
+    def _configurar_planilha(self):
+        modelo = self.modelo
+        for letra, largura in modelo.larguras.items():
+            self.ws.column_dimensions[letra].width = largura
+        if modelo.congelar:
+            self.ws.freeze_panes = modelo.congelar
+        if modelo.zoom:
+            self.ws.sheet_view.zoomScale = modelo.zoom
+        if modelo.resumo_abaixo is not None:
+            self.ws.sheet_properties.outlinePr.summaryBelow = modelo.resumo_abaixo
+        for faixa, regras in modelo.formatacao_cabecalho:
+            for regra in regras:
+                self.ws.conditional_formatting.add(faixa, _copiar_regra(regra))
+
+    def escrever_pedido(self, dados: list, reservas=(), indice_datas: IndiceDatasPlanilha = None):
+        """
+        Grava o bloco de um pedido: a linha do pedido (colunas A a E) e as linhas dos setores.
+
+        Args:
+            dados (list): Valores das colunas A a E da linha do pedido.
+            reservas (list): Tuplas (setor, dia, quantidade) do motor de planejamento.
+            indice_datas (IndiceDatasPlanilha): Índice de datas (padrão: o do modelo).
+
+        Returns:
+            int: Linha do pedido na planilha.
+        """
+        indice_datas = indice_datas or self.modelo.indice_datas
+        linha_pedido = self.proxima_linha
+        deslocamento = linha_pedido - PRIMEIRA_LINHA_PEDIDOS
+
+        # Valores a gravar por linha do bloco: {posição no bloco: {coluna: valor}}
+        sobrescrever = {0: {col: valor for col, valor in enumerate(dados, start=1)}}
+        for setor, dia, quantidade in reservas:
+            col = indice_datas.coluna(dia)
+            if col is None:
+                continue
+            posicao = DESLOCAMENTO_SETOR[setor]
+            valores = sobrescrever.setdefault(posicao, {})
+            # Soma à célula existente, como em excel_utils.escrever_reservas
+            atual = valores.get(col, self.modelo.bloco[posicao][col - 1][0])
+            valores[col] = (atual or 0) + quantidade
+
+        for posicao, valores in enumerate(self.modelo.bloco):
+            linha_modelo = PRIMEIRA_LINHA_PEDIDOS + posicao
+            self._escrever_linha(valores, linha_pedido + posicao, sobrescrever.get(posicao, {}),
+                                 deslocamento, linha_modelo)
+
+        for faixa, regras in self.modelo.formatacao_bloco:
+            destino = CellRange(faixa.coord)
+            destino.shift(row_shift=deslocamento)
+            for regra in regras:
+                self.ws.conditional_formatting.add(destino.coord, _copiar_regra(regra))
+
+        self.pedidos += 1
+        return linha_pedido
+
+    def _escrever_linha(self, valores: list, linha: int, sobrescrever: dict,
+                        deslocamento: int = 0, linha_modelo: int = None):
+        """Grava uma linha do modelo, transladando fórmulas e aplicando os valores informados."""
+        linha_modelo = linha_modelo or linha
+        dimensao = self.modelo.alturas.get(linha_modelo)
+        if dimensao:
+            altura, nivel, oculta = dimensao
+            dim = self.ws.row_dimensions[linha]
+            dim.height = altura
+            dim.outlineLevel = nivel
+            dim.hidden = oculta
+
+        celulas = []
+        for col, (valor, estilo) in enumerate(valores, start=1):
+            if col in sobrescrever:
+                valor = sobrescrever[col]
+            elif deslocamento and isinstance(valor, str) and valor.startswith("="):
+                valor = self._tradutor(valor, col, linha_modelo).translate_formula(f"{get_column_letter(col)}{linha}")
+            if estilo is None:
+                celulas.append(valor)
+                continue
+            cell = WriteOnlyCell(self.ws, value=valor)
+            cell._style = copy(self._estilo(estilo))
+            celulas.append(cell)
+
+        self.ws.append(celulas)
+        # A dimensão já foi gravada junto com a linha
+        self.ws.row_dimensions.pop(linha, None)
+
+    def _tradutor(self, formula: str, col: int, linha_modelo: int) -> Translator:
+        """Tradutor da fórmula do modelo, criado (e analisado) uma única vez por célula."""
+        chave = (col, linha_modelo)
+        tradutor = self._tradutores.get(chave)
+        if tradutor is None:
+            tradutor = Translator(formula, origin=f"{get_column_letter(col)}{linha_modelo}")
+            self._tradutores[chave] = tradutor
+        return tradutor
+
+    def _estilo(self, estilo: tuple):
+        """Registra o estilo do modelo no workbook de saída uma única vez."""
+        chave = id(estilo)
+        registrado = self._estilos.get(chave)
+        if registrado is None:
+            cell = WriteOnlyCell(self.ws)
+            for atributo, valor in zip(_ATRIBUTOS_ESTILO, estilo):
+                setattr(cell, atributo, valor)
+            registrado = cell._style
+            self._estilos[chave] = registrado
+        return registrado
+
+
+def _copiar_regra(regra: Rule) -> Rule:
+    """Cria uma cópia da regra de formatação condicional para outra faixa."""
+    return copy(regra)
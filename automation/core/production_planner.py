@@ -2,17 +2,30 @@
 Módulo principal para planejamento de produção com fluxo contínuo.
 """
 
+from __future__ import annotations
+
+import logging
+import weakref
 from datetime import datetime, timedelta
-import pandas as pd
-from openpyxl.worksheet.worksheet import Worksheet
-from InquirerPy import inquirer
-import csv
-import unicodedata
-
-from automation.core.constants import SETOR_ORDEM, DEFAULT_CALENDARIO_PATH, DEFAULT_CONFIG_PATH, obter_valor_parametro
-from automation.core.calendar_utils import obter_proximos_dias_uteis
-from automation.core.excel_utils import encontrar_coluna_por_data, calcular_producao_planejada, obter_limite_producao
+from typing import TYPE_CHECKING
+
+from automation.core.constants import SETOR_ORDEM, DEFAULT_CALENDARIO_PATH, DEFAULT_CONFIG_PATH
+from automation.core.config import ConfiguracaoPlano, carregar_configuracao
+from automation.core.calendar_utils import carregar_calendario_uteis
+from automation.core.excel_utils import obter_indice_datas, obter_limite_producao, escrever_reservas
+from automation.core.scheduling_engine import (
+    PedidoPlanejamento, ResultadoPedido, planejar_pedido, deve_pular_setor, normalizar_data_inicio
+)
+from automation.core.capacity_ledger import MatrizCapacidade
 from automation.core.file_utils import salvar_nova_versao
+from automation.core.log_utils import logger_trace
+from automation.core.instrumentation import cronometrado
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from openpyxl.worksheet.worksheet import Worksheet
+
+logger = logging.getLogger(__name__)
 
 
 def obter_delta_dias_estampa(config_path=DEFAULT_CONFIG_PATH):
@@ -26,19 +39,14 @@ def obter_delta_dias_estampa(config_path=DEFAULT_CONFIG_PATH):
         int: Valor de DELTA_DIAS_ESTAMPA, ou 5 como padrão se não encontrado.
     """
     try:
-        with open(config_path, 'r') as config_file:
-            reader = csv.DictReader(config_file)
-            for row in reader:
-                if row['PARAMETRO'] == 'DELTA_DIAS_ESTAMPA':
-                    return int(row['VALOR'])  # Converte o valor para inteiro
+        return carregar_configuracao(config_path).delta_dias_estampa
     except FileNotFoundError:
         print(f"Arquivo de configuração não encontrado: {config_path}. Usando valor padrão (5).")
-    except ValueError:
-        print(f"Erro ao converter o valor de DELTA_DIAS_ESTAMPA para inteiro. Usando valor padrão (5).")
     except Exception as e:
         print(f"Erro inesperado ao carregar o arquivo de configuração: {e}. Usando valor padrão (5).")
     return 5
 
+@cronometrado()
 def preencher_producao(
         ws: Worksheet,
         df_priorizado: pd.DataFrame,
@@ -51,7 +59,10 @@ def preencher_producao(
         planilha_path=None, 
         workbook=None, 
         salvar: bool = True,
-        priorizar_estampa: bool = None
+        priorizar_estampa: bool = None,
+        registro: MatrizCapacidade = None,
+        config_setores: dict = None,
+        config_path: str = DEFAULT_CONFIG_PATH
     ):
     """
     Preenche a produção a partir do setor especificado, com fluxo contínuo entre setores.
@@ -69,6 +80,12 @@ def preencher_producao(
         workbook: Objeto workbook do openpyxl (necessário para salvar)
         salvar: Se True, salva uma nova versão da planilha
         priorizar_estampa: Se True, prioriza terças e quintas para o setor Estampa
+        registro: Matriz de capacidade compartilhada entre os pedidos do plano.
+            Se não for fornecido, é usada a matriz em cache da planilha (ver
+            obter_matriz_planilha), construída uma única vez.
+        config_setores: Configurações dos setores (ver obter_perfis_setores).
+            Se não for fornecido, é usada a tabela em cache da planilha.
+        config_path: Caminho para o arquivo de configuração CSV.
         
     Returns:
         tuple: (primeiro_dia_usado, ultimo_dia_usado, delay)
@@ -80,19 +97,14 @@ def preencher_producao(
     # Determina o índice do setor inicial na ordem de processamento
     setor_idx = SETOR_ORDEM.index(setor)
     setores_processar = SETOR_ORDEM[setor_idx:]
-    print(f"DEBUG - setor_idx: {setor_idx} | setores_processar: {setores_processar}")
+    logger.debug("setor_idx: %s | setores_processar: %s", setor_idx, setores_processar)
     
     # Se data_inicio não for fornecida, usa a data atual
-    if data_inicio is None:
-        data_inicio = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    elif isinstance(data_inicio, str):
-        data_inicio = datetime.strptime(data_inicio, "%d/%m/%Y")
+    data_inicio = normalizar_data_inicio(data_inicio)
     
-    priorizar_estampa_value = obter_valor_parametro('PRIORIDADE_ESTAMPA')
-    if priorizar_estampa_value == 'Sim':
-        priorizar_estampa = True
-    else:
-        priorizar_estampa = False
+    # Configuração em cache: o arquivo só é relido se for modificado
+    configuracao = carregar_configuracao(config_path)
+    priorizar_estampa = configuracao.prioridade_estampa
     
     # Obtendo informações do pedido atual para referência
     pedido = ws.cell(row=linha, column=1).value
@@ -100,160 +112,176 @@ def preencher_producao(
     cliente = ws.cell(row=linha, column=3).value
     produto = ws.cell(row=linha, column=4).value
 
-    print(f"\n--- Informações do Pedido ---")
-    print(f"Linha: {linha}")
-    print(f"Pedido: {pedido}")
-    print(f"Entrega: {entrega}")
-    print(f"Cliente: {cliente}")
-    print(f"Produto: {produto}")
-    print(f"Quantidade: {quantidade}")
-    print(f"Tipo de Corte: {corte}")
-    print(f"------------------------\n")
+    logger.debug(
+        "--- Informações do Pedido --- Linha: %s | Pedido: %s | Entrega: %s | Cliente: %s | "
+        "Produto: %s | Quantidade: %s | Tipo de Corte: %s",
+        linha, pedido, entrega, cliente, produto, quantidade, corte
+    )
+    
+    if registro is None:
+        registro = obter_matriz_planilha(ws)
+
+    if config_setores is None:
+        config_setores = obter_perfis_setores(ws, configuracao)
     
     # Executa o planejamento com fluxo contínuo
-    primeiro_dia_usado, ultimo_dia_usado, delay = _processar_fluxo_continuo(
+    resultado = _processar_fluxo_continuo(
         ws, setores_processar, quantidade, linha, data_inicio, 
-        calendario_path, corte, priorizar_estampa
+        calendario_path, corte, priorizar_estampa, registro, config_setores
     )
+    registrar_trace_pedido(pedido, linha, setor, corte, quantidade, data_inicio, resultado)
     
     # Salvar a planilha em uma nova versão se um caminho e o workbook foram fornecidos
     if planilha_path and workbook and salvar:
-        salvar_nova_versao(planilha_path, workbook)
+        salvar_nova_versao(planilha_path, workbook, config_path=config_path)
 
-    return primeiro_dia_usado, ultimo_dia_usado, delay
+    return resultado.primeiro_dia, resultado.ultimo_dia, resultado.delay
 
 def _processar_fluxo_continuo(
         ws: Worksheet, setores_processar: list, quantidade_total: int, 
         linha: int, data_inicio: datetime, calendario_path: str, 
-        corte: str, priorizar_estampa: bool
-    ):
+        corte: str, priorizar_estampa: bool, registro: MatrizCapacidade,
+        config_setores: dict
+    ) -> ResultadoPedido:
     """
     Processa todos os setores com fluxo contínuo, onde a produção de cada dia 
     fica disponível para o próximo setor no dia seguinte.
+
+    O cálculo é feito pelo motor (scheduling_engine) e as reservas resultantes
+    são gravadas na planilha em uma única passada.
     """
-    # Inicialização
-    primeiro_dia_usado = None
-    ultimo_dia_usado = None
-    delay = 0
+    # Índice data -> coluna da planilha (cabeçalho lido uma única vez por planilha)
+    indice_datas = obter_indice_datas(ws)
     
-    # Filtrar setores válidos baseado no tipo de corte
-    setores_validos = []
-    for setor in setores_processar:
-        if not _deve_pular_setor(setor, corte):
-            setores_validos.append(setor)
-    
-    print(f"🔧 Setores a processar (após filtro de corte): {setores_validos}")
-    
-    # Controle de estoque entre setores: {setor: quantidade_disponivel}
-    quantidade_disponivel = {}
-    
-    # Inicializar controles
-    for i, setor in enumerate(setores_validos):
-        if i == 0:
-            # Primeiro setor tem toda a quantidade para produzir
-            quantidade_disponivel[setor] = quantidade_total
-        else:
-            # Outros setores começam sem nada para produzir
-            quantidade_disponivel[setor] = 0
-    
-    # Obter configurações de cada setor
-    config_setores = {}
-    for setor in setores_validos:
-        config_setores[setor] = _obter_config_setor(setor, ws)
-    
-    # Obter dias úteis para um período amplo (90 dias)
-    dias_uteis = obter_proximos_dias_uteis(data_inicio, 90, calendario_path)
-    
-    if not dias_uteis:
-        print("⚠ Nenhum dia útil encontrado!")
-        return primeiro_dia_usado, ultimo_dia_usado, delay
-    
-    # Controle de produção acumulada por setor
-    producao_acumulada = {setor: 0 for setor in setores_validos}
-    
-    print(f"📊 Iniciando processamento - Quantidade total: {quantidade_total}")
-    print(f"🎯 Setores válidos: {setores_validos}")
-    
-    # Processar dia a dia
-    for idx_dia, dia_atual in enumerate(dias_uteis):
-        print(f"\n📅 Processando dia: {dia_atual.strftime('%d/%m/%Y')}")
-        dia_teve_producao = False
-        producao_dia = {}
-        
-        # Transferir estoque ANTES do processamento do dia (exceto no primeiro dia)
-        if idx_dia > 0:
-            _transferir_estoque_dia_anterior(setores_validos, producao_dia_anterior, quantidade_disponivel)
-        
-        # Processar cada setor neste dia
-        for i, setor in enumerate(setores_validos):
-            producao_dia[setor] = 0
-            
-            # Verificar se há material disponível para produzir
-            if quantidade_disponivel[setor] <= 0:
-                print(f"  [{setor}] Sem material disponível ({quantidade_disponivel[setor]})")
-                continue
-            
-            # Verificar priorização de estampa (só terças e quintas)
-            if setor == 'Estampa' and priorizar_estampa:
-                if dia_atual.weekday() not in [1, 3]:  # 1=terça, 3=quinta
-                    print(f"  [{setor}] Dia não prioritário para estampa (apenas terças e quintas)")
-                    delay += 1
-                    continue
-            
-            # Processar produção do setor neste dia
-            producao_realizada = _processar_setor_dia(
-                ws, setor, dia_atual, linha, quantidade_disponivel[setor], 
-                config_setores[setor]
-            )
-            
-            if producao_realizada > 0:
-                dia_teve_producao = True
-                producao_dia[setor] = producao_realizada
-                
-                # Registrar primeiro e último dia usado
-                if primeiro_dia_usado is None:
-                    primeiro_dia_usado = dia_atual
-                ultimo_dia_usado = dia_atual
-                
-                # Atualizar quantidade disponível do setor atual
-                quantidade_disponivel[setor] -= producao_realizada
-                producao_acumulada[setor] += producao_realizada
-                
-                print(f"  ✔[{setor}] {producao_realizada} unidades produzidas (disponível: {quantidade_disponivel[setor]}, acumulado: {producao_acumulada[setor]})")
-            else:
-                print(f"  [-] [{setor}] Nenhuma produção (material: {quantidade_disponivel[setor]})")
-        
-        # Salvar produção do dia para transferência no próximo dia
-        producao_dia_anterior = producao_dia.copy()
-        
-        # Verificar se toda a produção foi concluída
-        if producao_acumulada[setores_validos[-1]] >= quantidade_total:
-            print(f"✅ Toda a produção foi concluída até {dia_atual.strftime('%d/%m/%Y')}")
-            print(f"📊 Produção final do último setor: {producao_acumulada[setores_validos[-1]]}/{quantidade_total}")
-            break
-        
-        # Incrementar delay se nenhum setor produziu neste dia
-        if not dia_teve_producao:
-            delay += 1
-        
-        # Debug: mostrar status atual
-        print(f"  📊 Status: {[f'{setor}:{quantidade_disponivel[setor]}' for setor in setores_validos]}")
+    pedido = PedidoPlanejamento(
+        quantidade=quantidade_total,
+        setor_inicial=setores_processar[0],
+        corte=corte,
+        data_inicio=data_inicio,
+    )
+    resultado = planejar_pedido(
+        pedido, config_setores, carregar_calendario_uteis(calendario_path),
+        registro, priorizar_estampa, datas_planilha=indice_datas
+    )
     
-    return primeiro_dia_usado, ultimo_dia_usado, delay
+    escrever_reservas(ws, linha, resultado.reservas, indice_datas)
+    return resultado
+
+def registrar_trace_pedido(pedido, linha: int, setor: str, corte: str, quantidade: int,
+                           data_inicio: datetime, resultado: ResultadoPedido):
+    """Grava o pedido no arquivo de rastreamento, se ele estiver habilitado."""
+    if not logger_trace.isEnabledFor(logging.INFO):
+        return
+    logger_trace.info({
+        "pedido": pedido,
+        "linha": linha,
+        "quantidade": quantidade,
+        "corte": corte,
+        "setor_inicial": setor,
+        "inicio": data_inicio,
+        "primeiro_dia": resultado.primeiro_dia,
+        "ultimo_dia": resultado.ultimo_dia,
+        "delay": resultado.delay,
+        "reservas": resultado.reservas,
+    })
+
+def obter_config_setores(ws: Worksheet, configuracao: ConfiguracaoPlano) -> dict:
+    """Obtém as configurações de todos os setores de SETOR_ORDEM."""
+    return {setor: _obter_config_setor(setor, ws, configuracao) for setor in SETOR_ORDEM}
+
+
+# Configurações dos setores por planilha: {ws: (configuração usada, perfis)}
+_perfis_setores = weakref.WeakKeyDictionary()
+
+# Configurações dos setores por limites diários: {limites: (configuração usada, perfis)}
+_perfis_por_limites = {}
+
+# Matriz de capacidade por planilha, usada por preencher_producao sem `registro`
+_matrizes_planilha = weakref.WeakKeyDictionary()
+
+
+def obter_perfis_setores(ws: Worksheet, configuracao: ConfiguracaoPlano) -> dict:
+    """
+    Retorna as configurações de todos os setores (limite diário de [E3:E12], setup
+    e sem_limite), calculadas uma única vez por planilha.
+
+    A tabela é recalculada se a configuração for relida (arquivo alterado). Se os
+    limites da planilha forem alterados durante o planejamento, chame
+    descartar_perfis_setores.
+
+    Args:
+        ws (Worksheet): Planilha do plano.
+        configuracao (ConfiguracaoPlano): Configuração em uso.
+
+    Returns:
+        dict: {setor: {'limite_max', 'setup', 'sem_limite'}}
+    """
+    em_cache = _perfis_setores.get(ws)
+    if em_cache and em_cache[0] is configuracao:
+        return em_cache[1]
+
+    perfis = obter_config_setores(ws, configuracao)
+    _perfis_setores[ws] = (configuracao, perfis)
+    return perfis
+
+
+def descartar_perfis_setores(ws: Worksheet = None):
+    """
+    Descarta as configurações dos setores e a matriz de capacidade em cache da
+    planilha (ou todas, inclusive as montadas a partir de limites, se ws for None).
+    """
+    if ws is None:
+        _perfis_setores.clear()
+        _perfis_por_limites.clear()
+        _matrizes_planilha.clear()
+    else:
+        _perfis_setores.pop(ws, None)
+        _matrizes_planilha.pop(ws, None)
+
+def obter_matriz_planilha(ws: Worksheet) -> MatrizCapacidade:
+    """
+    Retorna a matriz de capacidade da planilha, construída uma única vez a partir
+    de [E3:E12] e da produção já gravada. As reservas de preencher_producao são
+    registradas nela; se a planilha for alterada por outro meio, chame
+    descartar_perfis_setores.
+    """
+    matriz = _matrizes_planilha.get(ws)
+    if matriz is None:
+        matriz = MatrizCapacidade.a_partir_da_planilha(ws)
+        _matrizes_planilha[ws] = matriz
+    return matriz
+
+def montar_config_setores(limites: list, configuracao: ConfiguracaoPlano) -> dict:
+    """
+    Monta as configurações de todos os setores a partir dos limites diários,
+    sem consultar a planilha (limites na ordem de SETOR_ORDEM, como em [E3:E12]).
+
+    Como em obter_perfis_setores, a tabela é calculada uma única vez para os mesmos
+    limites e configuração; descartar_perfis_setores() limpa o cache.
+    """
+    chave = tuple(int(limite) for limite in limites)
+    em_cache = _perfis_por_limites.get(chave)
+    if em_cache and em_cache[0] is configuracao:
+        return em_cache[1]
 
-def _obter_config_setor(setor_nome: str, ws: Worksheet):
+    perfis = {
+        setor: _config_setor(setor, limite, configuracao)
+        for setor, limite in zip(SETOR_ORDEM, chave)
+    }
+    _perfis_por_limites[chave] = (configuracao, perfis)
+    return perfis
+
+def _obter_config_setor(setor_nome: str, ws: Worksheet, configuracao: ConfiguracaoPlano):
     """Obtém as configurações de um setor específico."""
-    # Lambda function para transformar a string
-    formatar_parametro = lambda setor_nome: "MAX_" + unicodedata.normalize('NFKD', setor_nome).encode('ASCII', 'ignore').decode('ASCII').upper().replace(" ", "_")
-    
-    setor_formatado = formatar_parametro(setor_nome)
-    valor_parametro_max = float(obter_valor_parametro(setor_formatado))
-    valor_setup = float(obter_valor_parametro('SETUP'))
-    setup = valor_parametro_max * valor_setup / 100
-    
     # Obter limite de produção da planilha
     linha_limite = SETOR_ORDEM.index(setor_nome) + 3
     valor_limite_max = obter_limite_producao(ws, linha_limite)
+    return _config_setor(setor_nome, valor_limite_max, configuracao)
+
+def _config_setor(setor_nome: str, valor_limite_max: int, configuracao: ConfiguracaoPlano):
+    """Configuração do setor dado o seu limite diário."""
+    valor_parametro_max = float(configuracao.capacidades[setor_nome])
+    setup = valor_parametro_max * configuracao.setup / 100
     
     return {
         'limite_max': valor_limite_max,
@@ -263,88 +291,12 @@ def _obter_config_setor(setor_nome: str, ws: Worksheet):
 
 def _deve_pular_setor(setor_nome: str, corte: str):
     """Verifica se um setor deve ser pulado baseado no tipo de corte."""
-    return ((setor_nome == 'Corte manual' and corte.lower() == 'laser') or 
-            (setor_nome == 'Corte laser' and corte.lower() == 'manual'))
-
-def _processar_setor_dia(ws: Worksheet, setor: str, dia: datetime, linha: int, 
-                        quantidade_disponivel: int, config_setor: dict):
-    """
-    Processa a produção de um setor em um dia específico.
-    
-    Returns:
-        int: Quantidade efetivamente produzida
-    """
-    if quantidade_disponivel <= 0:
-        return 0
-        
-    # Calcular linha do setor na planilha
-    linha_setor = linha + SETOR_ORDEM.index(setor) + 1
-    
-    # Encontrar coluna da data
-    col = encontrar_coluna_por_data(ws, dia)
-    if col is None:
-        print(f"    ⚠ [{setor}] Coluna não encontrada para {dia.strftime('%d/%m/%Y')}")
-        return 0
-    
-    # Calcular produção já planejada
-    valor_planejado = calcular_producao_planejada(ws, setor, col, linha_setor)
-    
-    # Calcular limite disponível
-    if config_setor['sem_limite']:
-        # Setores sem limite diário - pode produzir tudo que tem disponível
-        limite_disponivel = quantidade_disponivel
-        print(f"    🔄 [{setor}] Setor sem limite - pode produzir: {quantidade_disponivel}")
-    else:
-        limite_disponivel = max(0, config_setor['limite_max'] - valor_planejado)
-        print(f"    📊 [{setor}] Limite máx: {config_setor['limite_max']}, já planejado: {valor_planejado}, disponível: {limite_disponivel}")
-    
-    # Verificar setup mínimo para setores com limite
-    if not config_setor['sem_limite'] and limite_disponivel > 0 and limite_disponivel < config_setor['setup']:
-        print(f"    ⚠ [{setor}] Limite disponível ({limite_disponivel}) menor que setup ({config_setor['setup']})")
-        return 0
-    
-    # Determinar quanto produzir
-    if config_setor['sem_limite']:
-        producao_dia = quantidade_disponivel
-    else:
-        producao_dia = min(limite_disponivel, quantidade_disponivel)
-    
-    # Registrar na planilha
-    if producao_dia > 0:
-        try:
-            valor_atual = ws.cell(row=linha_setor, column=col).value or 0
-            novo_valor = valor_atual + producao_dia
-            ws.cell(row=linha_setor, column=col, value=novo_valor)
-            print(f"    ✅ [{setor}] Registrado na planilha: {producao_dia} (total na célula: {novo_valor})")
-        except Exception as e:
-            print(f"    ⚠ [{setor}] Erro ao registrar produção: {e}")
-            return 0
-    else:
-        print(f"    [-] [{setor}] Nenhuma produção registrada")
-    
-    return producao_dia
-
-def _transferir_estoque_dia_anterior(setores_validos: list, producao_dia_anterior: dict, quantidade_disponivel: dict):
-    """
-    Transfere a produção do dia anterior para o próximo setor.
-    """
-    for i in range(len(setores_validos) - 1):
-        setor_atual = setores_validos[i]
-        proximo_setor = setores_validos[i + 1]
-        
-        # Verificar se há produção do setor atual para transferir
-        if setor_atual in producao_dia_anterior and producao_dia_anterior[setor_atual] > 0:
-            quantidade_transferir = producao_dia_anterior[setor_atual]
-            
-            # Transferir para o próximo setor
-            quantidade_disponivel[proximo_setor] += quantidade_transferir
-            
-            print(f"    📦 Transferido: {quantidade_transferir} unidades de '{setor_atual}' para '{proximo_setor}'")
+    return deve_pular_setor(setor_nome, corte)
 
 def _transferir_estoque_entre_setores(setores_processar: list, estoque_intermediario: dict, 
                                     quantidade_pendente: dict, dia_producao: datetime, corte: str):
     """
-    FUNÇÃO REMOVIDA - Substituída por _transferir_estoque_dia_anterior
+    FUNÇÃO REMOVIDA - Substituída pelo motor em scheduling_engine.planejar_pedido
     """
     pass
 
@@ -0,0 +1,150 @@
+"""
+Perfil de execução (cProfile ou pyinstrument) de uma ação do planejamento.
+
+O perfil é gravado ao lado do plano gerado durante a ação, com o mesmo nome do
+plano mais o rótulo da ação (ex.: planejamento_c100_N__2025_05_08__10_00_00_.plan.prof),
+de forma que perfis e planos possam ser associados. Se a ação não salvar um plano,
+usa-se o plano de referência informado (ex.: o plano exportado em relatórios) ou
+perfil_<rótulo>__<carimbo>_ na pasta de destino, com o carimbo de salvar_nova_versao.
+
+Uso:
+    with perfilar("plan", "auto"):
+        criar_novo_plano(df)
+
+Pela linha de comando: `--profile [auto|cprofile|pyinstrument]`; no menu
+interativo: variável de ambiente PLANEJAMENTO_PROFILE=1 (ou cprofile/pyinstrument).
+"""
+
+import importlib.util
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+
+from automation.core.constants import DEFAULT_EXP_PATH
+from automation.core.file_utils import carimbo_versao, ultima_versao_salva
+
+PERFILADORES = ("auto", "cprofile", "pyinstrument")
+
+# Extensão do arquivo gravado por cada perfilador
+EXTENSOES_PERFIL = {"cprofile": ".prof", "pyinstrument": ".html"}
+
+logger = logging.getLogger(__name__)
+
+
+def escolher_perfilador(perfilador: str = "auto"):
+    """
+    Resolve o perfilador a usar.
+
+    Args:
+        perfilador (str): "auto" (pyinstrument se instalado, senão cProfile),
+            "cprofile" ou "pyinstrument". Vazio, None, "0" ou "nao" desativam o perfil;
+            "1" e "sim" equivalem a "auto".
+
+    Returns:
+        str or None: "cprofile", "pyinstrument" ou None (perfil desativado).
+    """
+    if perfilador is None:
+        return None
+    perfilador = str(perfilador).strip().lower()
+    if perfilador in ("", "0", "nao", "não", "false"):
+        return None
+    if perfilador in ("1", "sim", "true"):
+        perfilador = "auto"
+    if perfilador not in PERFILADORES:
+        raise ValueError(f"Perfilador '{perfilador}' não reconhecido. Deve ser um dos: {list(PERFILADORES)}")
+
+    pyinstrument_instalado = importlib.util.find_spec("pyinstrument") is not None
+    if perfilador == "auto":
+        return "pyinstrument" if pyinstrument_instalado else "cprofile"
+    if perfilador == "pyinstrument" and not pyinstrument_instalado:
+        logger.warning("pyinstrument não está instalado (pip install pyinstrument). Usando cProfile.")
+        return "cprofile"
+    return perfilador
+
+
+class SessaoPerfil:
+    """Perfil de uma ação; `caminho` recebe o arquivo gravado ao final."""
+
+    def __init__(self, rotulo: str, perfilador: str, pasta_destino: str = DEFAULT_EXP_PATH, referencia: str = None):
+        """
+        Args:
+            rotulo (str): Nome da ação (ex.: "plan", "report"), usado no nome do arquivo.
+            perfilador (str): "cprofile" ou "pyinstrument" (ver escolher_perfilador).
+            pasta_destino (str): Pasta do perfil quando a ação não salva um plano.
+            referencia (str): Plano associado à ação quando ela não salva um novo.
+        """
+        self.rotulo = rotulo
+        self.perfilador = perfilador
+        self.pasta_destino = pasta_destino
+        self.referencia = referencia
+        self.caminho = None
+        self._perfil = None
+        self._versao_anterior = None
+
+    def iniciar(self):
+        self._versao_anterior = ultima_versao_salva()
+        if self.perfilador == "pyinstrument":
+            from pyinstrument import Profiler
+
+            self._perfil = Profiler()
+            self._perfil.start()
+        else:
+            import cProfile
+
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+
+    def finalizar(self) -> str:
+        """Para o perfilador e grava o resultado. Retorna o caminho do arquivo."""
+        if self.perfilador == "pyinstrument":
+            self._perfil.stop()
+        else:
+            self._perfil.disable()
+
+        caminho = self._caminho_saida()
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        if self.perfilador == "pyinstrument":
+            caminho.write_text(self._perfil.output_html(), encoding="utf-8")
+        else:
+            self._perfil.dump_stats(str(caminho))
+        self.caminho = str(caminho)
+        return self.caminho
+
+    def _caminho_saida(self) -> Path:
+        extensao = EXTENSOES_PERFIL[self.perfilador]
+        plano = ultima_versao_salva()
+        if plano == self._versao_anterior:
+            plano = self.referencia
+        # Planos em pastas temporárias (ex.: benchmark) já podem ter sido apagados
+        if plano and Path(plano).exists():
+            plano = Path(plano)
+            return plano.with_name(f"{plano.stem}.{self.rotulo}{extensao}")
+        return Path(self.pasta_destino) / f"perfil_{self.rotulo}__{carimbo_versao()}_{extensao}"
+
+
+@contextmanager
+def perfilar(rotulo: str, perfilador: str = "auto", pasta_destino: str = DEFAULT_EXP_PATH, referencia: str = None):
+    """
+    Executa o bloco sob o perfilador e grava o perfil ao final (inclusive em caso de erro).
+
+    Args:
+        rotulo (str): Nome da ação, usado no nome do arquivo.
+        perfilador (str): Ver escolher_perfilador; se desativado, o bloco roda sem perfil.
+        pasta_destino (str): Pasta do perfil quando a ação não salva um plano.
+        referencia (str): Plano associado à ação quando ela não salva um novo.
+
+    Yields:
+        SessaoPerfil or None: Sessão do perfil (None se desativado).
+    """
+    perfilador = escolher_perfilador(perfilador)
+    if perfilador is None:
+        yield None
+        return
+
+    sessao = SessaoPerfil(rotulo, perfilador, pasta_destino, referencia)
+    sessao.iniciar()
+    try:
+        yield sessao
+    finally:
+        caminho = sessao.finalizar()
+        print(f"🔎 Perfil de execução gravado em: {caminho}")
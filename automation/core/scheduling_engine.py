@@ -0,0 +1,326 @@
+"""
+Motor de planejamento com fluxo contínuo, independente do openpyxl.
+
+Recebe pedidos, configurações dos setores, calendário de dias úteis e a carga já
+reservada (MatrizCapacidade) e devolve, para cada pedido, a lista de reservas
+(setor, dia, quantidade). A gravação na planilha é feita depois, em uma única
+passada (ver excel_utils.escrever_reservas).
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+
+from automation.core.constants import SETOR_ORDEM
+from automation.core.capacity_ledger import MatrizCapacidade
+from automation.core.calendar_utils import CalendarioUteis
+from automation.core.instrumentation import contar
+
+logger = logging.getLogger(__name__)
+
+# Dias da semana em que a Estampa produz quando PRIORIDADE_ESTAMPA está ativa (1=terça, 3=quinta)
+DIAS_PRIORIDADE_ESTAMPA = (1, 3)
+
+
+@dataclass
+class PedidoPlanejamento:
+    """Dados de um pedido necessários para o planejamento."""
+
+    quantidade: int
+    setor_inicial: str
+    corte: str
+    data_inicio: datetime = None
+    pedido: str = None
+
+
+@dataclass
+class ResultadoPedido:
+    """Resultado do planejamento de um pedido."""
+
+    reservas: list = field(default_factory=list)
+    primeiro_dia: datetime = None
+    ultimo_dia: datetime = None
+    delay: int = 0
+    # Dias de espera por setor: dias em que o setor tinha estoque e não o esgotou
+    espera: dict = field(default_factory=dict)
+
+
+def deve_pular_setor(setor_nome: str, corte: str) -> bool:
+    """Verifica se um setor deve ser pulado baseado no tipo de corte."""
+    return ((setor_nome == 'Corte manual' and corte.lower() == 'laser') or
+            (setor_nome == 'Corte laser' and corte.lower() == 'manual'))
+
+
+def setores_do_pedido(setor_inicial: str, corte: str) -> list:
+    """
+    Retorna os setores percorridos pelo pedido, a partir do setor inicial,
+    sem o setor de corte que não corresponde ao tipo de corte.
+    """
+    if setor_inicial not in SETOR_ORDEM:
+        raise ValueError(f"Setor '{setor_inicial}' não reconhecido. Deve ser um dos: {SETOR_ORDEM}")
+    setor_idx = SETOR_ORDEM.index(setor_inicial)
+    return [setor for setor in SETOR_ORDEM[setor_idx:] if not deve_pular_setor(setor, corte)]
+
+
+def normalizar_data_inicio(data_inicio):
+    """
+    Converte a data de início (str DD/MM/AAAA ou datetime) em datetime. Sem data
+    (None, NaN ou NaT, como as células vazias da coluna INICIO), usa o dia atual.
+    """
+    # data_inicio != data_inicio equivale a pd.isna para NaN e NaT, sem importar o pandas
+    if data_inicio is None or data_inicio != data_inicio:
+        return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    if isinstance(data_inicio, str):
+        return datetime.strptime(data_inicio, "%d/%m/%Y")
+    return data_inicio
+
+
+def setor_gargalo(espera: dict, config_setores: dict):
+    """
+    Retorna o setor com limite diário em que o pedido mais esperou (ver
+    ResultadoPedido.espera), ou None se o pedido não esperou em nenhum deles.
+    Em caso de empate, vale o primeiro setor do roteiro.
+
+    Args:
+        espera (dict): {setor: dias de espera} de ResultadoPedido.
+        config_setores (dict): {setor: {'limite_max', 'setup', 'sem_limite'}}.
+    """
+    candidatos = [
+        setor for setor in SETOR_ORDEM
+        if espera.get(setor, 0) > 0 and not config_setores.get(setor, {}).get('sem_limite')
+    ]
+    if not candidatos:
+        return None
+    return max(candidatos, key=espera.get)
+
+
+def planejar_pedido(
+        pedido: PedidoPlanejamento,
+        config_setores: dict,
+        calendario: CalendarioUteis,
+        registro: MatrizCapacidade,
+        priorizar_estampa: bool = False,
+        datas_planilha=None,
+        caminho_rapido: bool = True
+    ) -> ResultadoPedido:
+    """
+    Planeja um pedido com fluxo contínuo: a produção de cada setor em um dia
+    fica disponível para o próximo setor no dia útil seguinte.
+
+    Args:
+        pedido: Pedido a planejar.
+        config_setores: {setor: {'limite_max', 'setup', 'sem_limite'}}.
+        calendario: Calendário de dias úteis.
+        registro: Capacidade restante; recebe as reservas do pedido ao final,
+            em uma única operação vetorizada.
+        priorizar_estampa: Se True, a Estampa só produz às terças e quintas.
+        datas_planilha: Conjunto de datas disponíveis na planilha (ou None para
+            aceitar qualquer dia útil). Dias fora dele não recebem produção.
+        caminho_rapido: Se True, trechos de dias em que nenhum setor pode produzir
+            são saltados de uma vez (ver _proximo_dia_produtivo). O resultado é
+            idêntico ao da simulação dia a dia (caminho_rapido=False).
+
+    Returns:
+        ResultadoPedido: Reservas, primeiro e último dia usados, delay e dias de espera por setor.
+    """
+    setores = setores_do_pedido(pedido.setor_inicial, pedido.corte)
+    quantidade_total = pedido.quantidade
+    resultado = ResultadoPedido()
+    debug = logger.isEnabledFor(logging.DEBUG)
+
+    n = len(setores)
+    configs = [config_setores[setor] for setor in setores]
+    idx_estampa = setores.index('Estampa') if priorizar_estampa and 'Estampa' in setores else -1
+
+    # Controle de estoque entre setores: o primeiro setor tem toda a quantidade
+    disponivel = [0] * n
+    disponivel[0] = quantidade_total
+    producao_anterior = [0] * n
+    espera = [0] * n
+    acumulado_final = 0
+
+    dias_uteis = calendario.proximos(normalizar_data_inicio(pedido.data_inicio))
+    if not dias_uteis:
+        logger.warning("⚠ Nenhum dia útil encontrado!")
+        return resultado
+
+    reservas = resultado.reservas
+    delay = 0
+    ultimo_idx = len(dias_uteis) - 1
+    idx_dia = 0
+    dias_simulados = 0
+    dias_saltados = 0
+
+    while idx_dia <= ultimo_idx:
+        dia = dias_uteis[idx_dia]
+        dias_simulados += 1
+
+        # Transferir a produção do dia anterior para o próximo setor
+        if idx_dia > 0:
+            for i in range(n - 1):
+                if producao_anterior[i] > 0:
+                    disponivel[i + 1] += producao_anterior[i]
+
+        producao = [0] * n
+        dia_teve_producao = False
+        dia_na_planilha = datas_planilha is None or dia in datas_planilha
+
+        for i in range(n):
+            quantidade = disponivel[i]
+            if quantidade <= 0:
+                continue
+
+            # Priorização de estampa (só terças e quintas)
+            if i == idx_estampa and dia.weekday() not in DIAS_PRIORIDADE_ESTAMPA:
+                delay += 1
+                continue
+
+            # Dia sem coluna correspondente na planilha
+            if not dia_na_planilha:
+                continue
+
+            config = configs[i]
+            if config['sem_limite']:
+                # Setores sem limite diário - pode produzir tudo que tem disponível
+                producao_dia = quantidade
+            else:
+                limite_disponivel = max(0, config['limite_max'] - registro.planejado(setores[i], dia))
+                # Setup mínimo: não vale abrir o lote se a capacidade restante é menor que o setup
+                if 0 < limite_disponivel < config['setup']:
+                    continue
+                producao_dia = min(limite_disponivel, quantidade)
+
+            if producao_dia <= 0:
+                continue
+
+            reservas.append((setores[i], dia, producao_dia))
+            producao[i] = producao_dia
+            disponivel[i] -= producao_dia
+            dia_teve_producao = True
+            if resultado.primeiro_dia is None:
+                resultado.primeiro_dia = dia
+            resultado.ultimo_dia = dia
+            if i == n - 1:
+                acumulado_final += producao_dia
+
+        producao_anterior = producao
+
+        # Estoque que sobrou no setor ao final do dia: o pedido esperou por ele
+        for i in range(n):
+            if disponivel[i] > 0:
+                espera[i] += 1
+
+        # Verificar se toda a produção foi concluída
+        if acumulado_final >= quantidade_total:
+            break
+
+        # Incrementar delay se nenhum setor produziu neste dia
+        if not dia_teve_producao:
+            delay += 1
+
+        if debug:
+            logger.debug("  📅 %s | produção: %s | disponível: %s", dia.strftime('%d/%m/%Y'),
+                         dict(zip(setores, producao)), dict(zip(setores, disponivel)))
+
+        proximo_idx = idx_dia + 1
+        # Sem produção no dia, nada é transferido e o estado só muda quando algum setor
+        # voltar a ter capacidade: os dias intermediários são contabilizados de uma vez
+        if caminho_rapido and not dia_teve_producao and proximo_idx <= ultimo_idx:
+            idx_salto = proximo_idx
+            proximo_idx, delay_saltado = _proximo_dia_produtivo(
+                dias_uteis, proximo_idx, setores, configs, disponivel, idx_estampa, calendario, registro
+            )
+            delay += delay_saltado
+            dias_saltados += proximo_idx - idx_salto
+            for i in range(n):
+                if disponivel[i] > 0:
+                    espera[i] += proximo_idx - idx_salto
+
+        if proximo_idx > ultimo_idx:
+            logger.info("⚠ Calendário encerrado em %s antes de concluir a produção (%s/%s)",
+                        dias_uteis[ultimo_idx].strftime("%d/%m/%Y"), acumulado_final, quantidade_total)
+        idx_dia = proximo_idx
+
+    # Cada (setor, dia) recebe no máximo uma reserva por pedido, então a matriz
+    # só precisa ser atualizada ao final
+    registro.registrar_reservas(reservas)
+    resultado.delay = delay
+    resultado.espera = {setor: dias for setor, dias in zip(setores, espera) if dias}
+    contar("pedidos_planejados")
+    contar("dias_simulados", dias_simulados)
+    contar("dias_saltados", dias_saltados)
+    return resultado
+
+
+def _proximo_dia_produtivo(dias_uteis, inicio: int, setores: list, configs: list, disponivel: list,
+                           idx_estampa: int, calendario: CalendarioUteis, registro: MatrizCapacidade):
+    """
+    A partir de um dia sem produção, encontra o próximo dia da janela em que algum
+    setor com estoque pode produzir.
+
+    O critério é uma condição necessária para produzir (o dia encontrado é depois
+    simulado normalmente), de modo que todos os dias saltados são de fato dias sem
+    produção. Cada um deles soma 1 ao delay, mais 1 se a Estampa tem estoque e o dia
+    não é terça nem quinta.
+
+    Returns:
+        tuple: (índice do próximo dia na janela, delay dos dias saltados)
+    """
+    posicao_inicial = dias_uteis.inicio + inicio
+    posicao_final = dias_uteis.inicio + len(dias_uteis)
+    colunas = registro.colunas_calendario(calendario)[posicao_inicial:posicao_final]
+    dias_semana = calendario.dias_semana()[posicao_inicial:posicao_final]
+    prioridade = np.isin(dias_semana, DIAS_PRIORIDADE_ESTAMPA)
+
+    pode_produzir = np.zeros(len(colunas), dtype=bool)
+    for i, setor in enumerate(setores):
+        if disponivel[i] <= 0:
+            continue
+        config = configs[i]
+        if config['sem_limite']:
+            setor_pode = np.ones(len(colunas), dtype=bool)
+        else:
+            minimo = max(1, config['setup'])
+            setor_pode = registro.disponivel_nos_dias(setor, colunas, config['limite_max']) >= minimo
+        if i == idx_estampa:
+            setor_pode &= prioridade
+        pode_produzir |= setor_pode
+
+    produtivos = np.flatnonzero(pode_produzir)
+    saltados = int(produtivos[0]) if produtivos.size else len(colunas)
+
+    delay = saltados
+    if idx_estampa >= 0 and disponivel[idx_estampa] > 0:
+        delay += saltados - int(np.count_nonzero(prioridade[:saltados]))
+    return inicio + saltados, delay
+
+
+def planejar_pedidos(
+        pedidos: list,
+        config_setores: dict,
+        calendario: CalendarioUteis,
+        registro: MatrizCapacidade = None,
+        priorizar_estampa: bool = False,
+        datas_planilha=None,
+        caminho_rapido: bool = True
+    ) -> list:
+    """
+    Planeja uma lista de pedidos em ordem de prioridade sobre a mesma matriz de capacidade.
+
+    Se nenhuma matriz for informada, é criada uma com os dias úteis do calendário
+    e os limites de config_setores.
+
+    Returns:
+        list: Um ResultadoPedido por pedido, na mesma ordem.
+    """
+    if registro is None:
+        registro = MatrizCapacidade(
+            list(calendario),
+            [config_setores.get(setor, {}).get('limite_max', 0) for setor in SETOR_ORDEM]
+        )
+    return [
+        planejar_pedido(pedido, config_setores, calendario, registro, priorizar_estampa, datas_planilha, caminho_rapido)
+        for pedido in pedidos
+    ]
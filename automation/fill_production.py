@@ -4,6 +4,8 @@ from datetime import datetime, timedelta
 import os
 from pathlib import Path
 
+from automation.core.excel_utils import obter_indice_datas
+
 SETOR_ORDEM = [
     'PCP', 'Separação MP', 'Corte manual', 'Impressão',
     'Estampa', 'Corte laser', 'Costura', 'Arremate', 'Embalagem'
@@ -53,44 +55,9 @@ def obter_proximos_dias_uteis(data_inicio, dias_necessarios, calendario_path='da
 def encontrar_coluna_por_data(ws, data):
     """
     Encontra a coluna na planilha que corresponde à data fornecida.
-    Verifica tanto formato string quanto objeto datetime.
+    Usa o índice de datas da planilha, construído uma única vez por carga.
     """
-    data_str = data.strftime("%d/%m/%Y")
-    # print(f"DEBUG - Procurando coluna para a data: {data_str}")
-    
-    for col in range(8, ws.max_column + 1):  # Começando da coluna H (8)
-        cell_value = ws.cell(row=2, column=col).value
-        # Limita o debug para não sobrecarregar o console
-        # if col % 10 == 0:  # Mostra debug a cada 10 colunas
-            # print(f"DEBUG - Verificando células... coluna atual {col}")
-        
-        # Verifica se o valor da célula é uma data
-        if isinstance(cell_value, datetime):
-            # Compara o valor da data
-            if cell_value.date() == data.date():
-                # print(f"DEBUG - Data encontrada na coluna {col} (formato datetime)")
-                return col
-        elif isinstance(cell_value, str):
-            # Tenta converter para datetime se for string
-            try:
-                # Tenta primeiro o formato DD/MM/YYYY
-                cell_date = datetime.strptime(cell_value, "%d/%m/%Y")
-                if cell_date.date() == data.date():
-                    # print(f"DEBUG - Data encontrada na coluna {col} (formato string DD/MM/YYYY)")
-                    return col
-            except ValueError:
-                try:
-                    # Tenta o formato YYYY-MM-DD
-                    cell_date = datetime.strptime(cell_value, "%Y-%m-%d")
-                    if cell_date.date() == data.date():
-                        # print(f"DEBUG - Data encontrada na coluna {col} (formato string YYYY-MM-DD)")
-                        return col
-                except ValueError:
-                    # Ignora se não conseguir converter
-                    pass
-    
-    # print(f"DEBUG - ALERTA: Data {data_str} não encontrada em nenhuma coluna da planilha!")
-    return None
+    return obter_indice_datas(ws).coluna(data)
 
 def salvar_nova_versao(caminho_original, workbook):
     """
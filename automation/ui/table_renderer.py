@@ -1,8 +1,28 @@
+import numpy as np
 import pandas as pd
 import os
 from datetime import datetime
-from tabulate import tabulate
 from openpyxl import load_workbook
+from automation.core.calendar_utils import formatar_datas
+from automation.core.instrumentation import contar, cronometrado
+
+# Colunas da planilha de pedidos e os nomes usados no restante do sistema
+COLUNAS_PEDIDOS = {
+    "Pedido": "PEDIDO",
+    "Entrega": "ENTREGA",
+    "Cliente": "CLIENTE",
+    "Produto": "PRODUTO",
+    "QTD": "QUANTIDADE",
+    "Tipo de Corte": "CORTE",
+    "Data Inicio": "INICIO",
+    "Setor": "SETOR",
+}
+
+# Setores aceitos como início do pedido; valores não reconhecidos viram 'PCP'
+OPCOES_VALIDAS_INICIO = [
+    'PCP', 'Separação MP', 'Corte manual', 'Impressão',
+    'Estampa', 'Corte laser', 'Costura', 'Arremate', 'Embalagem'
+]
 
 def validar_data_input(data_str):
     try:
@@ -10,97 +30,150 @@ def validar_data_input(data_str):
     except ValueError:
         return None
 
-def processar_tabela(file_choice):
-    print("Lendo o arquivo inicial...")
-    arquivo_destino = f"{file_choice}.xlsx" if not str(file_choice).endswith('.xlsx') else file_choice
-    print(f"\nAbrindo planilha: {arquivo_destino}")
-    
+def _ler_pedidos(arquivo_destino):
+    """
+    Lê a planilha de pedidos em uma única passada (somente leitura, apenas valores).
+
+    Returns:
+        tuple: (DataFrame com as colunas de COLUNAS_PEDIDOS e a coluna LINHA com o
+            número da linha na planilha, linha do cabeçalho, {coluna: índice na planilha})
+    """
+    wb = load_workbook(arquivo_destino, read_only=True, data_only=True)
+    try:
+        linhas = wb.active.iter_rows(values_only=True)
+        linha_cabecalho = None
+        for numero, row in enumerate(linhas, start=1):
+            if row and "Pedido" in row:
+                linha_cabecalho = numero
+                cabecalho = list(row)
+                break
+        if linha_cabecalho is None:
+            raise ValueError("Coluna 'Pedido' não encontrada!")
+
+        ausentes = [coluna for coluna in COLUNAS_PEDIDOS if coluna not in cabecalho]
+        if ausentes:
+            raise ValueError(f"Colunas não encontradas na planilha de pedidos: {ausentes}")
+        indices = {coluna: cabecalho.index(coluna) for coluna in COLUNAS_PEDIDOS}
+
+        dados = []
+        numeros = []
+        for numero, row in enumerate(linhas, start=linha_cabecalho + 1):
+            if not row:
+                continue
+            dados.append([row[i] if i < len(row) else None for i in indices.values()])
+            numeros.append(numero)
+    finally:
+        wb.close()
+
+    contar("celulas_lidas", len(dados) * len(cabecalho))
+    df = pd.DataFrame(dados, columns=list(COLUNAS_PEDIDOS.values()))
+    df["LINHA"] = numeros
+    return df, linha_cabecalho, indices
+
+def _limpar_pedido(serie: pd.Series) -> pd.Series:
+    """Remove apenas decimais desnecessários do PEDIDO (ex.: '10.00' -> '10')."""
+    return serie.astype(str).str.strip().str.replace(r'\.0+$', '', regex=True)
+
+def _datas_ausentes(serie: pd.Series) -> pd.Series:
+    """Máscara dos valores de data vazios (None, '', 'nan', 'NaT')."""
+    return serie.isna() | serie.astype(str).str.strip().isin(['', 'nan', 'NaT'])
+
+def _solicitar_correcoes(df: pd.DataFrame, indices: dict, interativo: bool) -> list:
+    """
+    Pede ao usuário as datas ausentes em ENTREGA e INICIO.
+
+    Returns:
+        list: Correções (índice no DataFrame, coluna, linha, coluna na planilha, nova data).
+    """
+    correcoes = []
+    for col, coluna_planilha in (('ENTREGA', 'Entrega'), ('INICIO', 'Data Inicio')):
+        for idx in df.index[_datas_ausentes(df[col])]:
+            valor = df.at[idx, col]
+            linha = df.at[idx, "LINHA"]
+            print(f"\n⚠️ Valor inválido detectado na coluna '{col}' na linha {linha} (valor: '{valor}')")
+            if not interativo:
+                raise ValueError(f"Data inválida na coluna '{col}' na linha {linha} (valor: '{valor}')")
+            while True:
+                nova_data_str = input(f"Digite uma nova data para '{valor}' no formato DD/MM/AAAA: ")
+                nova_data = validar_data_input(nova_data_str)
+                if nova_data:
+                    correcoes.append((idx, col, linha, indices[coluna_planilha] + 1, nova_data))
+                    print(f"✔️ Corrigido para {nova_data_str}")
+                    break
+                else:
+                    print("❌ Formato inválido. Tente novamente.")
+    return correcoes
+
+def _gravar_correcoes(arquivo_destino, correcoes: list):
+    """Grava as datas corrigidas na planilha de pedidos."""
     wb = load_workbook(arquivo_destino)
     ws = wb.active
-    header_row = None
-    for i, row in enumerate(ws.iter_rows(values_only=True), start=0):
-        if row and "Pedido" in row:
-            header_row = i
-            break
-    if header_row is None:
-        raise ValueError("Coluna 'Pedido' não encontrada!")
-    
-    print(f"-> Cabeçalho encontrado na linha {header_row + 1}")
-    
-    df = pd.read_excel(arquivo_destino, header=header_row)
-    df = df[df["Pedido"].notna()]
-    df_unique = df.drop_duplicates(subset="Pedido", keep="first")
-    
-    colunas_desejadas = ["Pedido", "Entrega", "Cliente", "Produto", "QTD", "Tipo de Corte", "Data Inicio", "Setor"]
-    df_formatado = df_unique[colunas_desejadas].copy()
-    df_formatado.columns = ['PEDIDO', 'ENTREGA', 'CLIENTE', 'PRODUTO', 'QUANTIDADE', 'CORTE', 'INICIO', 'SETOR']
-    
-    # Corrigindo a formatação do PEDIDO - remove apenas decimais desnecessários
-    def limpar_pedido(valor):
-        valor_str = str(valor).strip()
-        # Remove apenas se terminar com .0 ou .00 (decimais desnecessários)
-        # Usa regex mais específica que só remove ponto seguido de zeros no final
-        import re
-        return re.sub(r'\.0+$', '', valor_str)
-    
-    df_formatado['PEDIDO'] = df_formatado['PEDIDO'].apply(limpar_pedido)
-
-    # Validação de datas (ENTREGA e DATA)
-    for col in ['ENTREGA', 'INICIO']:
-        for idx, valor in df_formatado[col].items():
-            if isinstance(valor, (datetime, pd.Timestamp)):
-                continue
-            if str(valor).strip() in ['', 'nan', 'NaT']:
-                print(f"\n⚠️ Valor inválido detectado na coluna '{col}' na linha {idx + header_row + 2} (valor: '{valor}')")
-                while True:
-                    nova_data_str = input(f"Digite uma nova data para '{valor}' no formato DD/MM/AAAA: ")
-                    nova_data = validar_data_input(nova_data_str)
-                    if nova_data:
-                        ws.cell(row=idx + header_row + 2, column=colunas_desejadas.index(col.capitalize()) + 1).value = nova_data
-                        print(f"✔️ Corrigido para {nova_data_str}")
-                        break
-                    else:
-                        print("❌ Formato inválido. Tente novamente.")
-    
+    for _, _, linha, coluna, nova_data in correcoes:
+        ws.cell(row=linha, column=coluna).value = nova_data
     wb.save(arquivo_destino)
     wb.close()
-    
-    # Recarrega para aplicar as correções
-    df = pd.read_excel(arquivo_destino, header=header_row)
-    df = df[df["Pedido"].notna()]
-    df_unique = df.drop_duplicates(subset="Pedido", keep="first")
-    df_formatado = df_unique[colunas_desejadas].copy()
-    df_formatado.columns = ['PEDIDO', 'ENTREGA', 'CLIENTE', 'PRODUTO', 'QUANTIDADE', 'CORTE', 'INICIO', 'SETOR']
-    
-    # Aplica a mesma correção após recarregar
-    df_formatado['PEDIDO'] = df_formatado['PEDIDO'].apply(limpar_pedido)
+
+@cronometrado()
+def processar_tabela(file_choice, interativo: bool = True):
+    """
+    Lê a planilha de pedidos, normaliza as colunas e exibe a tabela formatada.
+
+    A planilha é lida uma única vez; ela só é reescrita quando o usuário corrige
+    alguma data ausente.
+
+    Args:
+        file_choice (str): Caminho da planilha de pedidos (.xlsx).
+        interativo (bool): Se False, não limpa a tela nem exibe a tabela, e datas
+            ausentes geram ValueError em vez de serem solicitadas ao usuário.
+
+    Returns:
+        tuple: (df_formatado, lista de produtos únicos)
+    """
+    print("Lendo o arquivo inicial...")
+    arquivo_destino = f"{file_choice}.xlsx" if not str(file_choice).endswith('.xlsx') else file_choice
+    print(f"\nAbrindo planilha: {arquivo_destino}")
+
+    df, linha_cabecalho, indices = _ler_pedidos(arquivo_destino)
+    print(f"-> Cabeçalho encontrado na linha {linha_cabecalho}")
+
+    df = df[df["PEDIDO"].notna()]
+    df_formatado = df.drop_duplicates(subset="PEDIDO", keep="first").copy()
+
+    # Corrigindo a formatação do PEDIDO - remove apenas decimais desnecessários
+    df_formatado['PEDIDO'] = _limpar_pedido(df_formatado['PEDIDO'])
+
+    # Validação de datas (ENTREGA e INICIO): as correções são aplicadas em memória
+    correcoes = _solicitar_correcoes(df_formatado, indices, interativo)
+    for idx, col, _, _, nova_data in correcoes:
+        df_formatado.at[idx, col] = nova_data
+
+    # Só reescreve a planilha de pedidos se alguma data foi corrigida
+    if correcoes:
+        _gravar_correcoes(arquivo_destino, correcoes)
+
+    df_formatado = df_formatado.drop(columns="LINHA")
 
     # Converte colunas de data
     df_formatado['ENTREGA'] = pd.to_datetime(df_formatado['ENTREGA'], errors='coerce')
     df_formatado['INICIO'] = pd.to_datetime(df_formatado['INICIO'], errors='coerce')
 
     # Validação da coluna 'CORTE'
-    df_formatado['CORTE'] = df_formatado['CORTE'].astype(str).str.strip().str.lower().map(
-        lambda x: 'Laser' if x == 'laser' else 'Manual'
-    )
+    corte = df_formatado['CORTE'].astype(str).str.strip().str.lower()
+    df_formatado['CORTE'] = np.where(corte == 'laser', 'Laser', 'Manual')
 
     # Validação da coluna 'SETOR'
-    opcoes_validas_inicio = [
-        'PCP', 'Separação MP', 'Corte manual', 'Impressão',
-        'Estampa', 'Corte laser', 'Costura', 'Arremate', 'Embalagem'
-    ]
-    opcoes_validas_normalizadas = [op.lower() for op in opcoes_validas_inicio]
-    df_formatado['SETOR'] = df_formatado['SETOR'].astype(str).str.strip().map(
-        lambda x: next((op for op in opcoes_validas_inicio if op.lower() == x.lower()), 'PCP')
+    opcoes_normalizadas = {op.lower(): op for op in OPCOES_VALIDAS_INICIO}
+    df_formatado['SETOR'] = (
+        df_formatado['SETOR'].astype(str).str.strip().str.lower().map(opcoes_normalizadas).fillna('PCP')
     )
 
-    # Exibição final
-    os.system('cls' if os.name == 'nt' else 'clear')
-    df_formatado['ENTREGA'] = df_formatado['ENTREGA'].dt.strftime('%d/%m/%Y')
-    df_formatado['INICIO'] = df_formatado['INICIO'].dt.strftime('%d/%m/%Y')
-    
-    print("\n✅ Dados formatados com sucesso:\n")
-    print(tabulate(df_formatado, headers='keys', tablefmt='grid', showindex=False))
+    # Exibição final (as datas continuam datetime64 na tabela retornada)
+    if interativo:
+        from tabulate import tabulate
+
+        os.system('cls' if os.name == 'nt' else 'clear')
+        print("\n✅ Dados formatados com sucesso:\n")
+        print(tabulate(formatar_datas(df_formatado), headers='keys', tablefmt='grid', showindex=False))
 
     produtos_unicos = df_formatado['PRODUTO'].unique().tolist()
-    return df_formatado, produtos_unicos
\ No newline at end of file
+    return df_formatado, produtos_unicos
@@ -1,40 +1,79 @@
+import numpy as np
 import pandas as pd
-from datetime import datetime
 
-def validar_prazo(df_produzido: pd.DataFrame) -> pd.DataFrame:
+from automation.core.calendar_utils import carregar_calendario_uteis
+from automation.core.constants import DEFAULT_CALENDARIO_PATH, SETOR_ORDEM
+
+def validar_prazo(df_produzido: pd.DataFrame, calendario_path=DEFAULT_CALENDARIO_PATH) -> pd.DataFrame:
     """
     Valida o prazo de entrega comparando as colunas 'ULTIMO DIA' e 'ENTREGA'.
     Adiciona uma nova coluna 'PRAZO' com os seguintes valores:
     - '✅' se 'ULTIMO DIA' < 'ENTREGA'
     - '⚠️' se 'ULTIMO DIA' == 'ENTREGA'
     - '❌' se 'ULTIMO DIA' > 'ENTREGA'
+    - '❓' se uma das datas estiver ausente ou inválida
+
+    E, na mesma passada, as colunas 'ATRASO' (dias úteis após a entrega) e 'FOLGA'
+    (dias úteis de antecedência), contados pelo calendário de dias úteis.
+
+    As datas são datetime64 (como retornadas por criar_novo_plano) ou, em tabelas
+    lidas de um plano salvo, texto DD/MM/AAAA; a comparação é vetorizada.
 
     Args:
         df_produzido (pd.DataFrame): DataFrame com as colunas 'ULTIMO DIA' e 'ENTREGA'.
+        calendario_path (str): Calendário usado na contagem de dias úteis.
 
     Returns:
-        pd.DataFrame: DataFrame atualizado com a nova coluna 'PRAZO'.
+        pd.DataFrame: DataFrame atualizado com as colunas 'PRAZO', 'ATRASO' e 'FOLGA'.
     """
-    def calcular_prazo(ultimo_dia, entrega):
-        try:
-            # Converte as datas para objetos datetime
-            ultimo_dia_dt = datetime.strptime(ultimo_dia, "%d/%m/%Y")
-            entrega_dt = datetime.strptime(entrega, "%d/%m/%Y")
-            
-            # Compara as datas e retorna o símbolo correspondente
-            if ultimo_dia_dt < entrega_dt:
-                return "✅"
-            elif ultimo_dia_dt == entrega_dt:
-                return "⚠️"
-            else:
-                return "❌"
-        except Exception as e:
-            # Retorna vazio em caso de erro na conversão
-            return "❓"
-
-    # Aplica a função de cálculo de prazo em cada linha do DataFrame
-    df_produzido["PRAZO"] = df_produzido.apply(
-        lambda row: calcular_prazo(row["ULTIMO DIA"], row["ENTREGA"]), axis=1
+    ultimo_dia = _converter_datas(df_produzido["ULTIMO DIA"])
+    entrega = _converter_datas(df_produzido["ENTREGA"])
+    validas = (ultimo_dia.notna() & entrega.notna()).to_numpy()
+
+    df_produzido["PRAZO"] = np.select(
+        [~validas, (ultimo_dia < entrega).to_numpy(), (ultimo_dia == entrega).to_numpy()],
+        ["❓", "✅", "⚠️"],
+        default="❌",
     )
 
-    return df_produzido
\ No newline at end of file
+    # Dias úteis d tais que entrega < d <= último dia (negativo se terminar antes da entrega)
+    diferenca = pd.array(np.full(len(df_produzido), pd.NA), dtype="Int64")
+    if validas.any():
+        dias_uteis = _dias_uteis_entre(entrega[validas], ultimo_dia[validas], calendario_path)
+        diferenca[validas] = dias_uteis
+    df_produzido["ATRASO"] = np.maximum(diferenca, 0)
+    df_produzido["FOLGA"] = np.maximum(-diferenca, 0)
+
+    return df_produzido
+
+
+def resumo_gargalos(df_validado: pd.DataFrame) -> pd.Series:
+    """
+    Conta os pedidos atrasados (❌) por setor gargalo (coluna 'GARGALO' de criar_novo_plano).
+
+    Returns:
+        pd.Series: Pedidos atrasados por setor, na ordem de SETOR_ORDEM, sem os setores zerados.
+    """
+    if "GARGALO" not in df_validado:
+        return pd.Series(dtype="int64")
+    atrasados = df_validado.loc[df_validado["PRAZO"] == "❌", "GARGALO"].value_counts()
+    return atrasados.reindex(SETOR_ORDEM).dropna().astype("int64").rename("ATRASADOS")
+
+
+def _converter_datas(serie: pd.Series) -> pd.Series:
+    """Converte a coluna de datas (texto DD/MM/AAAA ou datetime) em datetime64, com NaT se inválida."""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie.dt.normalize()
+    return pd.to_datetime(serie, format="%d/%m/%Y", errors="coerce")
+
+
+def _dias_uteis_entre(inicio: pd.Series, fim: pd.Series, calendario_path) -> np.ndarray:
+    """Versão vetorizada de CalendarioUteis.dias_uteis_entre (segunda a sexta sem o calendário)."""
+    inicio = inicio.to_numpy(dtype="datetime64[D]")
+    fim = fim.to_numpy(dtype="datetime64[D]")
+    try:
+        dias = carregar_calendario_uteis(calendario_path).dias_array()
+    except IOError:
+        um_dia = np.timedelta64(1, "D")
+        return np.busday_count(inicio + um_dia, fim + um_dia)
+    return np.searchsorted(dias, fim, side="right") - np.searchsorted(dias, inicio, side="right")
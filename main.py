@@ -3,14 +3,34 @@ from tabulate import tabulate
 from InquirerPy import inquirer
 import pandas as pd
 
-from automation import gerar_relatorio_arquivo, criar_novo_plano, definir_ordem_manual, definir_prioridade, escolher_acao, escolher_arquivo_excel, preencher_producao, processar_tabela, selecionar_tipos_de_corte, excluir_pedido, validar_prazo, escolher_arquivo_exportar
-from automation.core.constants import DEFAULT_CONFIG_PATH, obter_valor_parametro
-
+from automation import gerar_relatorio_arquivo, criar_novo_plano, definir_ordem_manual, definir_prioridade, escolher_acao, escolher_arquivo_excel, preencher_producao, processar_tabela, selecionar_tipos_de_corte, excluir_pedido, validar_prazo, resumo_gargalos, escolher_arquivo_exportar
+from automation.core.calendar_utils import formatar_datas
+from automation.core.constants import DEFAULT_CONFIG_PATH, DEFAULT_EXP_PATH, obter_valor_parametro
+from automation.core.log_utils import configurar_logging
+from automation.core.instrumentation import configurar_instrumentacao
+from automation.core.profiling import escolher_perfilador, perfilar
+
+import logging
 import os
 import sys  # Para fechar o script com segurança
 
 
 def main():
+    # Nível de log via variável de ambiente (ex.: PLANEJAMENTO_LOG=DEBUG) e rastreamento opcional por pedido
+    configurar_logging(
+        os.environ.get("PLANEJAMENTO_LOG", "INFO"),
+        arquivo_trace=os.environ.get("PLANEJAMENTO_TRACE")
+    )
+    # Tempos por etapa e contadores ao sair (PLANEJAMENTO_METRICAS=1 ou =metricas.json)
+    configurar_instrumentacao(os.environ.get("PLANEJAMENTO_METRICAS"))
+    # Perfil de execução da criação do plano e da exportação (PLANEJAMENTO_PROFILE=1, cprofile ou pyinstrument)
+    perfilador = os.environ.get("PLANEJAMENTO_PROFILE")
+    try:
+        escolher_perfilador(perfilador)
+    except ValueError as e:
+        logging.getLogger(__name__).warning("PLANEJAMENTO_PROFILE ignorado: %s", e)
+        perfilador = None
+
     # Limpar a tela do console
     # os.system('cls' if os.name == 'nt' else 'clear')
     # f = pyfiglet.Figlet(font="basic", width=80)
@@ -37,7 +57,8 @@ def main():
             if arquivo_exportar == None:
                 continue
 
-            gerar_relatorio_arquivo(arquivo_exportar)
+            with perfilar("report", perfilador, referencia=os.path.join(DEFAULT_EXP_PATH, arquivo_exportar)):
+                gerar_relatorio_arquivo(arquivo_exportar)
 
         if acao == "⚙️ : Configurações ":
             os.system('cls' if os.name == 'nt' else 'clear')
@@ -109,7 +130,7 @@ def main():
                 df_priorizado = definir_prioridade(df_formatado)
                 os.system('cls' if os.name == 'nt' else 'clear')
                 print("\n📋 Tabela final com prioridade:\n")
-                print(tabulate(df_priorizado, headers='keys', tablefmt='grid', showindex=False))
+                print(tabulate(formatar_datas(df_priorizado), headers='keys', tablefmt='grid', showindex=False))
 
                 # Confirmação do usuário usando InquirerPy
                 confirmacao = inquirer.select(
@@ -123,12 +144,19 @@ def main():
                 elif confirmacao == "Reorganizar":
                     print("\n🔄 Reorganizando a tabela...\n")
 
-            df_produzido, carga = criar_novo_plano(df_priorizado)
+            with perfilar("plan", perfilador):
+                df_produzido, carga = criar_novo_plano(df_priorizado)
             print("\n🗓️  Novo Plano Criado\n")
             print(f"\n Carga: {carga} %")
             print("\n📊  Relatório:\n")
             df_validado = validar_prazo(df_produzido)
-            print(tabulate(df_validado, headers='keys', tablefmt='grid', showindex=False))
+            print(tabulate(formatar_datas(df_validado), headers='keys', tablefmt='grid', showindex=False))
+
+            gargalos = resumo_gargalos(df_validado)
+            if not gargalos.empty:
+                print("\n🚧 Gargalos dos pedidos atrasados:")
+                for setor, total in gargalos.items():
+                    print(f"   {setor}: {total} pedido(s)")
 
             # Perguntar ao usuário se deseja voltar ou sair
             proxima_acao = inquirer.select(